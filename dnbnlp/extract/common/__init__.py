@@ -1,2 +1,4 @@
+from .aho_corasick import *
 from .dict_terms import *
+from .dict_index import *
 from .terms import *
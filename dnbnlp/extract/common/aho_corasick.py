@@ -0,0 +1,115 @@
+"""Aho-Corasick multi-pattern string search.
+
+This module implements a plain Python Aho-Corasick automaton. All patterns added to the automaton are found
+in a single left-to-right pass over the text, so the search time depends on the length of the text and
+the number of matches rather than on the number of patterns.
+"""
+
+from collections import deque
+from typing import Dict, Generator, List, Tuple
+
+
+class AhoCorasickAutomaton:
+    """
+    Multi-pattern search automaton.
+    Patterns are added with add_pattern(), the automaton is compiled with build() and then searched with iter_matches().
+    Every pattern gets an integer id (its insertion index) which is reported with each match.
+    """
+    __slots__ = ('patterns', '_goto', '_fail', '_output', '_dict_link', '_built')
+
+    def __init__(self):
+        self.patterns = []  # type: List[str]
+        self._goto = [dict()]  # type: List[Dict[str, int]]
+        self._fail = [0]  # type: List[int]
+        self._output = [-1]  # type: List[int]
+        self._dict_link = [0]  # type: List[int]
+        self._built = False
+
+    def __len__(self):
+        return len(self.patterns)
+
+    def add_pattern(self, pattern: str) -> int:
+        """
+        Add a pattern to the automaton.
+        Adding the same pattern twice returns the id of the first one.
+        :param pattern: Non-empty string to search for.
+        :return: Id of the pattern.
+        """
+        if not pattern:
+            raise ValueError('Empty patterns are not supported')
+        state = 0
+        for char in pattern:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto.append(dict())
+                self._fail.append(0)
+                self._output.append(-1)
+                self._dict_link.append(0)
+                self._goto[state][char] = next_state
+            state = next_state
+        if self._output[state] < 0:
+            self._output[state] = len(self.patterns)
+            self.patterns.append(pattern)
+        self._built = False
+        return self._output[state]
+
+    def build(self) -> 'AhoCorasickAutomaton':
+        """
+        Compute failure and dictionary suffix links. Has to be called after the last add_pattern() call.
+        :return: The automaton itself.
+        """
+        goto, fail, output, dict_link = self._goto, self._fail, self._output, self._dict_link
+        queue = deque()
+        for state in goto[0].values():
+            fail[state] = 0
+            dict_link[state] = 0
+            queue.append(state)
+        while queue:
+            state = queue.popleft()
+            for char, next_state in goto[state].items():
+                queue.append(next_state)
+                fallback = fail[state]
+                while fallback and char not in goto[fallback]:
+                    fallback = fail[fallback]
+                fail_state = goto[fallback].get(char, 0)
+                fail[next_state] = fail_state
+                dict_link[next_state] = fail_state if output[fail_state] >= 0 else dict_link[fail_state]
+        self._built = True
+        return self
+
+    def iter_matches(self, text: str) -> Generator[Tuple[int, int], None, None]:
+        """
+        Find all occurrences (including overlapping ones) of all patterns in the text.
+        :param text:
+        :return: Generates tuples (start, pattern_id) ordered by the end position of the occurrence.
+        """
+        if not self._built:
+            self.build()
+        goto, fail, output, dict_link, patterns = self._goto, self._fail, self._output, self._dict_link, self.patterns
+        state = 0
+        for position, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            match_state = state if output[state] >= 0 else dict_link[state]
+            while match_state:
+                pattern_id = output[match_state]
+                yield position - len(patterns[pattern_id]) + 1, pattern_id
+                match_state = dict_link[match_state]
+
+    def find_all(self, text: str) -> Dict[int, List[int]]:
+        """
+        Find all occurrences of all patterns in the text grouped by pattern.
+        :param text:
+        :return: Dict of pattern_id -> ascending list of start positions.
+        """
+        res = dict()
+        for start, pattern_id in self.iter_matches(text):
+            starts = res.get(pattern_id)
+            if starts is None:
+                res[pattern_id] = [start]
+            else:
+                # occurrences of one pattern are reported in ascending order of their end = ascending start
+                starts.append(start)
+        return res
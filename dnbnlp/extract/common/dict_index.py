@@ -0,0 +1,332 @@
+"""Compiled dictionary index.
+
+This module implements a binary index file for dictionaries of terms (dict_terms.term_config() tuples) and
+entities (lexnlp entity_config() tuples). Compiling the index stores the normalized form of every alias next to
+the term metadata, so loading a dictionary does not need to tokenize or stem the aliases again.
+
+The file is read through mmap: loading only parses a small JSON header, terms are decoded when they are accessed.
+
+File layout (all integers are native int64):
+    magic (8 bytes) | header length (8 bytes) | JSON header | sections, each aligned to 8 bytes
+Sections:
+    string_offsets, string_blob - all (deduplicated) strings as one UTF-8 blob with n + 1 offsets
+    term_* - one value per term (ids and strings are references to the string table, -1 is None)
+    term_alias_start - n_terms + 1 offsets of the aliases of each term in the alias_* sections
+    alias_* - one value per alias
+    lang_aliases - alias indexes grouped by alias language, the header holds the bounds of each language partition
+"""
+
+import json
+import mmap
+import numbers
+import os
+import sys
+from array import array
+from collections.abc import Sequence
+from typing import Generator, List, Tuple, Union
+
+from dnbnlp.extract.common.dict_terms import normalize_text
+
+
+DICT_INDEX_MAGIC = b'DNBDIDX1'
+DICT_INDEX_VERSION = 1
+
+# kinds of term/alias ids
+_ID_NONE = 0
+_ID_INT = 1
+_ID_STR = 2
+
+_TERM_SECTIONS = ('term_id_kind', 'term_id', 'term_name', 'term_category', 'term_priority', 'term_alias_start')
+_ALIAS_SECTIONS = ('alias_text', 'alias_lang', 'alias_is_abbrev', 'alias_id_kind', 'alias_id', 'alias_normalized')
+
+
+class _StringTable:
+    def __init__(self):
+        self.refs = dict()  # string -> its index in the table
+        self.offsets = array('q', [0])
+        self.blob = bytearray()
+
+    def ref(self, value: Union[None, str]) -> int:
+        if value is None:
+            return -1
+        value = str(value)
+        res = self.refs.get(value)
+        if res is None:
+            res = len(self.refs)
+            self.refs[value] = res
+            self.blob += value.encode('utf-8')
+            self.offsets.append(len(self.blob))
+        return res
+
+
+def _encode_id(strings: _StringTable, value) -> Tuple[int, int]:
+    if value is None:
+        return _ID_NONE, 0
+    if isinstance(value, numbers.Integral) and not isinstance(value, bool):
+        return _ID_INT, int(value)
+    return _ID_STR, strings.ref(value)
+
+
+def compile_dict_index(terms: List[Tuple],
+                       index_fn: str,
+                       use_stemmer: bool = False,
+                       source_hash: str = None) -> str:
+    """
+    Write the terms to a binary index file which can be loaded with load_dict_index().
+    Terms can be either dict_terms.term_config() tuples (id, name, category, priority, aliases) or
+    lexnlp entity_config() tuples (id, name, priority, aliases). All terms should have the same form.
+    Aliases without the precomputed normalized form are normalized here with their own language.
+    :param terms: Terms to store.
+    :param index_fn: Path of the index file.
+    :param use_stemmer: Use stemmer for normalizing aliases which do not have the normalized form yet.
+    Should be the same value as used for creating the terms and for searching.
+    :param source_hash: Optional hash of the source the terms were created from which has no file,
+    e.g. a DataFrame, see is_dict_index_up_to_date().
+    :return: index_fn
+    """
+    terms = list(terms)
+    tuple_size = len(terms[0]) if terms else 5
+    if tuple_size not in (4, 5):
+        raise ValueError(f'Unsupported term tuple size: {tuple_size}')
+    aliases_pos = tuple_size - 1
+    priority_pos = tuple_size - 2
+
+    strings = _StringTable()
+    sections = {name: array('q') for name in _TERM_SECTIONS + _ALIAS_SECTIONS}
+    lang_aliases = dict()  # alias language -> alias indices
+
+    n_aliases = 0
+    for term in terms:
+        id_kind, id_value = _encode_id(strings, term[0])
+        sections['term_id_kind'].append(id_kind)
+        sections['term_id'].append(id_value)
+        sections['term_name'].append(strings.ref(term[1]))
+        sections['term_category'].append(strings.ref(term[2]) if tuple_size == 5 else -1)
+        sections['term_priority'].append(int(term[priority_pos] or 0))
+        sections['term_alias_start'].append(n_aliases)
+        for alias in term[aliases_pos]:
+            alias_text, alias_lang, is_abbrev = alias[0], alias[1], bool(alias[2])
+            alias_id = alias[3] if len(alias) > 3 else None
+            normalized_alias = alias[4] if len(alias) > 4 and alias[4] is not None \
+                else normalize_text(alias_text, alias_lang, lowercase=not is_abbrev, use_stemmer=use_stemmer)
+            id_kind, id_value = _encode_id(strings, alias_id)
+            sections['alias_text'].append(strings.ref(alias_text))
+            sections['alias_lang'].append(strings.ref(alias_lang))
+            sections['alias_is_abbrev'].append(1 if is_abbrev else 0)
+            sections['alias_id_kind'].append(id_kind)
+            sections['alias_id'].append(id_value)
+            sections['alias_normalized'].append(strings.ref(normalized_alias))
+            lang_aliases.setdefault(alias_lang, []).append(n_aliases)
+            n_aliases += 1
+    sections['term_alias_start'].append(n_aliases)
+
+    languages = dict()
+    sections['lang_aliases'] = array('q')
+    for lang, alias_indexes in lang_aliases.items():
+        start = len(sections['lang_aliases'])
+        sections['lang_aliases'].extend(alias_indexes)
+        languages['' if lang is None else 'lang:' + lang] = [start, len(sections['lang_aliases'])]
+
+    sections['string_offsets'] = strings.offsets
+    sections['string_blob'] = strings.blob
+
+    # lay out the sections
+    payload = []
+    section_bounds = dict()
+    position = 0
+    for name, data in sections.items():
+        data = data.tobytes() if isinstance(data, array) else bytes(data)
+        section_bounds[name] = [position, len(data)]
+        padding = (-len(data)) % 8
+        payload.append(data + b'\0' * padding)
+        position += len(data) + padding
+
+    header = json.dumps({'version': DICT_INDEX_VERSION,
+                         'byteorder': sys.byteorder,
+                         'tuple_size': tuple_size,
+                         'use_stemmer': use_stemmer,
+                         'source_hash': source_hash,
+                         'n_terms': len(terms),
+                         'n_aliases': n_aliases,
+                         'languages': languages,
+                         'sections': section_bounds}).encode('utf-8')
+    header += b' ' * ((-len(header)) % 8)
+
+    # imported here because dnbnlp.utils imports dnbnlp.extract
+    from dnbnlp.utils.files import atomic_write
+    with atomic_write(index_fn) as tmp_fn:
+        with open(tmp_fn, 'wb') as f:
+            f.write(DICT_INDEX_MAGIC)
+            f.write(len(header).to_bytes(8, 'little'))
+            f.write(header)
+            for data in payload:
+                f.write(data)
+    return index_fn
+
+
+class DictTermsIndex(Sequence):
+    """
+    Read-only sequence of terms backed by a memory-mapped index file written by compile_dict_index().
+    Terms are decoded into the usual tuples on first access and cached. It can be used everywhere a list of terms
+    is expected (find_dict_terms(), compile_dict_terms(), lexnlp find_dict_entities() for entity indexes).
+    """
+
+    def __init__(self, index_fn: str):
+        self.index_fn = index_fn
+        with open(index_fn, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mmap[:8] != DICT_INDEX_MAGIC:
+            self._mmap.close()
+            raise ValueError(f'Not a dictionary index file: {index_fn}')
+        header_len = int.from_bytes(self._mmap[8:16], 'little')
+        self.header = json.loads(self._mmap[16:16 + header_len].decode('utf-8'))
+        if self.header['version'] != DICT_INDEX_VERSION or self.header['byteorder'] != sys.byteorder:
+            self._mmap.close()
+            raise ValueError(f'Incompatible dictionary index file: {index_fn}')
+
+        self.tuple_size = self.header['tuple_size']
+        self.use_stemmer = self.header['use_stemmer']
+        # all views on the memory map are kept to release them before closing it
+        self._views = [memoryview(self._mmap)]
+        data = self._views[0][16 + header_len:]
+        self._views.append(data)
+        self._sections = dict()
+        for name, (start, length) in self.header['sections'].items():
+            section = data[start:start + length]
+            self._views.append(section)
+            if name != 'string_blob':
+                section = section.cast('q')
+                self._views.append(section)
+            self._sections[name] = section
+        self._blob = self._sections['string_blob']
+        self._string_offsets = self._sections['string_offsets']
+        self._terms = dict()
+
+    def __reduce__(self):
+        # the memory map is not picklable - re-open the file in the receiving process
+        return load_dict_index, (self.index_fn,)
+
+    def __len__(self):
+        return self.header['n_terms']
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('term index out of range')
+        term = self._terms.get(index)
+        if term is None:
+            term = self._decode_term(index)
+            self._terms[index] = term
+        return term
+
+    def __repr__(self):
+        return f'<DictTermsIndex: path="{self.index_fn}"; terms={len(self)}>'
+
+    def close(self):
+        self._terms = dict()
+        self._sections = dict()
+        self._blob = self._string_offsets = None
+        for view in reversed(self._views):
+            view.release()
+        self._views = []
+        self._mmap.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    @property
+    def languages(self) -> List[Union[None, str]]:
+        return [None if lang == '' else lang[len('lang:'):] for lang in self.header['languages']]
+
+    def _str(self, ref: int) -> Union[None, str]:
+        if ref < 0:
+            return None
+        return bytes(self._blob[self._string_offsets[ref]:self._string_offsets[ref + 1]]).decode('utf-8')
+
+    def _id(self, kind: int, value: int):
+        if kind == _ID_INT:
+            return value
+        if kind == _ID_STR:
+            return self._str(value)
+        return None
+
+    def _decode_alias(self, alias_index: int) -> Tuple[str, str, bool, int, str]:
+        sections = self._sections
+        return (self._str(sections['alias_text'][alias_index]),
+                self._str(sections['alias_lang'][alias_index]),
+                bool(sections['alias_is_abbrev'][alias_index]),
+                self._id(sections['alias_id_kind'][alias_index], sections['alias_id'][alias_index]),
+                self._str(sections['alias_normalized'][alias_index]))
+
+    def _decode_term(self, index: int) -> Tuple:
+        sections = self._sections
+        alias_start, alias_end = sections['term_alias_start'][index], sections['term_alias_start'][index + 1]
+        term_id = self._id(sections['term_id_kind'][index], sections['term_id'][index])
+        aliases = [self._decode_alias(i) for i in range(alias_start, alias_end)]
+        if self.tuple_size == 5:
+            return (term_id, self._str(sections['term_name'][index]), self._str(sections['term_category'][index]),
+                    sections['term_priority'][index], aliases)
+        return term_id, self._str(sections['term_name'][index]), sections['term_priority'][index], aliases
+
+    def iter_term_aliases(self, language: str = None) -> Generator[Tuple[int, int, Tuple], None, None]:
+        """
+        Iterate over the aliases without decoding the terms.
+        :param language: If set - only aliases without language and aliases of the languages contained in
+        this string are returned (the same rule as in dict_terms.find_dict_terms()).
+        :return: Generates (term index, alias index within the term, alias tuple).
+        """
+        sections = self._sections
+        lang_aliases = sections['lang_aliases']
+        alias_starts = sections['term_alias_start']
+        for lang, (start, end) in self.header['languages'].items():
+            if language and lang and lang[len('lang:'):] not in language:
+                continue
+            term_index = 0
+            for position in range(start, end):
+                alias_index = lang_aliases[position]
+                # alias indexes are ascending within a partition, so the term index only moves forward
+                while alias_starts[term_index + 1] <= alias_index:
+                    term_index += 1
+                yield term_index, alias_index - alias_starts[term_index], self._decode_alias(alias_index)
+
+
+def load_dict_index(index_fn: str) -> DictTermsIndex:
+    """
+    Open an index file written by compile_dict_index().
+    :param index_fn:
+    :return: Sequence of the stored terms.
+    """
+    return DictTermsIndex(index_fn)
+
+
+def is_dict_index_up_to_date(index_fn: str, source_fns: List[str], use_stemmer: bool = None,
+                             source_hash: str = None) -> bool:
+    """
+    Check if the index file exists, is newer than all the source files it was compiled from and
+    (if use_stemmer is specified) was compiled with the same use_stemmer value.
+    :param index_fn:
+    :param source_fns:
+    :param use_stemmer:
+    :param source_hash: If specified, the index should be compiled with the same source_hash,
+    for sources without a file such as a DataFrame.
+    :return:
+    """
+    if not os.path.isfile(index_fn):
+        return False
+    index_mtime = os.path.getmtime(index_fn)
+    if any(os.path.getmtime(fn) > index_mtime for fn in source_fns):
+        return False
+    if use_stemmer is not None or source_hash is not None:
+        try:
+            with load_dict_index(index_fn) as index:
+                return (use_stemmer is None or index.use_stemmer == use_stemmer) and \
+                    (source_hash is None or index.header.get('source_hash') == source_hash)
+        except ValueError:
+            return False
+    return True
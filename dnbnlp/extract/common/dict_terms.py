@@ -1,13 +1,27 @@
 """Universal extraction of entities for which we have full dictionaries of possible names and aliases from Dutch text.
 """
 
+import functools
+import multiprocessing
 import re
+from array import array
+from itertools import islice
+from collections.abc import Sequence
 from typing import Union, List, Dict, Set, Tuple, Callable, Generator, Any
 
 from lexnlp.nlp.en.tokens import get_token_list as get_token_list_en
-from lexnlp.nlp.en.tokens import get_stem_list as get_stem_list_en
+from lexnlp.nlp.en.tokens import DEFAULT_STEMMER as DEFAULT_STEMMER_EN
 from dnbnlp.nlp.nl.tokens import get_token_list as get_token_list_nl
-from dnbnlp.nlp.nl.tokens import get_stem_list as get_stem_list_nl
+from dnbnlp.nlp.nl.tokens import get_token_spans as get_token_spans_nl
+from dnbnlp.nlp.nl.tokens import align_tokens
+from dnbnlp.nlp.nl.tokens import DEFAULT_STEM_LEXICON as STEM_LEXICON_NL
+from dnbnlp.nlp.nl.tokens import StemLexicon
+from dnbnlp.extract.common.aho_corasick import AhoCorasickAutomaton
+
+# Stem lexicon used by normalize_text() for English and texts of unspecified language.
+# Dutch texts use the default Dutch lexicon of dnbnlp.nlp.nl.tokens.
+STEM_LEXICON_EN = StemLexicon(DEFAULT_STEMMER_EN)
+
 
 def term_config(term_id: int,
                 name: str,
@@ -43,8 +57,8 @@ def term_config(term_id: int,
     return res
 
 
-def term_alias(alias: str, language: str = None, is_abbreviation: bool = False, use_stemmer: bool = False, alias_id: int = None) \
-        -> Tuple[str, str, bool, int, str]:
+def term_alias(alias: str, language: str = None, is_abbreviation: bool = False, use_stemmer: bool = False, alias_id: int = None,
+               regex_tokenizer: bool = False) -> Tuple[str, str, bool, int, str]:
     """
     Create entity alias tuple. This method is just for ensuring type safety of alias components in IDE.
     :param alias_id: Alias id. None if there is no id.
@@ -52,9 +66,11 @@ def term_alias(alias: str, language: str = None, is_abbreviation: bool = False,
     :param language: Language - en, de, fr, ...
     :param is_abbreviation: Is this alias representing an abbreviation or not. Abbreviations have different rules
     of searching.
+    :param regex_tokenizer: Normalize the alias with the regex tokenizer for Dutch, see normalize_text().
     :return: A tuple representing the alias in format: (alias_text, lang, is_abbreviation, alias_id)
     """
-    normalized_alias = normalize_text(alias, language, lowercase=not is_abbreviation, use_stemmer = use_stemmer)
+    normalized_alias = normalize_text(alias, language, lowercase=not is_abbreviation, use_stemmer = use_stemmer,
+                                      regex_tokenizer=regex_tokenizer)
     return alias, language, is_abbreviation, alias_id, normalized_alias
 
 
@@ -209,7 +225,9 @@ def normalize_text(text: str,
                    spaces_on_start_end: bool = True,
                    spaces_after_dots: bool = True,
                    lowercase: bool = True,
-                   use_stemmer: bool = False) -> str:
+                   use_stemmer: bool = False,
+                   return_offsets: bool = False,
+                   regex_tokenizer: bool = False) -> Union[str, Tuple[str, array]]:
     """
     Normalizes text for substring search operations - extracts tokens, joins them back with spaces,
     adds missing spaces after dots for abbreviations, e.t.c.
@@ -224,19 +242,136 @@ def normalize_text(text: str,
     number (or to some the most plain form) before matching. When using tokenizer - the words are compared as is.
     Using tokenizer should be enough for searches for entities which exist in a single number in the real world -
     geo entities, courts, .... Stemmer is required for searching for some common objects - table, pen, developer, ...
-    :return:
-    """
+    :param return_offsets: If True - return a tuple (normalized text, offsets) where offsets is an int array
+    mapping each position of the normalized text to a position in the source text. Characters of a token map to
+    the corresponding characters of the source token (the last character of a stemmed token maps to the last
+    character of the source word), the joining spaces map to the position right after the previous token.
+    The array has one extra item - the end of the last token - so that exclusive ends can be mapped too.
+    :param regex_tokenizer: For Dutch - use the regex tokenizer of dnbnlp.nlp.nl.tokens instead of nltk.
+    It is faster and gives the token positions directly. The searched text and the aliases should be normalized
+    with the same tokenizer.
+    :return: Normalized text or (normalized text, offsets) tuple.
+    See enable_normalize_text_cache() for caching the results.
+    """
+    if _normalize_text_cached is not None:
+        res = _normalize_text_cached(text, language, spaces_on_start_end, spaces_after_dots, lowercase, use_stemmer,
+                                     return_offsets, regex_tokenizer)
+        # the cached offsets array is shared - return a copy
+        return (res[0], array('i', res[1])) if return_offsets else res
+    return _normalize_text(text, language, spaces_on_start_end, spaces_after_dots, lowercase, use_stemmer,
+                           return_offsets, regex_tokenizer)
+
+
+def _normalize_text(text: str,
+                    language: str,
+                    spaces_on_start_end: bool,
+                    spaces_after_dots: bool,
+                    lowercase: bool,
+                    use_stemmer: bool,
+                    return_offsets: bool,
+                    regex_tokenizer: bool) -> Union[str, Tuple[str, array]]:
+    if (language is not None) and (language.lower() == "nl"):
+        get_token_list, stem_lexicon = get_token_list_nl, STEM_LEXICON_NL
+        if regex_tokenizer:
+            return _normalize_text_regex(text, spaces_after_dots, lowercase, use_stemmer, return_offsets)
+    else:
+        get_token_list, stem_lexicon = get_token_list_en, STEM_LEXICON_EN
+
     res = text
     if spaces_on_start_end:
         res = ' ' + res + ' '
     if spaces_after_dots:
         res = res.replace('.', ' . ').replace('  ', ' ')
-    if (language is not None) and (language.lower() == "nl"):
-        tokens = get_stem_list_nl(res, lowercase=lowercase) if use_stemmer else get_token_list_nl(res, lowercase=lowercase)
-    else:
-        tokens = get_stem_list_en(res, lowercase=lowercase) if use_stemmer else get_token_list_en(res, lowercase=lowercase)
-    res = ' '.join(tokens)
-    return res
+
+    # Same as get_stem_list(): stems of the tokens, but each distinct word is stemmed once by the lexicon.
+    tokens = get_token_list(res, lowercase=lowercase)
+    if not return_offsets:
+        if use_stemmer:
+            tokens = [stem_lexicon.stem(token) for token in tokens]
+        return ' '.join(tokens)
+
+    # Tokens are searched in the source text, so they are aligned before stemming.
+    source = text
+    if lowercase:
+        source_lowercase = text.lower()
+        if len(source_lowercase) == len(text):
+            source = source_lowercase
+    spans = align_tokens(source, tokens)
+    if use_stemmer:
+        tokens = [stem_lexicon.stem(token) for token in tokens]
+    return ' '.join(tokens), _get_normalized_offsets(tokens, spans)
+
+
+def _normalize_text_regex(text: str,
+                          spaces_after_dots: bool,
+                          lowercase: bool,
+                          use_stemmer: bool,
+                          return_offsets: bool) -> Union[str, Tuple[str, array]]:
+    tokens = []
+    spans = []
+    for token, start, end in get_token_spans_nl(text, lowercase=lowercase):
+        if spaces_after_dots and '.' in token and len(token) > 1:
+            # same as spacing the dots before tokenizing: 'N.V.' -> 'N . V .'
+            for part in re.finditer(r'[^.]+|\.', token):
+                tokens.append(part.group())
+                spans.append((start + part.start(), start + part.end()))
+        else:
+            tokens.append(token)
+            spans.append((start, end))
+    if use_stemmer:
+        tokens = [STEM_LEXICON_NL.stem(token) for token in tokens]
+    if not return_offsets:
+        return ' '.join(tokens)
+    return ' '.join(tokens), _get_normalized_offsets(tokens, spans)
+
+
+# lru_cache-wrapped _normalize_text() if the cache is enabled
+_normalize_text_cached = None
+
+
+def enable_normalize_text_cache(maxsize: int = 100000):
+    """
+    Cache the results of normalize_text() in a LRU cache - to avoid repeated tokenizing/stemming of the same
+    texts (aliases, black lists, repeated sentences). The cache is keyed on the text and all the arguments.
+    Calling this method again replaces the cache with a new empty one.
+    :param maxsize: Maximal number of cached results. None - unbounded.
+    :return:
+    """
+    global _normalize_text_cached
+    _normalize_text_cached = functools.lru_cache(maxsize=maxsize)(_normalize_text)
+
+
+def disable_normalize_text_cache():
+    """
+    Disable and drop the normalize_text() cache.
+    :return:
+    """
+    global _normalize_text_cached
+    _normalize_text_cached = None
+
+
+def normalize_text_cache_info():
+    """
+    Get hit/miss statistics of the normalize_text() cache.
+    :return: functools lru_cache info tuple (hits, misses, maxsize, currsize) or None if the cache is disabled.
+    """
+    return _normalize_text_cached.cache_info() if _normalize_text_cached is not None else None
+
+
+def _get_normalized_offsets(tokens: List[str], spans: List[Tuple[int, int]]) -> array:
+    offsets = array('i')
+    prev_end = 0
+    for i, (token, (start, end)) in enumerate(zip(tokens, spans)):
+        if i:
+            # joining space
+            offsets.append(prev_end)
+        last = max(end - 1, start)
+        head = max(0, min(len(token) - 1, last - start))
+        offsets.extend(range(start, start + head))
+        offsets.extend([last] * (len(token) - head))
+        prev_end = end
+    offsets.append(prev_end)
+    return offsets
 
 
 def alias_is_blacklisted(alias_black_list: Union[None, Dict[str, Tuple[List[str], List[str]]]],
@@ -253,6 +388,12 @@ def alias_is_blacklisted(alias_black_list: Union[None, Dict[str, Tuple[List[str]
     return False
 
 
+def _abbrev_in_uppercase_block(text: str, position: int, check_range: int) -> bool:
+    block = text[max(0, position - check_range): min(len(text), position + check_range)]
+    block_upper = block.upper()
+    return block == block_upper
+
+
 def _find_term_positions(normalized_text: str,
                            normalized_text_lowercase: str,
                            term: Tuple[int, str, str, int, List[Tuple]],
@@ -261,7 +402,8 @@ def _find_term_positions(normalized_text: str,
                            use_stemmer: bool = False,
                            abbrev_uppercase_check_range: int = 20,
                            min_alias_len: int = None,
-                           alias_black_list: Union[None, Dict[str, Tuple[List[str], List[str]]]] = None):
+                           alias_black_list: Union[None, Dict[str, Tuple[List[str], List[str]]]] = None,
+                           regex_tokenizer: bool = False):
     """
     Searches for all occurrences of name/alias of the specified entity in the specified text and fills the
     provided context dict with them.
@@ -288,14 +430,10 @@ def _find_term_positions(normalized_text: str,
     :param abbrev_uppercase_check_range: To avoid false-positives in detecting abbreviations similar to AND, OR, IN
     we need to ensure that it is not english words appeared in a piece of text written in uppercase.
     For this for each abbrev we ignore it if text[position - range : position + range] == uppercase(text[...]).
+    :param regex_tokenizer: Normalize the aliases with the regex tokenizer for Dutch, see normalize_text().
     :return:
     """
 
-    def abbrev_in_uppercase_block(text: str, position: int, check_range:int):
-        block = text[max(0, position - check_range): min(len(text), position + check_range)]
-        block_upper = block.upper()
-        return block == block_upper
-
     if context is None:
         context = dict()
 
@@ -309,7 +447,8 @@ def _find_term_positions(normalized_text: str,
 
             # get or create normalized alias
             normalized_alias = ea[4] if len(ea) == 5 and ea[4] is not None\
-                else normalize_text(alias_text, language, lowercase=not alias_is_abbreviation, use_stemmer=use_stemmer)
+                else normalize_text(alias_text, language, lowercase=not alias_is_abbreviation, use_stemmer=use_stemmer,
+                                    regex_tokenizer=regex_tokenizer)
 
             if not alias_text or (language and alias_lang and alias_lang not in language):
                 continue
@@ -329,7 +468,7 @@ def _find_term_positions(normalized_text: str,
                     break
 
                 if alias_is_abbreviation and \
-                        abbrev_in_uppercase_block(normalized_text_for_alias, start, abbrev_uppercase_check_range):
+                        _abbrev_in_uppercase_block(normalized_text_for_alias, start, abbrev_uppercase_check_range):
                     continue
                 end = start + len(normalized_alias) - 1
 
@@ -340,10 +479,171 @@ def _find_term_positions(normalized_text: str,
                     context[start] = SearchResultPosition(term, ea, start, end)
 
 
+class DictTermsAutomaton:
+    """
+    Compiled form of a list of dictionary terms for find_dict_terms().
+    All normalized aliases of all terms are put in two Aho-Corasick automatons - one for abbreviations (searched in
+    the non-lowercase normalized text) and one for the other aliases (searched in the lowercase normalized text).
+    Searching then takes a single pass over the text per automaton, whatever the number of terms.
+    The language, alias length and black list filters are applied once while compiling.
+    Found occurrences are fed into the search context in the same order as _find_term_positions() would do
+    for the list of terms, so the longest-match, abbreviation-case and conflict-resolution semantics are the same.
+    """
+
+    def __init__(self,
+                 all_possible_terms: List[Tuple[int, str, str, int, List[Tuple]]],
+                 language: str = None,
+                 use_stemmer: bool = False,
+                 min_alias_len: int = None,
+                 prepared_alias_black_list: Union[None, Dict[str, Tuple[List[str], List[str]]]] = None,
+                 abbrev_uppercase_check_range: int = 20,
+                 regex_tokenizer: bool = False):
+        # sequences (lists, dictionary indexes) are kept as is - terms are only accessed for the found aliases
+        self.terms = all_possible_terms if isinstance(all_possible_terms, Sequence) else list(all_possible_terms)
+        self.language = language
+        self.use_stemmer = use_stemmer
+        self.regex_tokenizer = regex_tokenizer
+        self.abbrev_uppercase_check_range = abbrev_uppercase_check_range
+        self.abbrev_automaton = AhoCorasickAutomaton()
+        self.automaton = AhoCorasickAutomaton()
+        # pattern id -> list of (term index, alias index) sharing the normalized alias, for both automatons
+        self.abbrev_pattern_aliases = []  # type: List[List[Tuple[int, int]]]
+        self.pattern_aliases = []  # type: List[List[Tuple[int, int]]]
+
+        if hasattr(self.terms, 'iter_term_aliases'):
+            # dictionary index - read the aliases of the requested languages without decoding the terms
+            term_aliases = self.terms.iter_term_aliases(language)
+        else:
+            term_aliases = ((term_index, alias_index, ea)
+                            for term_index, term in enumerate(self.terms)
+                            for alias_index, ea in enumerate(get_term_aliases(term) or ()))
+
+        for term_index, alias_index, ea in term_aliases:
+            alias_text = ea[0]
+            alias_lang = ea[1]
+            alias_is_abbreviation = ea[2]
+
+            if not alias_text or (language and alias_lang and alias_lang not in language):
+                continue
+            if min_alias_len and len(alias_text) < min_alias_len:
+                continue
+
+            normalized_alias = ea[4] if len(ea) == 5 and ea[4] is not None \
+                else normalize_text(alias_text, language, lowercase=not alias_is_abbreviation, use_stemmer=use_stemmer,
+                                    regex_tokenizer=regex_tokenizer)
+            if not normalized_alias:
+                continue
+            if alias_is_blacklisted(prepared_alias_black_list, normalized_alias, alias_lang, alias_is_abbreviation):
+                continue
+
+            if alias_is_abbreviation:
+                automaton, pattern_aliases = self.abbrev_automaton, self.abbrev_pattern_aliases
+            else:
+                automaton, pattern_aliases = self.automaton, self.pattern_aliases
+            pattern_id = automaton.add_pattern(normalized_alias)
+            if pattern_id == len(pattern_aliases):
+                pattern_aliases.append([])
+            pattern_aliases[pattern_id].append((term_index, alias_index))
+
+        self.abbrev_automaton.build()
+        self.automaton.build()
+
+    def __repr__(self):
+        return f'DictTermsAutomaton(terms={len(self.terms)}, ' \
+               f'patterns={len(self.automaton) + len(self.abbrev_automaton)}, language={self.language})'
+
+    def _collect_hits(self,
+                      normalized_text: str,
+                      automaton: AhoCorasickAutomaton,
+                      pattern_aliases: List[List[Tuple[int, int]]],
+                      is_abbreviation: bool,
+                      hits: List[Tuple[int, int, int, int]]):
+        for pattern_id, starts in automaton.find_all(normalized_text).items():
+            pattern_len = len(automaton.patterns[pattern_id])
+            # _find_term_positions() continues searching for the same alias at start + len(alias) - 1
+            next_start = 0
+            for start in starts:
+                if start < next_start:
+                    continue
+                next_start = start + max(pattern_len - 1, 1)
+                if is_abbreviation and \
+                        _abbrev_in_uppercase_block(normalized_text, start, self.abbrev_uppercase_check_range):
+                    continue
+                end = start + pattern_len - 1
+                for term_index, alias_index in pattern_aliases[pattern_id]:
+                    hits.append((start, term_index, alias_index, end))
+
+    def find_term_positions(self,
+                            normalized_text: str,
+                            normalized_text_lowercase: str,
+                            context: Dict[int, SearchResultPosition] = None) -> Dict[int, SearchResultPosition]:
+        """
+        Searches for all occurrences of all compiled aliases and fills the search context the same way as
+        a series of _find_term_positions() calls over all terms would do.
+        :param normalized_text: Non-lowercase version of the normalized source text - to search for abbreviations.
+        :param normalized_text_lowercase: Lowercase version of the normalized source text - to search for non-abbrevs.
+        :param context: Map of alias/name positions in the source text to SearchResultPosition entries.
+        :return: The filled context.
+        """
+        if context is None:
+            context = dict()
+
+        hits = []
+        self._collect_hits(normalized_text, self.abbrev_automaton, self.abbrev_pattern_aliases, True, hits)
+        self._collect_hits(normalized_text_lowercase, self.automaton, self.pattern_aliases, False, hits)
+        # Replay in the order of the per-term search: results at a position depend on term and alias order only.
+        hits.sort()
+
+        for start, term_index, alias_index, end in hits:
+            term = self.terms[term_index]
+            ea = get_term_aliases(term)[alias_index]
+            already_found = context.get(start)
+            if already_found and len(already_found.alias_text) >= len(ea[0]):
+                already_found.add_term(term, ea)
+            else:
+                context[start] = SearchResultPosition(term, ea, start, end)
+        return context
+
+
+def compile_dict_terms(all_possible_terms: List[Tuple[int, str, str, int, List[Tuple]]],
+                       language: str = None,
+                       use_stemmer: bool = False,
+                       min_alias_len: int = None,
+                       prepared_alias_black_list: Union[None, Dict[str, Tuple[List[str], List[str]]]] = None,
+                       regex_tokenizer: bool = False) -> DictTermsAutomaton:
+    """
+    Compile the list of terms into a multi-pattern search automaton which can be passed to find_dict_terms()
+    (and get_terms(), get_term_annotations()) instead of the list of terms.
+    Compiling takes time proportional to the total length of the aliases, so it pays off as soon as the same
+    dictionary is searched in more than a few texts.
+    :param all_possible_terms: List of all possible terms to search for.
+    :param language: If set - then only aliases of this language will be searched for. The compiled automaton
+    normalizes the searched texts with this language.
+    :param use_stemmer: Use stemmer for normalizing the aliases without precomputed normalized form and the texts.
+    :param min_alias_len: Minimal length of alias/name to search for.
+    :param prepared_alias_black_list: Prepared black list of aliases to exclude from search.
+    :param regex_tokenizer: Normalize the aliases without precomputed normalized form and the texts with the regex
+    tokenizer for Dutch, see normalize_text(). The precomputed normalized aliases should be made with it too.
+    :return: Compiled automaton.
+    """
+    return DictTermsAutomaton(all_possible_terms,
+                              language=language,
+                              use_stemmer=use_stemmer,
+                              min_alias_len=min_alias_len,
+                              prepared_alias_black_list=prepared_alias_black_list,
+                              regex_tokenizer=regex_tokenizer)
+
+
 class DictionaryTerm:
-    def __init__(self, term: Any, coords: Tuple[int, int]):
+    """
+    Term found by find_dict_terms().
+    coords are the (start, end) positions of the found alias in the source text (end is the position of its last
+    character), normalized_coords - the same positions in the normalized text the alias has been found in.
+    """
+    def __init__(self, term: Any, coords: Tuple[int, int], normalized_coords: Tuple[int, int] = None):
         self.term = term
         self.coords = coords
+        self.normalized_coords = normalized_coords
 
     def __repr__(self):
         term_str = 'None'
@@ -358,15 +658,15 @@ class DictionaryTerm:
 
 
 def find_dict_terms(text: str,
-                    all_possible_terms: List[Tuple[int, str, str, int, List[Tuple]]],
+                    all_possible_terms: Union[List[Tuple[int, str, str, int, List[Tuple]]], DictTermsAutomaton],
                     language: str = None,
                     conflict_resolving_func: Callable[[List[Tuple[int, str, List[Tuple]]]],
                                                          Tuple[List[Tuple[int, str, List[Tuple]]], Tuple]] = None,
                     use_stemmer: bool = False,
                     remove_time_am_pm: bool = True,
                     min_alias_len: int = None,
-                    prepared_alias_black_list: Union[None, Dict[str, Tuple[List[str], List[str]]]] = None)\
-        -> Generator[DictionaryTerm, None, None]:
+                    prepared_alias_black_list: Union[None, Dict[str, Tuple[List[str], List[str]]]] = None,
+                    regex_tokenizer: bool = False) -> Generator[DictionaryTerm, None, None]:
     """
     Find all entities defined in the 'all_possible_entities' list appeared in the source text.
     This method takes care of leaving only the longest matching search result for the case of multiple
@@ -396,6 +696,10 @@ def find_dict_terms(text: str,
     If overlaps - then leave the longest alias and drop the shorter.
 
 
+    The positions are found in the normalized text. They are mapped back to the source text with the offset map
+    built by normalize_text() while normalizing, so DictionaryTerm.coords are positions in the source text
+    and the source text does not need to be searched again.
+
     Main complexity of this algorithm is caused by the requirement to detect the longest match for each piece of text
     while the longer match can start at the earlier position then the shorter match and there can be multiple aliases
     of different entities matching the same piece of text.
@@ -404,10 +708,16 @@ def find_dict_terms(text: str,
     We could form regexps containing the possible aliases and apply them to the source text:
     r'alias1|alias2|longer alias2|...'
 
-    TODO Compare to other algorithms for time and memory complexity
+    The cost of steps 3.x grows with the number of terms and aliases times the length of the text. For large
+    dictionaries compile the terms once with compile_dict_terms() and pass the resulting DictTermsAutomaton
+    instead of the list: then all aliases are found in a single pass over the text and steps 3.x are replaced
+    by feeding the found occurrences into the search context in the same order.
 
     :param text:
-    :param all_possible_entities: list of dict or list of DictEntity - all possible entities to search for
+    :param all_possible_entities: list of dict or list of DictEntity - all possible entities to search for.
+    Or a DictTermsAutomaton compiled from them by compile_dict_terms(). In this case language, use_stemmer,
+    regex_tokenizer, min_alias_len and prepared_alias_black_list given to compile_dict_terms() are used instead of the arguments
+    of this function.
     :param min_alias_len: Minimal length of alias/name to search for. Can be used to ignore too short aliases like "M."
     while searching.
     :param prepared_alias_black_list: List of aliases to remove from searching. Can be used to ignore concrete aliases.
@@ -423,21 +733,34 @@ def find_dict_terms(text: str,
     "Mississippi", ...
     :param remove_time_am_pm: Remove from final results AM/PM abbreviations which look like end part of time
     strings - 11:45 am, 10:00 pm.
+    :param regex_tokenizer: Normalize the text and the aliases with the regex tokenizer for Dutch, see
+    normalize_text(). Precomputed normalized aliases (term_alias()) should be made with the same tokenizer.
     :return:
     """
 
     if not text:
         return
 
-    normalized_text = normalize_text(text, language, lowercase=False, use_stemmer=use_stemmer)
+    automaton = all_possible_terms if isinstance(all_possible_terms, DictTermsAutomaton) else None
+    if automaton is not None:
+        language = automaton.language
+        use_stemmer = automaton.use_stemmer
+        regex_tokenizer = automaton.regex_tokenizer
+
+    normalized_text, offsets = normalize_text(text, language, lowercase=False, use_stemmer=use_stemmer,
+                                              return_offsets=True, regex_tokenizer=regex_tokenizer)
     normalized_text_lowercase = normalized_text.lower()
 
-    search_context = dict()
-    # Search for each DictEntity occurrence adding them into the shared search context.
-    for dict_term in all_possible_terms:
-        _find_term_positions(normalized_text, normalized_text_lowercase, dict_term, language, search_context,
-                               use_stemmer=use_stemmer, min_alias_len=min_alias_len,
-                               alias_black_list=prepared_alias_black_list)
+    if automaton is not None:
+        # Search for all aliases at once.
+        search_context = automaton.find_term_positions(normalized_text, normalized_text_lowercase)
+    else:
+        search_context = dict()
+        # Search for each DictEntity occurrence adding them into the shared search context.
+        for dict_term in all_possible_terms:
+            _find_term_positions(normalized_text, normalized_text_lowercase, dict_term, language, search_context,
+                                   use_stemmer=use_stemmer, min_alias_len=min_alias_len,
+                                   alias_black_list=prepared_alias_black_list, regex_tokenizer=regex_tokenizer)
 
     # At this moment we have a map of positions in the text
     # to SearchResultPosition entries (position + appeared name/alias + DictEntity).
@@ -463,13 +786,14 @@ def find_dict_terms(text: str,
         :return:
         """
         terms_at_pos = pos.get_terms_aliases()
+        coords = (offsets[pos.start], offsets[pos.end])
 
         if len(terms_at_pos) == 1:
-            return [DictionaryTerm(terms_at_pos[0], (pos.start, pos.end))]
+            return [DictionaryTerm(terms_at_pos[0], coords, (pos.start, pos.end))]
         else:
             cfree_ents = conflict_resolving_func(terms_at_pos) \
                 if conflict_resolving_func else terms_at_pos
-            return [DictionaryTerm(ent, (pos.start, pos.end))
+            return [DictionaryTerm(ent, coords, (pos.start, pos.end))
                     for ent in cfree_ents]
 
     for (_index, next_pos) in sorted(search_context.items()):
@@ -485,6 +809,84 @@ def find_dict_terms(text: str,
         yield from resolved_ents
 
 
+# Search state of the worker processes of find_dict_terms_many(): (automaton, conflict resolving function).
+_worker_search_state = None
+
+
+def _init_find_dict_terms_worker(automaton: DictTermsAutomaton, conflict_resolving_func: Callable):
+    global _worker_search_state
+    _worker_search_state = (automaton, conflict_resolving_func)
+
+
+def _find_dict_terms_chunk(chunk: List[Tuple[Any, str]]) -> List[Tuple[Any, List[DictionaryTerm]]]:
+    automaton, conflict_resolving_func = _worker_search_state
+    return [(index, list(find_dict_terms(text, automaton, conflict_resolving_func=conflict_resolving_func)))
+            for index, text in chunk]
+
+
+def _iter_chunks(indexed_texts, chunk_size: int) -> Generator[List[Tuple[Any, str]], None, None]:
+    while True:
+        chunk = list(islice(indexed_texts, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def find_dict_terms_many(texts,
+                         all_possible_terms: Union[List[Tuple[int, str, str, int, List[Tuple]]], DictTermsAutomaton],
+                         language: str = None,
+                         conflict_resolving_func: Callable[[List[Tuple[int, str, List[Tuple]]]],
+                                                           Tuple[List[Tuple[int, str, List[Tuple]]], Tuple]] = None,
+                         use_stemmer: bool = False,
+                         min_alias_len: int = None,
+                         prepared_alias_black_list: Union[None, Dict[str, Tuple[List[str], List[str]]]] = None,
+                         n_jobs: int = 1,
+                         chunk_size: int = 256,
+                         regex_tokenizer: bool = False) -> Generator[Tuple[Any, List[DictionaryTerm]], None, None]:
+    """
+    Find dictionary terms in many texts - see find_dict_terms().
+    The terms are compiled with compile_dict_terms() once (unless a DictTermsAutomaton is given) and the compiled
+    dictionary is shared by all the searches. With n_jobs != 1 the texts are split into chunks of chunk_size texts
+    which are searched in a pool of processes; each process receives the compiled dictionary only once.
+    :param texts: Iterable of texts or pandas Series of texts.
+    :param all_possible_terms: List of all possible terms to search for or a DictTermsAutomaton.
+    :param language: See find_dict_terms().
+    :param conflict_resolving_func: See find_dict_terms(). Should be a module-level function when n_jobs != 1.
+    :param use_stemmer: See find_dict_terms().
+    :param min_alias_len: See find_dict_terms().
+    :param prepared_alias_black_list: See find_dict_terms().
+    :param n_jobs: Number of processes, see dnbnlp.utils.parallel.
+    :param chunk_size: Number of texts sent to a process at once.
+    :param regex_tokenizer: See find_dict_terms().
+    :return: Generates tuples (index, list of DictionaryTerm) in the order of the texts. Index is the position of
+    the text in the iterable or its index label for pandas Series.
+    """
+    automaton = all_possible_terms if isinstance(all_possible_terms, DictTermsAutomaton) \
+        else compile_dict_terms(all_possible_terms,
+                                language=language,
+                                use_stemmer=use_stemmer,
+                                min_alias_len=min_alias_len,
+                                prepared_alias_black_list=prepared_alias_black_list,
+                                regex_tokenizer=regex_tokenizer)
+
+    indexed_texts = iter(texts.items()) if hasattr(texts, 'items') else enumerate(texts)
+
+    # imported here because dnbnlp.utils imports dnbnlp.extract
+    from dnbnlp.utils.parallel import get_n_jobs
+    n_jobs = get_n_jobs(n_jobs)
+
+    if n_jobs == 1:
+        for index, text in indexed_texts:
+            yield index, list(find_dict_terms(text, automaton, conflict_resolving_func=conflict_resolving_func))
+        return
+
+    with multiprocessing.Pool(n_jobs,
+                              initializer=_init_find_dict_terms_worker,
+                              initargs=(automaton, conflict_resolving_func)) as pool:
+        for chunk_res in pool.imap(_find_dict_terms_chunk, _iter_chunks(indexed_texts, chunk_size)):
+            yield from chunk_res
+
+
 def conflicts_take_first_by_id(conflicting_terms_aliases: List[Tuple[Tuple[int, str, int, List[Tuple]], Tuple]]) \
         -> List[Tuple[Tuple[int, str, str, int, List[Tuple]], Tuple[str, str, bool, int]]]:
     """
@@ -1,13 +1,16 @@
 """Term extraction for Dutch.
 """
  
+import hashlib
+from collections.abc import Sequence
 from typing import List, Tuple, Union, Dict, Generator, Any
  
 from lexnlp.extract.common.annotations.text_annotation import TextAnnotation
  
 from dnbnlp.extract.common.annotations.term_annotation import TermAnnotation
-from dnbnlp.extract.common.dict_terms import find_dict_terms, conflicts_take_first_by_id, \
+from dnbnlp.extract.common.dict_terms import find_dict_terms, find_dict_terms_many, conflicts_take_first_by_id, \
     prepare_alias_blacklist_dict, conflicts_top_by_priority, term_config, add_aliases_to_term
+from dnbnlp.extract.common.dict_index import compile_dict_index, load_dict_index, is_dict_index_up_to_date
  
 import pandas as pd
 import numpy as np
@@ -91,16 +94,76 @@ def get_term_annotations(text: str,
                                      prepared_alias_black_list=prepared_alias_black_list)
    
     for ent in dict_entries:
-        ant = TermAnnotation(coords=ent.coords)
-        if ent.term[0]:
-            ant.name = ent.term[0][1]
-            ant.category = ent.term[0][2]
-            ant.alias = ent.term[0][4]
-        yield ant
+        yield _get_term_annotation(text, ent)
+
+
+def get_term_annotations_batch(texts,
+                               term_config_list: List[Tuple[int, str, List[Tuple[str, str, bool, int]]]],
+                               priority: bool = False,
+                               priority_by_id: bool = False,
+                               use_stemmer: bool = True,
+                               language: str = None,
+                               min_alias_len: int = 2,
+                               prepared_alias_black_list: Union[None, Dict[str, Tuple[List[str], List[str]]]]
+                               = _ALIAS_BLACK_LIST_PREPARED,
+                               n_jobs: int = 1,
+                               chunk_size: int = 256) -> Generator[Tuple[Any, List[TermAnnotation]], None, None]:
+    """
+    Batch version of get_term_annotations() for an iterable (or pandas Series) of texts.
+    The terms are compiled once for all the texts. See find_dict_terms_many() for n_jobs and chunk_size.
+    :return: Generates tuples (index, list of TermAnnotation) in the order of the texts.
+    """
+    conflict_resolving_func = None
+
+    if priority_by_id:
+        conflict_resolving_func = conflicts_take_first_by_id
+
+    if priority:
+        conflict_resolving_func = conflicts_top_by_priority
+
+    # the texts are needed again for the annotation texts - by position, the index labels may repeat
+    labels = None
+    if hasattr(texts, 'items'):
+        items = list(texts.items())
+        labels = [label for label, _ in items]
+        texts = [text for _, text in items]
+    elif not isinstance(texts, Sequence):
+        texts = list(texts)
+
+    for position, dict_entries in find_dict_terms_many(texts,
+                                                    term_config_list,
+                                                    conflict_resolving_func=conflict_resolving_func,
+                                                    language=language,
+                                                    use_stemmer=use_stemmer,
+                                                    min_alias_len=min_alias_len,
+                                                    prepared_alias_black_list=prepared_alias_black_list,
+                                                    n_jobs=n_jobs,
+                                                    chunk_size=chunk_size):
+        yield (labels[position] if labels is not None else position), \
+            [_get_term_annotation(texts[position], ent) for ent in dict_entries]
+
+
+def _get_term_annotation(text: str, ent) -> TermAnnotation:
+    ant = TermAnnotation(coords=ent.coords, text=text[ent.coords[0]:ent.coords[1] + 1])
+    if ent.term[0]:
+        ant.name = ent.term[0][1]
+        ant.category = ent.term[0][2]
+        ant.alias = ent.term[0][4]
+    return ant
  
  
-def load_terms_dict_by_path(terms_fn: str, use_stemmer: bool = False):
-   
+def load_terms_dict_by_path(terms_fn: str, use_stemmer: bool = False, index_fn: str = None):
+    """
+    Load terms from a csv file with id, name, category, priority, type, english name and dutch name columns.
+    :param terms_fn:
+    :param use_stemmer:
+    :param index_fn: Optional path of a compiled dictionary index. If the index is up to date it is loaded
+    instead of the csv file (no alias normalization needed). Otherwise the csv is loaded and the index is written.
+    :return: Terms.
+    """
+    if index_fn and is_dict_index_up_to_date(index_fn, [terms_fn], use_stemmer):
+        return load_dict_index(index_fn)
+
     terms = {}
  
     import csv
@@ -130,10 +193,35 @@ def load_terms_dict_by_path(terms_fn: str, use_stemmer: bool = False):
     #                                   row['locale'],
     #                                   row['type'].startswith('iso') or row['type'] == 'abbreviation', use_stemmer = use_stemmer)
  
+    if index_fn:
+        compile_dict_index(terms.values(), index_fn, use_stemmer)
     return terms.values()
  
-def load_dict_from_df(df: pd.DataFrame, use_stemmer: bool = False):
-   
+def get_df_hash(df: pd.DataFrame) -> str:
+    """
+    Get a hash of the columns, index and values of a DataFrame.
+    :param df:
+    :return: SHA-256 hex digest.
+    """
+    df_hash = hashlib.sha256(repr(list(df.columns)).encode('utf-8'))
+    df_hash.update(pd.util.hash_pandas_object(df, index=True).values.tobytes())
+    return df_hash.hexdigest()
+
+
+def load_dict_from_df(df: pd.DataFrame, use_stemmer: bool = False, index_fn: str = None):
+    """
+    Load terms from a DataFrame with id, name, category, priority, type, english name, english alias,
+    dutch name and dutch alias columns.
+    :param df:
+    :param use_stemmer:
+    :param index_fn: Optional path of a compiled dictionary index. If the index was compiled from a DataFrame
+    with the same content (see get_df_hash()) it is loaded instead. Otherwise the index is written.
+    :return: Terms.
+    """
+    df_hash = get_df_hash(df) if index_fn else None
+    if index_fn and is_dict_index_up_to_date(index_fn, [], use_stemmer, df_hash):
+        return load_dict_index(index_fn)
+
     terms = {}
  
     for row in df.index:
@@ -170,4 +258,6 @@ def load_dict_from_df(df: pd.DataFrame, use_stemmer: bool = False):
                                     df.loc[row,'type'] == 'abbreviation', use_stemmer = use_stemmer)
        
         
+    if index_fn:
+        compile_dict_index(terms.values(), index_fn, use_stemmer, df_hash)
     return terms.values()
@@ -0,0 +1,231 @@
+import os
+import pickle
+import tempfile
+from unittest import TestCase
+
+from dnbnlp.extract.common.aho_corasick import AhoCorasickAutomaton
+from dnbnlp.extract.common.dict_index import compile_dict_index, load_dict_index, is_dict_index_up_to_date
+from dnbnlp.extract.common.dict_terms import find_dict_terms, compile_dict_terms, term_config, \
+    add_aliases_to_term, conflicts_take_first_by_id, prepare_alias_blacklist_dict, normalize_text, \
+    find_dict_terms_many, enable_normalize_text_cache, disable_normalize_text_cache, normalize_text_cache_info, \
+    term_alias
+from dnbnlp.extract.common.terms import get_df_hash, load_dict_from_df
+
+
+def _build_terms():
+    terms = []
+    for term_id, name, category, aliases, language, is_abbrev in (
+            (1, 'Solvency Capital Requirement', 'capital', 'Solvency Capital Requirement;SCR', 'en', False),
+            (2, 'Minimum Capital Requirement', 'capital', 'Minimum Capital Requirement', 'en', False),
+            (3, 'MCR', 'capital', 'MCR', 'en', True),
+            (4, 'Capital Requirement', 'capital', 'Capital Requirement', 'en', False),
+            (5, 'Solvabiliteitskapitaalvereiste', 'capital', 'solvabiliteitskapitaalvereiste', 'nl', False),
+            (6, 'Requirement', 'other', 'requirement', None, False),
+            (7, 'SCR', 'capital', 'SCR', 'en', True)):
+        term = term_config(term_id, name, category, name_is_alias=False)
+        add_aliases_to_term(term, aliases, language, is_abbrev)
+        terms.append(term)
+    return terms
+
+
+def _as_tuples(dict_terms):
+    return [(t.term[0][0], t.term[1][0], t.coords) for t in dict_terms]
+
+
+class TestAhoCorasickAutomaton(TestCase):
+    def test_overlapping_matches(self):
+        automaton = AhoCorasickAutomaton()
+        for pattern in ('he', 'she', 'his', 'hers'):
+            automaton.add_pattern(pattern)
+        matches = automaton.find_all('ushers')
+        self.assertEqual({0: [2], 1: [1], 3: [2]}, matches)
+
+    def test_duplicate_pattern(self):
+        automaton = AhoCorasickAutomaton()
+        self.assertEqual(0, automaton.add_pattern('abc'))
+        self.assertEqual(1, automaton.add_pattern('bc'))
+        self.assertEqual(0, automaton.add_pattern('abc'))
+        self.assertEqual({0: [0, 3], 1: [1, 4]}, automaton.find_all('abcabc'))
+
+
+class TestCompiledDictTerms(TestCase):
+    text = 'The Solvency Capital Requirement (SCR) and the MCR are met. ' \
+           'THE MCR IS NOT CHECKED IN UPPERCASE BLOCKS. The capital requirement of the group is higher.'
+
+    def assertSameResults(self, terms, **kwargs):
+        expected = _as_tuples(find_dict_terms(self.text, terms, **kwargs))
+        compile_kwargs = {k: v for k, v in kwargs.items() if k != 'conflict_resolving_func'}
+        automaton = compile_dict_terms(terms, **compile_kwargs)
+        actual = _as_tuples(find_dict_terms(self.text, automaton,
+                                            conflict_resolving_func=kwargs.get('conflict_resolving_func')))
+        self.assertListEqual(expected, actual)
+        return actual
+
+    def test_same_as_term_search(self):
+        res = self.assertSameResults(_build_terms())
+        found_ids = [term_id for term_id, _, _ in res]
+        self.assertIn(1, found_ids)
+        self.assertIn(4, found_ids)
+        self.assertNotIn(6, found_ids)
+
+    def test_conflicts_and_filters(self):
+        terms = _build_terms()
+        self.assertSameResults(terms, conflict_resolving_func=conflicts_take_first_by_id)
+        self.assertSameResults(terms, language='en', min_alias_len=4)
+        blacklist = prepare_alias_blacklist_dict([('Capital Requirement', 'en', False)])
+        self.assertSameResults(terms, prepared_alias_black_list=blacklist)
+
+
+class TestSourceCoords(TestCase):
+    text = 'Het  kapitaalvereiste (SCR) van de N.V. is "voldoende" volgens de Solvency Capital Requirement.'
+
+    def test_normalize_text_offsets(self):
+        for use_stemmer in (False, True):
+            normalized, offsets = normalize_text(self.text, 'nl', use_stemmer=use_stemmer, return_offsets=True)
+            self.assertEqual(normalize_text(self.text, 'nl', use_stemmer=use_stemmer), normalized)
+            self.assertEqual(len(normalized) + 1, len(offsets))
+            self.assertListEqual(sorted(offsets), list(offsets))
+            start = normalized.index('scr')
+            self.assertEqual('SCR', self.text[offsets[start]:offsets[start + 2] + 1])
+
+    def test_found_terms_source_coords(self):
+        terms = _build_terms()
+        terms.append(term_config(8, 'N.V.', 'legal', name_is_alias=True))
+        found = list(find_dict_terms(self.text, terms))
+        found_texts = {t.term[0][0]: self.text[t.coords[0]:t.coords[1] + 1] for t in found}
+        self.assertEqual('SCR', found_texts[7])
+        self.assertEqual('N.V.', found_texts[8])
+        self.assertEqual('Solvency Capital Requirement', found_texts[1])
+        nv = [t for t in found if t.term[0][0] == 8][0]
+        self.assertNotEqual(nv.coords, nv.normalized_coords)
+        compiled = list(find_dict_terms(self.text, compile_dict_terms(terms)))
+        self.assertListEqual(_as_tuples(found), _as_tuples(compiled))
+
+    def test_regex_tokenizer(self):
+        terms = _build_terms()
+        terms.append(term_config(8, 'N.V.', 'legal', name_is_alias=False))
+        terms[-1][4].append(term_alias('N.V.', 'nl', is_abbreviation=True, regex_tokenizer=True))
+        found = list(find_dict_terms(self.text, terms, language='nl', regex_tokenizer=True))
+        found_texts = {t.term[0][0]: self.text[t.coords[0]:t.coords[1] + 1] for t in found}
+        self.assertEqual('N.V.', found_texts[8])
+        compiled = compile_dict_terms(terms, language='nl', regex_tokenizer=True)
+        self.assertListEqual(_as_tuples(found), _as_tuples(find_dict_terms(self.text, compiled)))
+        self.assertListEqual([(0, _as_tuples(found))],
+                             [(index, _as_tuples(res)) for index, res in
+                              find_dict_terms_many([self.text], terms, language='nl', regex_tokenizer=True)])
+
+
+class TestNormalizeTextCache(TestCase):
+    def tearDown(self):
+        disable_normalize_text_cache()
+
+    def test_cache(self):
+        text = 'De Solvency Capital Requirement (SCR) van de N.V.'
+        expected = normalize_text(text, 'nl', use_stemmer=True)
+        expected_offsets = normalize_text(text, 'nl', return_offsets=True)
+        self.assertIsNone(normalize_text_cache_info())
+
+        enable_normalize_text_cache(maxsize=2)
+        for _ in range(3):
+            self.assertEqual(expected, normalize_text(text, 'nl', use_stemmer=True))
+        self.assertEqual(expected_offsets, normalize_text(text, 'nl', return_offsets=True))
+        # different arguments are cached separately
+        self.assertNotEqual(expected, normalize_text(text, 'nl', lowercase=False))
+        info = normalize_text_cache_info()
+        self.assertEqual(2, info.hits)
+        self.assertEqual(3, info.misses)
+        self.assertEqual(2, info.currsize)
+
+        # the offsets returned from the cache can be modified safely
+        normalize_text(text, 'nl', return_offsets=True)[1][0] = -1
+        self.assertEqual(expected_offsets, normalize_text(text, 'nl', return_offsets=True))
+
+
+class TestFindDictTermsMany(TestCase):
+    texts = ['The Solvency Capital Requirement (SCR) is met.',
+             '',
+             'De solvabiliteitskapitaalvereiste en het MCR.',
+             'Nothing to find here.'] * 5
+
+    def test_same_as_single_search(self):
+        terms = _build_terms()
+        expected = [(i, _as_tuples(find_dict_terms(text, terms, conflict_resolving_func=conflicts_take_first_by_id)))
+                    for i, text in enumerate(self.texts)]
+        for n_jobs in (1, 2):
+            actual = [(i, _as_tuples(found)) for i, found in
+                      find_dict_terms_many(iter(self.texts), terms, conflict_resolving_func=conflicts_take_first_by_id,
+                                           n_jobs=n_jobs, chunk_size=3)]
+            self.assertListEqual(expected, actual)
+
+    def test_series_index(self):
+        import pandas as pd
+        series = pd.Series(self.texts[:4], index=[10, 20, 30, 40])
+        res = list(find_dict_terms_many(series, compile_dict_terms(_build_terms())))
+        self.assertListEqual([10, 20, 30, 40], [i for i, _ in res])
+        self.assertListEqual([], res[1][1])
+
+    def test_term_annotations_duplicate_index(self):
+        import pandas as pd
+        from dnbnlp.extract.common.terms import get_term_annotations, get_term_annotations_batch
+        terms = _build_terms()
+        series = pd.Series(self.texts[:4], index=[1, 1, 2, 2])
+        res = [(i, [(a.text, a.coords) for a in ants]) for i, ants in get_term_annotations_batch(series, terms)]
+        expected = [(i, [(a.text, a.coords) for a in get_term_annotations(text, terms)])
+                    for i, text in zip(series.index, series.values)]
+        self.assertListEqual(expected, res)
+        self.assertListEqual(['SCR'], [text for text, _ in res[0][1]])
+
+
+class TestDictIndex(TestCase):
+    def test_round_trip(self):
+        terms = _build_terms()
+        terms.append(term_config('geo-1', 'Nederland', None, 3, name_is_alias=True))
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            index_fn = compile_dict_index(terms, os.path.join(tmp_dir, 'terms.idx'))
+            with load_dict_index(index_fn) as index:
+                self.assertEqual(len(terms), len(index))
+                self.assertListEqual(terms, list(index))
+                self.assertEqual(terms[-1], index[-1])
+                self.assertIn('nl', index.languages)
+                self.assertIn(None, index.languages)
+                with pickle.loads(pickle.dumps(index)) as index_copy:
+                    self.assertEqual(terms[0], index_copy[0])
+
+    def test_search_with_index(self):
+        text = TestCompiledDictTerms.text
+        terms = _build_terms()
+        expected = _as_tuples(find_dict_terms(text, compile_dict_terms(terms, language='en')))
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            index_fn = compile_dict_index(terms, os.path.join(tmp_dir, 'terms.idx'))
+            with load_dict_index(index_fn) as index:
+                actual = _as_tuples(find_dict_terms(text, compile_dict_terms(index, language='en')))
+                self.assertListEqual(expected, actual)
+                self.assertListEqual(expected, _as_tuples(find_dict_terms(text, index, language='en')))
+
+    def test_load_dict_from_df(self):
+        import pandas as pd
+        nan = float('nan')
+        df = pd.DataFrame({'id': [1, 2],
+                           'name': ['Solvency Capital Requirement', 'Minimum Capital Requirement'],
+                           'category': ['capital', 'capital'],
+                           'priority': [1.0, nan],
+                           'type': ['term', 'term'],
+                           'english name': ['solvency capital requirement', 'minimum capital requirement'],
+                           'english alias': ['SCR', nan],
+                           'dutch name': ['solvabiliteitskapitaalvereiste', 'minimumkapitaalvereiste'],
+                           'dutch alias': [nan, nan]})
+        terms = list(load_dict_from_df(df))
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            index_fn = os.path.join(tmp_dir, 'terms.idx')
+            self.assertListEqual(terms, list(load_dict_from_df(df, index_fn=index_fn)))
+            self.assertTrue(is_dict_index_up_to_date(index_fn, [], False, get_df_hash(df)))
+            with load_dict_from_df(df, index_fn=index_fn) as index:
+                self.assertListEqual(terms, list(index))
+            # a changed DataFrame compiles the index again
+            changed_df = df.assign(name=['SCR', 'MCR'])
+            self.assertNotEqual(get_df_hash(df), get_df_hash(changed_df))
+            self.assertFalse(is_dict_index_up_to_date(index_fn, [], False, get_df_hash(changed_df)))
+            changed_terms = list(load_dict_from_df(changed_df, index_fn=index_fn))
+            self.assertEqual('SCR', changed_terms[0][1])
+            with load_dict_index(index_fn) as index:
+                self.assertListEqual(changed_terms, list(index))
@@ -6,3 +6,4 @@ from .nl_language_tokens import *
 from .money import *
 from .percents import *
 from .durations import *
+from .numeric import *
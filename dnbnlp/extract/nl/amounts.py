@@ -29,13 +29,14 @@ Avoids:
 
 # Imports
 import string
-from typing import Generator
+from typing import Generator, List, Optional, Tuple
 
 import nltk
 import regex as re
 from num2words import num2words
 
 from lexnlp.extract.common.annotations.amount_annotation import AmountAnnotation
+from dnbnlp.nlp.nl.tokens import align_tokens
 
 
 # Define small numbers
@@ -277,6 +278,146 @@ def get_np(text) -> Generator:
         yield np, _np
 
 
+# Number of characters after an amount in which its unit is searched for. The window is grown while a noun phrase
+# reaches its end. Noun phrases further away are taken from the tagging of the whole document.
+UNIT_WINDOW = 200
+# Number of characters before an amount in which the currency prefix is searched for.
+PREV_UNIT_WINDOW = 32
+
+
+_POS_TAGGER = None
+
+
+def _get_pos_tagger():
+    # nltk.tag.pos_tag() loads the tagger on every call
+    global _POS_TAGGER
+    if _POS_TAGGER is None:
+        _POS_TAGGER = nltk.tag.PerceptronTagger()
+    return _POS_TAGGER
+
+
+def _get_np_spans(text) -> List[Tuple[int, int, str]]:
+    """
+    Get noun phrases of the text (same as get_np()) with their positions.
+    :param text:
+    :return: List of (start, end, noun phrase) tuples in the order of the text.
+    """
+    tokens = nltk.word_tokenize(text)
+    token_spans = align_tokens(text, tokens)
+    res = []
+    i = 0
+    for chunk in chunker.parse(_get_pos_tagger().tag(tokens)):
+        if isinstance(chunk, nltk.Tree):
+            leaves = chunk.leaves()
+            if chunk.label() == 'NP':
+                res.append((token_spans[i][0], token_spans[i + len(leaves) - 1][1],
+                            ' '.join([leaf[0] for leaf in leaves])))
+            i += len(leaves)
+        else:
+            i += 1
+    return res
+
+
+class _DocumentNps:
+    """
+    Noun phrases of the whole document for get_amount_annotations().
+    For each first token: noun phrase -> start of its last occurrence.
+    """
+
+    def __init__(self, text: str):
+        self.text = text
+        self.np_last_starts = dict()  # first token -> {noun phrase: start}
+        for start, _end, np in _get_np_spans(text):
+            self.np_last_starts.setdefault(np.split(' ', 1)[0], dict())[np] = start
+
+    def find_last_prefix_np(self, position: int, min_start: int) -> Optional[str]:
+        """
+        Find the last noun phrase starting at min_start or later which is a prefix of text[position:].
+        The first token of such a phrase is a prefix of the first word of text[position:].
+        """
+        words = self.text[position:position + UNIT_WINDOW].split(None, 1)
+        if not words:
+            return None
+        word = words[0]
+        last_start, last_np = -1, None
+        for i in range(1, len(word) + 1):
+            nps = self.np_last_starts.get(word[:i])
+            if not nps:
+                continue
+            for np, start in nps.items():
+                if start >= min_start and start > last_start and self.text.startswith(np, position):
+                    last_start, last_np = start, np
+        return last_np
+
+
+def _get_unit(text: str, position: int, document_nps: _DocumentNps) -> str:
+    """
+    Get the unit following the amount which ends at the position: the last noun phrase of text[position:]
+    which this text starts with. Only a window after the amount is tagged, the rest is taken from the tagging
+    of the whole document.
+    """
+    unit = ''
+    window = UNIT_WINDOW
+    while True:
+        next_text = text[position:position + window]
+        if position + window >= len(text):
+            for _start, _end, np in _get_np_spans(next_text):
+                if text.startswith(np, position):
+                    unit = np
+            return unit
+        half = window // 2
+        np_spans = _get_np_spans(next_text)
+        if any(start < half and end >= len(next_text) for start, end, _np in np_spans):
+            # a noun phrase may continue after the window
+            window *= 2
+            continue
+        for start, _end, np in np_spans:
+            if start < half and text.startswith(np, position):
+                unit = np
+        return document_nps.find_last_prefix_np(position, position + half) or unit
+
+
+def _get_prev_token(text: str, position: int) -> Optional[str]:
+    """
+    Get the last token of text[:position] (nltk.word_tokenize()) tokenizing only a window before the position.
+    """
+    window = PREV_UNIT_WINDOW
+    while True:
+        start = max(0, position - window)
+        tokens = nltk.word_tokenize(text[start:position])
+        # the first token of the window can be cut by the window start
+        if start == 0 or len(tokens) > 1:
+            return tokens[-1] if tokens else None
+        window *= 2
+
+
+def _parse_amount(found_item: str, float_digits=4) -> Tuple[Optional[float], str]:
+    """
+    Parse the value of a NUM_PTN_RE match.
+    :param found_item: matched text
+    :param float_digits: round float to N digits, don't round if None
+    :return: (value or None if the text is not a number, matched text with fraction symbols replaced)
+    """
+    fract_tail_items = FRACTION_TAIL_RE.finditer(found_item)
+    for fract_tail in fract_tail_items:
+        fract_tail_smb = fract_tail.group().strip(' ')
+        if fract_tail_smb in fraction_smb_to_string:
+            fract_ending = fraction_smb_to_string[fract_tail_smb]
+            found_item = found_item[:fract_tail.span()[0]]
+            found_item += fract_ending
+        break
+
+    if AND_RE.fullmatch(found_item):
+        return None, found_item
+    try:
+        amount = text2num(found_item)
+    except:
+        return None, found_item
+    if isinstance(amount, float) and float_digits:
+        amount = round(amount, float_digits)
+    return amount, found_item
+
+
 def get_amounts(text: str,
                 return_sources=False,
                 extended_sources=True,
@@ -307,43 +448,26 @@ def get_amount_annotations(text: str,
     :param float_digits: round float to N digits, don't round if None
     :return: list of amounts
     """
+    document_nps = None
     for match in NUM_PTN_RE.finditer(text):
-        found_item = match.group()
-        fract_tail_items = FRACTION_TAIL_RE.finditer(found_item)
-        for fract_tail in fract_tail_items:
-            fract_tail_smb = fract_tail.group().strip(' ')
-            if fract_tail_smb in fraction_smb_to_string:
-                fract_ending = fraction_smb_to_string[fract_tail_smb]
-                found_item = found_item[:fract_tail.span()[0]]
-                found_item += fract_ending
-            break
-
-        if AND_RE.fullmatch(found_item):
-            continue
-        try:
-            amount = text2num(found_item)
-        except:
-            continue
+        amount, found_item = _parse_amount(match.group(), float_digits)
         if amount is None:
             continue
-        if isinstance(amount, float) and float_digits:
-            amount = round(amount, float_digits)
 
         if extended_sources:
+            # Only windows around the match are tokenized/tagged - not the whole rest and start of the document.
             unit = ''
-            next_text = text[match.span()[1]:]
-            if next_text:
-                for np, _ in get_np(next_text):
-                    if next_text.startswith(np):
-                        unit = np
+            if match.span()[1] < len(text):
+                if document_nps is None:
+                    document_nps = _DocumentNps(text)
+                unit = _get_unit(text, match.span()[1], document_nps)
                 if unit:
                     found_item = ' '.join([found_item.strip(), unit])
             if not unit:
-                prev_text = text[:match.span()[0]]
-                prev_text_tags = nltk.word_tokenize(prev_text)
-                if prev_text_tags and prev_text_tags[-1].lower() in allowed_prev_units:
+                prev_token = _get_prev_token(text, match.span()[0])
+                if prev_token and prev_token.lower() in allowed_prev_units:
                     sep = ' ' if text[match.span()[0] - 1] == ' ' else ''
-                    found_item = sep.join([prev_text_tags[-1], found_item.rstrip()])
+                    found_item = sep.join([prev_token, found_item.rstrip()])
 
             ant = AmountAnnotation(coords=match.span(),
                                    value=amount,
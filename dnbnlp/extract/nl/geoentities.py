@@ -13,6 +13,8 @@ from lexnlp.config.en import geoentities_config
 from lexnlp.extract.en.dict_entities import find_dict_entities, conflicts_take_first_by_id, \
     prepare_alias_blacklist_dict, conflicts_top_by_priority, entity_config, add_aliases_to_entity
 
+from dnbnlp.extract.common.dict_index import compile_dict_index, load_dict_index, is_dict_index_up_to_date
+
 __author__ = "ContraxSuite, LLC; LexPredict, LLC"
 __copyright__ = "Copyright 2015-2019, ContraxSuite, LLC"
 __license__ = "https://github.com/LexPredict/lexpredict-lexnlp/blob/master/LICENSE"
@@ -109,7 +111,19 @@ def get_geoentity_annotations(text: str,
         yield ant
 
 
-def load_entities_dict_by_path(entities_fn: str, aliases_fn: str):
+def load_entities_dict_by_path(entities_fn: str, aliases_fn: str, index_fn: str = None):
+    """
+    Load geo entities and their aliases from csv files.
+    :param entities_fn:
+    :param aliases_fn:
+    :param index_fn: Optional path of a compiled dictionary index. If the index is up to date it is loaded
+    instead of the csv files (no alias normalization needed). Otherwise the csv files are loaded and the index
+    is written.
+    :return: Entities.
+    """
+    if index_fn and is_dict_index_up_to_date(index_fn, [entities_fn, aliases_fn]):
+        return load_dict_index(index_fn)
+
     entities = {}
     import csv
 
@@ -129,4 +143,6 @@ def load_entities_dict_by_path(entities_fn: str, aliases_fn: str):
                                       row['locale'],
                                       row['type'].startswith('iso') or row['type'] == 'abbreviation')
 
+    if index_fn:
+        compile_dict_index(entities.values(), index_fn)
     return entities.values()
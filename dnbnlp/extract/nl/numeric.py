@@ -0,0 +1,159 @@
+"""Numeric expression extraction for Dutch.
+
+This module finds amounts, money, percents and durations in a single pass over the text.
+The number candidates are found with the NUM_PTN_RE pattern of the amounts module and each candidate is parsed
+once. Then it is classified by the text around it:
+- currency symbol / prefix before the number or currency token / abbreviation after it: money
+- percent unit after the number: percent
+- duration unit after the number: duration
+
+Compared with running get_amount_annotations(), get_money_annotations(), get_percent_annotations()
+and get_duration_annotations() one after another, the text is scanned with the number pattern once,
+it is not lowercased and the found numbers are not parsed again.
+Money amounts found by the trigger words of the money module ("prijs ... 100") are not supported.
+"""
+
+# Imports
+import string
+from typing import Generator, Optional, Tuple, Union
+
+import regex as re
+
+from lexnlp.extract.common.annotations.amount_annotation import AmountAnnotation
+from lexnlp.extract.common.annotations.duration_annotation import DurationAnnotation
+from lexnlp.extract.common.annotations.money_annotation import MoneyAnnotation
+from lexnlp.extract.common.annotations.percent_annotation import PercentAnnotation
+from lexnlp.extract.en.ratios import get_ratio_annotations
+
+from dnbnlp.extract.nl.amounts import NUM_PTN_RE, CURRENCY_SYMBOL_MAP, CURRENCY_PREFIX_MAP, _parse_amount
+from dnbnlp.extract.nl.money import CURRENCY_TOKEN_MAP, CURRENCY_ABBR_LIST, CURRENCY_PREFIXES, DEFAULT_CURRENCY
+from dnbnlp.extract.nl.percents import PERCENT_UNIT_MAP, PERCENT_UNIT_LIST
+from dnbnlp.extract.nl.durations import NlDurationParser
+
+# Number of characters around the number searched for the units
+UNIT_CONTEXT = 32
+
+CURRENCY_PREFIX_RE = re.compile(r'(?:{currency_prefixes}|[{currency_symbols}])\s*$'.format(
+    currency_prefixes='|'.join(CURRENCY_PREFIXES),
+    currency_symbols=''.join([re.escape(i) for i in CURRENCY_SYMBOL_MAP])), re.IGNORECASE)
+
+CURRENCY_POSTFIX_RE = re.compile(r'\s*({currency_tokens}|{currency_abbreviations})(?:\W|$)'.format(
+    currency_tokens='|'.join([i.replace(' ', '\\s+') for i in CURRENCY_TOKEN_MAP]),
+    currency_abbreviations='|'.join(CURRENCY_ABBR_LIST)), re.IGNORECASE)
+
+PERCENT_UNIT_RE = re.compile(r'[\s\)]*({percent_units})(?:\W|$)'.format(
+    percent_units='|'.join([re.escape(i) for i in PERCENT_UNIT_LIST])), re.IGNORECASE)
+
+DURATION_UNIT_RE = re.compile(r'(?:\s*(?:kalender))?[\s-]*({duration_list})s?(?=\W|$)'.format(
+    duration_list=NlDurationParser.duration_items_joined), re.IGNORECASE)
+
+# written numbers can be matched with the preceding "en": "drie jaar en twee maanden"
+LEADING_CONJUNCTION_RE = re.compile(r'en\s+', re.IGNORECASE)
+
+NumericAnnotation = Union[AmountAnnotation, MoneyAnnotation, PercentAnnotation, DurationAnnotation]
+
+
+def _get_number_bounds(text: str, start: int, end: int) -> Tuple[int, int]:
+    """
+    Get the bounds of the number itself in a NUM_PTN_RE match - without the delimiters it captures around.
+    """
+    while start < end and not (text[start].isalnum() or text[start] == '.'):
+        start += 1
+    conjunction = LEADING_CONJUNCTION_RE.match(text, start, end)
+    if conjunction:
+        start = conjunction.end()
+    while end > start and not text[end - 1].isalnum():
+        end -= 1
+    return start, end
+
+
+def _get_money_annotation(text: str, start: int, end: int, amount: float) -> Optional[MoneyAnnotation]:
+    prefix = CURRENCY_PREFIX_RE.search(text, max(0, start - UNIT_CONTEXT), start)
+    if prefix:
+        prefix_text = prefix.group().strip().lower()
+        currency = CURRENCY_SYMBOL_MAP.get(prefix_text) \
+            or CURRENCY_PREFIX_MAP.get(prefix_text) \
+            or prefix_text.upper()
+        ant_start, ant_end = prefix.start(), end
+    else:
+        postfix = CURRENCY_POSTFIX_RE.match(text, end, end + UNIT_CONTEXT)
+        if not postfix:
+            return None
+        postfix_text = postfix.group(1)
+        currency = CURRENCY_TOKEN_MAP.get(postfix_text.lower()) or postfix_text.upper()
+        ant_start, ant_end = start, postfix.end(1)
+    return MoneyAnnotation(coords=(ant_start, ant_end),
+                           amount=amount,
+                           text=text[ant_start:ant_end].strip(string.punctuation.replace('$', '') +
+                                                              string.whitespace),
+                           currency=currency or DEFAULT_CURRENCY)
+
+
+def _get_percent_annotation(text: str, start: int, end: int, amount: Optional[float],
+                            float_digits=4) -> Optional[PercentAnnotation]:
+    unit = PERCENT_UNIT_RE.match(text, end, end + UNIT_CONTEXT)
+    if not unit:
+        return None
+    if amount is None:
+        # the number may be a ratio - "1/3 procent"
+        ratios = list(get_ratio_annotations(text[start:end], float_digits=float_digits))
+        if len(ratios) != 1:
+            return None
+        amount = ratios[0].ratio
+    sign = unit.group(1).lower()
+    fraction = PERCENT_UNIT_MAP[sign] * amount
+    if float_digits:
+        fraction = round(fraction, float_digits)
+    return PercentAnnotation(coords=(start, unit.end(1)),
+                             text=text[start:unit.end(1)],
+                             amount=amount,
+                             fraction=fraction,
+                             sign=sign)
+
+
+def _get_duration_annotation(text: str, start: int, end: int, amount: float) -> Optional[DurationAnnotation]:
+    unit = DURATION_UNIT_RE.match(text, end, end + UNIT_CONTEXT)
+    if not unit:
+        return None
+    duration_type = unit.group(1).lower()
+    duration_days = NlDurationParser.DURATION_MAP[NlDurationParser.DURATION_TRANSLATION_MAP[duration_type]] * amount
+    return DurationAnnotation(coords=(start, unit.end()),
+                              amount=amount,
+                              duration_type=duration_type,
+                              duration_days=duration_days,
+                              text=text[start:unit.end()])
+
+
+def get_numeric_annotations(text: str, float_digits=4) -> Generator[NumericAnnotation, None, None]:
+    """
+    Find amounts, money, percents and durations in the text in a single pass.
+    For each found number an AmountAnnotation (the same as get_amount_annotations() with extended_sources=False
+    would return) is generated, followed by a MoneyAnnotation, PercentAnnotation or DurationAnnotation if the number
+    has a currency, percent or duration unit.
+    :param text: text
+    :param float_digits: round float to N digits, don't round if None
+    :return: annotations in the order of the text
+    """
+    for match in NUM_PTN_RE.finditer(text):
+        amount, _ = _parse_amount(match.group(), float_digits)
+        start, end = _get_number_bounds(text, match.start(), match.end())
+        if amount is not None:
+            yield AmountAnnotation(coords=match.span(),
+                                   value=amount,
+                                   text=match.group())
+            money = _get_money_annotation(text, start, end, amount)
+            if money:
+                yield money
+                continue
+        elif start == end:
+            continue
+
+        percent = _get_percent_annotation(text, start, end, amount, float_digits)
+        if percent:
+            yield percent
+            continue
+
+        if amount is not None:
+            duration = _get_duration_annotation(text, start, end, amount)
+            if duration:
+                yield duration
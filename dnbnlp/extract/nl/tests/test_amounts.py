@@ -95,6 +95,15 @@ class TestGetAmounts(AssertionMixin):
         self.assertEqual(30, ants[1].value)
         self.assertEqual(text.find(' dertig'), ants[1].coords[0])
 
+    def test_extended_sources_long_text(self):
+        sentence = 'Het volume bedraagt 10 liter en kost € 30. '
+        self.assertEqual(['10 liter', '€ 30.'], [ant.text for ant in get_amount_annotations(sentence)])
+        # units are searched near each amount only - the same as for a short text
+        expected = [ant.text for ant in get_amount_annotations(sentence * 2)]
+        ants = list(get_amount_annotations(sentence * 100))
+        self.assertEqual(200, len(ants))
+        self.assertListEqual(expected[:2] * 99 + expected[2:], [ant.text for ant in ants])
+
     # def test_file_samples(self):
     #     tester = TypedAnnotationsTester()
     #     tester.test_and_raise_errors(
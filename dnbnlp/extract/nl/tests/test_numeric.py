@@ -0,0 +1,37 @@
+from unittest import TestCase
+
+from lexnlp.extract.common.annotations.amount_annotation import AmountAnnotation
+from lexnlp.extract.common.annotations.duration_annotation import DurationAnnotation
+from lexnlp.extract.common.annotations.money_annotation import MoneyAnnotation
+from lexnlp.extract.common.annotations.percent_annotation import PercentAnnotation
+
+from dnbnlp.extract.nl.amounts import get_amount_annotations
+from dnbnlp.extract.nl.numeric import get_numeric_annotations
+
+
+class TestGetNumericAnnotations(TestCase):
+    text = 'De ratio is 185,3% (2018: 176,1 procent) en het kapitaal steeg met € 1.234,5 tot 12.345 euro ' \
+           'in 3 jaar en twee maanden.'
+
+    def _get(self, ant_type):
+        return [ant for ant in get_numeric_annotations(self.text) if isinstance(ant, ant_type)]
+
+    def test_amounts(self):
+        expected = [(ant.coords, ant.value) for ant in get_amount_annotations(self.text, extended_sources=False)]
+        self.assertListEqual(expected, [(ant.coords, ant.value) for ant in self._get(AmountAnnotation)])
+
+    def test_money(self):
+        ants = self._get(MoneyAnnotation)
+        self.assertListEqual([(1234.5, 'EUR', '€ 1.234,5'), (12345, 'EUR', '12.345 euro')],
+                             [(ant.amount, ant.currency, ant.text) for ant in ants])
+        self.assertEqual('€ 1.234,5', self.text[ants[0].coords[0]:ants[0].coords[1]])
+
+    def test_percents(self):
+        ants = self._get(PercentAnnotation)
+        self.assertListEqual([(185.3, 1.853, '%', '185,3%'), (176.1, 1.761, 'procent', '176,1 procent')],
+                             [(ant.amount, ant.fraction, ant.sign, ant.text) for ant in ants])
+
+    def test_durations(self):
+        ants = self._get(DurationAnnotation)
+        self.assertListEqual([(3, 'jaar', 3 * 365, '3 jaar'), (2, 'maanden', 60, 'twee maanden')],
+                             [(ant.amount, ant.duration_type, ant.duration_days, ant.text) for ant in ants])
@@ -7,17 +7,18 @@ machine learning classifiers.
 # Imports
 import os
 import string
-from typing import Generator
+from typing import Generator, List
 
 # Packages
 import pandas
-import sklearn.ensemble
-from sklearn.externals import joblib
 
 # Project
 from lexnlp.nlp.en.segments.utils import build_document_line_distribution
 from lexnlp.utils.decorators import safe_failure
 from lexnlp.utils.unicode.unicode_lookup import UNICODE_CHAR_TOP_CATEGORY_MAPPING
+from dnbnlp.nlp.en.segments.training import build_training_data
+from dnbnlp.nlp.en.segments.tree_ensemble import export_tree_ensemble, load_tree_ensemble
+from dnbnlp.nlp.en.segments.utils import build_document_line_features, iter_document_heads, predict_proba_batch
 
 import re
 
@@ -25,7 +26,7 @@ import re
 MODULE_PATH = os.path.dirname(os.path.abspath(__file__))
 
 # Load segmenters
-SECTION_SEGMENTER_MODEL = joblib.load(os.path.join(MODULE_PATH, "./solvency2_document_year_locator.pickle"))
+SECTION_SEGMENTER_MODEL = load_tree_ensemble(os.path.join(MODULE_PATH, "./solvency2_document_year_locator.pickle"))
 
 
 def build_document_year_features(lines, line_id, line_window_pre, line_window_post, characters=string.printable,
@@ -131,89 +132,42 @@ def build_document_year_features(lines, line_id, line_window_pre, line_window_po
     return feature_vector
 
 
-def build_document_document_year_features(text, window_pre=3, window_post=3):
+def build_document_document_year_features(text, window_pre=3, window_post=3, doc_distribution=None):
     """
-    Get a document year given file text.
+    Get the document year feature DataFrame of all lines given file text.
+    Same as the build_document_year_features() vectors of all lines, built for the whole document at once.
+    :param doc_distribution: document features, build_document_line_distribution(text) if None - pass the
+    distribution of the whole document when text is only its head
     """
     # Get document character distribution
-    doc_distribution = build_document_line_distribution(text)
-
-    # Parse all lines
-    lines = text.splitlines()
-    feature_data = []
-
-    for line_id in range(len(lines)):
-        feature_data.append(build_document_year_features(lines, line_id, window_pre, window_post, include_doc=doc_distribution))
+    if doc_distribution is None:
+        doc_distribution = build_document_line_distribution(text)
 
     # Get feature DF
-    feature_df = pandas.DataFrame(feature_data).fillna(-1).astype(int)
-    return feature_df
+    return build_document_line_features(text.splitlines(), window_pre, window_post, include_doc=doc_distribution)
 
 
-def build_model(training_file_path, data_path):
+def build_model(training_file_path, data_path, n_jobs=1, cache_path=None):
     """
     Build a document year extraction model given a training file path.
 
     :param training_file_path:
+    :param data_path: directory of the training files
+    :param n_jobs: number of processes building the features, see build_training_data()
+    :param cache_path: directory of the cached features of the training files, no caching if None
     :return:
     """
-    import requests
-    import numpy
+    import sklearn.ensemble
+    from sklearn.externals import joblib
 
     # Read document year training data
     training_data = pandas.read_csv(training_file_path, encoding="utf-8", low_memory=False)
     training_data = training_data.loc[-training_data["Line Number"].isnull(), :]
-    training_data.head()
-
-    # All data
-    all_feature_list = []
-    all_target_list = []
-    all_file_lines = []
-
-    # Build training data
-    for _, row in training_data.iterrows():
-        # Download file
-        file_name = row["File"]
-
-        file = open(os.path.join(data_path, file_name), "rb")
-        file_text = file.read().decode('utf-8')
-        file.close()
-
-        file_text = file_text.replace('\uf0b7', "")
-        file_text = file_text.replace('\uf0a7', "")
-        file_text = file_text.replace('\uf0fc', "")
-        file_text = file_text.replace('\uf00c', "")
-        file_text = file_text.replace('\uf00d', "")
-        file_text = file_text.replace('\uf020', "")
-        file_lines = file_text.splitlines()
-
-        # Get features and target for model
-        feature_data = build_document_document_year_features(file_text)
-        target_data = pandas.Series(numpy.zeros((feature_data.shape[0],)))
-
-        # Parse line numbers
-        if "-" in str(row["Line Number"]):
-            target_line_ranges = row["Line Number"].split("-")
-            target_lines = list(range(int(target_line_ranges[0]),
-                                      int(target_line_ranges[1]) + 1))
-        else:
-            target_lines = [int(row["Line Number"])]
-
-#        if len(target_lines) > 2:
-#            continue
-
-        for target_line_num in target_lines:
-            if len(file_lines[target_line_num - 1].strip()) > 0:
-                target_data.iloc[target_line_num - 1] = 1
 
-        # Append
-        all_feature_list.append(feature_data)
-        all_target_list.append(target_data)
-        all_file_lines.extend((row["File"], l) for l in file_lines)
-
-    # Collate
-    all_feature_df = pandas.concat(all_feature_list, axis=0)
-    all_target_df = pandas.concat(all_target_list, axis=0)
+    # Get features and target for model
+    all_feature_df, all_target_df = build_training_data(training_data, data_path,
+                                                        build_document_document_year_features,
+                                                        n_jobs=n_jobs, cache_path=cache_path)
 
     # Build final model
     model = sklearn.ensemble.ExtraTreesClassifier(n_estimators=25)
@@ -221,24 +175,73 @@ def build_model(training_file_path, data_path):
 
     # Save production model
     joblib.dump(model, os.path.join(MODULE_PATH, "solvency2_document_year_locator.pickle"))
+    export_tree_ensemble(model, os.path.join(MODULE_PATH, "solvency2_document_year_locator.npz"))
 
 
 #@safe_failure
-def get_document_years(text, window_pre=3, window_post=3, score_threshold=0.5) -> Generator:
+def get_document_years(text, window_pre=3, window_post=3, score_threshold=0.5, max_lines=None,
+                       max_pages=None) -> Generator:
     """
     Get document_years from text.
     :param text:
     :param window_pre:
     :param window_post:
     :param score_threshold:
+    :param max_lines: only score the first max_lines lines, doubled while no line passes score_threshold
+    :param max_pages: only score the first max_pages pages, doubled while no line passes score_threshold
     :return:
     """
+    document_years = []
+    # The document features are the features of the whole document, also when only its head is scored
+    doc_distribution = build_document_line_distribution(text)
+    for head in iter_document_heads(text, max_lines, max_pages, min_lines=window_pre + window_post + 1):
+        # Get features and target for model
+        feature_data = build_document_document_year_features(head, window_pre, window_post, doc_distribution)
+        document_years = list(get_document_years_from_features(head, feature_data, score_threshold))
+        if document_years:
+            break
+    yield from document_years
 
-    # Get features and target for model
-    feature_data = build_document_document_year_features(text, window_pre, window_post)
 
+def get_document_years_from_features(text, feature_data, score_threshold=0.5) -> Generator:
+    """
+    Get document_years from text given the line features built by build_document_document_year_features().
+    :param text:
+    :param feature_data:
+    :param score_threshold:
+    :return:
+    """
     # Predict document year lines
     predicted_lines = SECTION_SEGMENTER_MODEL.predict_proba(feature_data)
+    yield from get_document_years_from_predictions(text, predicted_lines, score_threshold)
+
+
+def get_document_years_batch(texts, window_pre=3, window_post=3, score_threshold=0.5, n_jobs=None) -> List[List[str]]:
+    """
+    Get document_years from many texts.
+    The feature rows of all texts are predicted in one predict_proba() call, see predict_proba_batch().
+    :param texts:
+    :param window_pre:
+    :param window_post:
+    :param score_threshold:
+    :param n_jobs: number of jobs of the model prediction, the n_jobs of the model if None
+    :return: list of document_years for each text
+    """
+    texts = list(texts)
+    feature_data = [build_document_document_year_features(text, window_pre, window_post) for text in texts]
+    predicted_lines = predict_proba_batch(SECTION_SEGMENTER_MODEL, feature_data, n_jobs)
+    return [list(get_document_years_from_predictions(text, text_predicted_lines, score_threshold))
+            for text, text_predicted_lines in zip(texts, predicted_lines)]
+
+
+def get_document_years_from_predictions(text, predicted_lines, score_threshold=0.5) -> Generator:
+    """
+    Get document_years from text given the predict_proba() result of its line features.
+    :param text:
+    :param predicted_lines:
+    :param score_threshold:
+    :return:
+    """
     predicted_df = pandas.DataFrame(predicted_lines, columns=["prob_false", "prob_true"])
     document_year_lines = predicted_df.loc[predicted_df["prob_true"] >= score_threshold, :].index.tolist()
 
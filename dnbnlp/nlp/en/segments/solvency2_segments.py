@@ -0,0 +1,53 @@
+"""Document segmentation for English Solvency II reports.
+
+This module locates the titles and the document years of a report in one go. The title and the document year
+models use the same line features, so the features are built once and both models predict on the same matrix.
+With max_lines / max_pages only the head of the document is scored.
+"""
+
+# Imports
+from typing import Dict, List
+
+# Project
+from lexnlp.nlp.en.segments.utils import build_document_line_distribution
+from dnbnlp.nlp.en.segments.solvency2_titles import build_document_title_features, get_titles_from_features
+from dnbnlp.nlp.en.segments.solvency2_document_year import get_document_years_from_features
+from dnbnlp.nlp.en.segments.utils import iter_document_heads
+
+
+def build_document_segment_features(text, window_pre=3, window_post=3, doc_distribution=None):
+    """
+    Get the line feature DataFrame shared by the title and the document year models.
+    :param text:
+    :param window_pre:
+    :param window_post:
+    :param doc_distribution: document features, see build_document_title_features()
+    :return:
+    """
+    return build_document_title_features(text, window_pre, window_post, doc_distribution)
+
+
+def get_document_segments(text, window_pre=3, window_post=3, title_score_threshold=0.5,
+                          document_year_score_threshold=0.5, max_lines=None, max_pages=None) -> Dict[str, List[str]]:
+    """
+    Get titles and document years from text.
+    Same as list(get_titles()) and list(get_document_years()), with the features built only once.
+    :param text:
+    :param window_pre:
+    :param window_post:
+    :param title_score_threshold:
+    :param document_year_score_threshold:
+    :param max_lines: only score the first max_lines lines, doubled while no titles or no document years are found
+    :param max_pages: only score the first max_pages pages, doubled while no titles or no document years are found
+    :return: dict with "titles" and "document_years" lists
+    """
+    segments = {}
+    doc_distribution = build_document_line_distribution(text)
+    for head in iter_document_heads(text, max_lines, max_pages, min_lines=window_pre + window_post + 1):
+        feature_data = build_document_segment_features(head, window_pre, window_post, doc_distribution)
+        segments = {"titles": list(get_titles_from_features(head, feature_data, title_score_threshold)),
+                    "document_years": list(get_document_years_from_features(head, feature_data,
+                                                                             document_year_score_threshold))}
+        if segments["titles"] and segments["document_years"]:
+            break
+    return segments
@@ -0,0 +1,94 @@
+from unittest import TestCase
+
+from lexnlp.nlp.en.segments.utils import build_document_line_distribution
+
+from dnbnlp.nlp.en.segments.solvency2_document_year import get_document_years, get_document_years_batch
+from dnbnlp.nlp.en.segments.solvency2_segments import get_document_segments
+from dnbnlp.nlp.en.segments.solvency2_titles import build_document_title_features, get_titles, get_titles_batch
+from dnbnlp.nlp.en.segments.utils import get_document_head
+
+
+class TestGetDocumentSegments(TestCase):
+    text = '\n'.join(['Solvency and Financial Condition Report 2018',
+                      '',
+                      'Insurance Company N.V.',
+                      '',
+                      'Contents',
+                      'A. Business and performance',
+                      'B. System of governance',
+                      'C. Risk profile'])
+    # the models score these short fixtures well below the default threshold of 0.5
+    title_score_threshold = 0.3
+    document_year_score_threshold = 0.15
+
+    def test_same_as_separate_models(self):
+        segments = get_document_segments(self.text, title_score_threshold=self.title_score_threshold,
+                                         document_year_score_threshold=self.document_year_score_threshold)
+        self.assertTrue(segments["titles"])
+        self.assertListEqual(['2018'], segments["document_years"])
+        self.assertListEqual(list(get_titles(self.text, score_threshold=self.title_score_threshold)),
+                             segments["titles"])
+        self.assertListEqual(list(get_document_years(self.text, score_threshold=self.document_year_score_threshold)),
+                             segments["document_years"])
+
+    def get_segments(self, text, **kwargs):
+        return get_document_segments(text, title_score_threshold=self.title_score_threshold,
+                                     document_year_score_threshold=self.document_year_score_threshold, **kwargs)
+
+    def test_document_head(self):
+        segments = self.get_segments(self.text)
+        self.assertTrue(segments["titles"])
+        self.assertDictEqual(segments, self.get_segments(self.text, max_lines=2))
+        self.assertListEqual(segments["document_years"], list(get_document_years(
+            self.text, score_threshold=self.document_year_score_threshold, max_pages=1)))
+
+    def test_short_head(self):
+        # heads of 1, 2 and 4 lines are shorter than the feature window of 7 lines and skipped
+        segments = self.get_segments(self.text)
+        self.assertTrue(segments["titles"])
+        self.assertDictEqual(segments, self.get_segments(self.text, max_lines=1))
+
+    def test_head_doubled(self):
+        body = ['the solvency ratio of the company is well above the regulatory minimum,',
+                'the board monitors the ratio each quarter and reports it to the regulator,',
+                'the risk appetite of the company is set by the board of directors,',
+                'the investments of the company are managed by an external manager,']
+        text = '\n'.join(['', ''] + body * 3 + ['', '', 'Insurance Company N.V.', '', ''] + body)
+        threshold = self.title_score_threshold
+        # the title on line 16 is past the first head of 8 lines and only found after the head doubles twice
+        self.assertListEqual([], list(get_titles(get_document_head(text, max_lines=16), score_threshold=threshold)))
+        self.assertListEqual(['Insurance Company N.V.'], list(get_titles(text, score_threshold=threshold)))
+        self.assertListEqual(['Insurance Company N.V.'],
+                             list(get_titles(text, score_threshold=threshold, max_lines=8)))
+
+    def test_head_document_features(self):
+        head = '\n'.join(self.text.splitlines()[:7])
+        doc_distribution = build_document_line_distribution(self.text)
+        head_features = build_document_title_features(head, doc_distribution=doc_distribution)
+        doc_columns = list(doc_distribution)
+        self.assertTrue((head_features[doc_columns].values ==
+                         build_document_title_features(self.text)[doc_columns].values[:7]).all())
+
+
+class TestBatch(TestCase):
+    # the second document starts with blank lines and has no document year hits
+    texts = [TestGetDocumentSegments.text,
+             '\n'.join(['', ''] + TestGetDocumentSegments.text.splitlines()[2:]),
+             TestGetDocumentSegments.text.replace('2018', '2019')]
+    title_score_threshold = TestGetDocumentSegments.title_score_threshold
+    document_year_score_threshold = TestGetDocumentSegments.document_year_score_threshold
+
+    def test_same_as_per_document(self):
+        titles = [list(get_titles(text, score_threshold=self.title_score_threshold)) for text in self.texts]
+        self.assertTrue(all(titles))
+        self.assertListEqual(titles, get_titles_batch(self.texts, score_threshold=self.title_score_threshold))
+        self.assertListEqual(titles, get_titles_batch(self.texts, score_threshold=self.title_score_threshold,
+                                                      n_jobs=2))
+
+    def test_aligned_with_documents(self):
+        expected = [['2018'], [], ['2019']]
+        threshold = self.document_year_score_threshold
+        self.assertListEqual(expected, [list(get_document_years(text, score_threshold=threshold))
+                                        for text in self.texts])
+        self.assertListEqual(expected, get_document_years_batch(self.texts, score_threshold=threshold, n_jobs=1))
+        self.assertListEqual(expected, get_document_years_batch(self.texts, score_threshold=threshold, n_jobs=2))
@@ -0,0 +1,38 @@
+import os
+import tempfile
+from unittest import TestCase
+
+import pandas
+import pandas.testing
+
+from dnbnlp.nlp.en.segments.training import build_training_data, parse_line_numbers
+
+
+def count_lines(text):
+    return pandas.DataFrame({"n_chars": [len(line) for line in text.splitlines()]})
+
+
+class TestBuildTrainingData(TestCase):
+    files = {"a.txt": "Company\nSOLVENCY AND FINANCIAL CONDITION REPORT\n\n2018",
+             "b.txt": "Company\nRegular\nSupervisory Report\nContents"}
+
+    def test_build_training_data(self):
+        training_data = pandas.DataFrame({"File": ["a.txt", "b.txt"], "Line Number": ["2-3", "3"]})
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            for file_name, text in self.files.items():
+                with open(os.path.join(tmp_dir, file_name), "w", encoding="utf-8") as file:
+                    file.write(text)
+            cache_path = os.path.join(tmp_dir, "cache")
+            feature_df, target = build_training_data(training_data, tmp_dir, count_lines, cache_path=cache_path)
+            self.assertEqual(2, len(os.listdir(cache_path)))
+            cached_feature_df, cached_target = build_training_data(training_data, tmp_dir, count_lines, n_jobs=2,
+                                                                   cache_path=cache_path)
+
+        self.assertListEqual([7, 39, 0, 4, 7, 7, 18, 8], feature_df["n_chars"].tolist())
+        self.assertListEqual([0, 1, 0, 0, 0, 0, 1, 0], target.tolist())
+        pandas.testing.assert_frame_equal(feature_df, cached_feature_df)
+        pandas.testing.assert_series_equal(target, cached_target)
+
+    def test_parse_line_numbers(self):
+        self.assertListEqual([3], parse_line_numbers(3.0))
+        self.assertListEqual([2, 3, 4], parse_line_numbers("2-4"))
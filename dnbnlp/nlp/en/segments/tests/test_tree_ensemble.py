@@ -0,0 +1,42 @@
+import os
+import tempfile
+from unittest import TestCase
+
+import numpy
+import sklearn.ensemble
+
+from dnbnlp.nlp.en.segments.tree_ensemble import TreeEnsemble, export_tree_ensemble, load_tree_ensemble
+
+
+class TestTreeEnsemble(TestCase):
+    def setUp(self):
+        random_state = numpy.random.RandomState(0)
+        self.X = random_state.randint(-1, 40, (500, 20))
+        self.y = (self.X[:, 0] + self.X[:, 3] > random_state.randint(0, 80, 500)).astype(int)
+        self.X_test = random_state.randint(-1, 40, (200, 20))
+
+    def test_same_as_sklearn(self):
+        for model_class in (sklearn.ensemble.ExtraTreesClassifier, sklearn.ensemble.RandomForestClassifier):
+            model = model_class(n_estimators=10, random_state=0).fit(self.X, self.y)
+            tree_ensemble = TreeEnsemble.from_sklearn(model)
+            numpy.testing.assert_allclose(model.predict_proba(self.X_test), tree_ensemble.predict_proba(self.X_test))
+            numpy.testing.assert_array_equal(model.predict(self.X_test), tree_ensemble.predict(self.X_test))
+
+    def test_export_load(self):
+        model = sklearn.ensemble.ExtraTreesClassifier(n_estimators=10, random_state=0).fit(self.X, self.y)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            export_tree_ensemble(model, os.path.join(tmp_dir, "model.npz"))
+            tree_ensemble = load_tree_ensemble(os.path.join(tmp_dir, "model.pickle"))
+        self.assertIsInstance(tree_ensemble, TreeEnsemble)
+        numpy.testing.assert_allclose(model.predict_proba(self.X_test), tree_ensemble.predict_proba(self.X_test))
+        with self.assertRaises(ValueError):
+            tree_ensemble.predict_proba(self.X_test[:, :5])
+
+    def test_n_jobs(self):
+        model = sklearn.ensemble.ExtraTreesClassifier(n_estimators=10, random_state=0).fit(self.X, self.y)
+        tree_ensemble = TreeEnsemble.from_sklearn(model)
+        expected = tree_ensemble.predict_proba(self.X_test)
+        for n_jobs in (2, 3, -1):
+            tree_ensemble.n_jobs = n_jobs
+            numpy.testing.assert_array_equal(expected, tree_ensemble.predict_proba(self.X_test))
+        self.assertEqual((0, 2), tree_ensemble.predict_proba(self.X_test[:0]).shape)
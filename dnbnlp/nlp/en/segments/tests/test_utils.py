@@ -0,0 +1,96 @@
+from unittest import TestCase
+
+import numpy
+import pandas
+import pandas.testing
+
+from lexnlp.nlp.en.segments.utils import build_document_line_distribution
+
+from dnbnlp.nlp.en.segments.solvency2_titles import build_title_features
+from dnbnlp.nlp.en.segments.utils import build_document_line_features, get_document_head, iter_document_heads, \
+    predict_proba_batch
+
+
+class TestBuildDocumentLineFeatures(TestCase):
+    text = '\n'.join(['SOLVENCY AND FINANCIAL CONDITION REPORT',
+                      '',
+                      'Insurance Company N.V.',
+                      'For the year ended 31 December 2018',
+                      '   ',
+                      'Contents',
+                      'A. Business and performance – 12,3 %',
+                      'Own Risk and Solvency Assessment (ORSA)',
+                      'B. System of governance\tpage 7',
+                      'Regular Supervisory Report éè 2019'])
+
+    def get_expected(self, lines, window_pre, window_post, include_doc):
+        feature_data = [build_title_features(lines, line_id, window_pre, window_post, include_doc=include_doc)
+                        for line_id in range(len(lines))]
+        return pandas.DataFrame(feature_data).fillna(-1).astype(int)
+
+    def test_same_features(self):
+        doc_distribution = build_document_line_distribution(self.text)
+        lines = self.text.splitlines()
+        for window_pre, window_post in ((3, 3), (0, 0), (2, 5)):
+            expected = self.get_expected(lines, window_pre, window_post, doc_distribution)
+            actual = build_document_line_features(lines, window_pre, window_post, include_doc=doc_distribution)
+            pandas.testing.assert_frame_equal(expected, actual)
+
+    def test_short_documents(self):
+        lines = self.text.splitlines()
+        for n_lines in range(1, 5):
+            expected = self.get_expected(lines[:n_lines], 3, 3, None)
+            actual = build_document_line_features(lines[:n_lines], 3, 3)
+            pandas.testing.assert_frame_equal(expected, actual)
+
+    def test_empty_document(self):
+        self.assertEqual(0, build_document_line_features([]).shape[0])
+
+
+class RowModel:
+    n_jobs = None
+
+    def predict_proba(self, feature_data):
+        first_column = feature_data.iloc[:, 0].to_numpy(dtype=float)
+        return numpy.c_[feature_data.shape[1] * numpy.ones_like(first_column), first_column]
+
+
+class TestPredictProbaBatch(TestCase):
+    def test_split_and_align(self):
+        feature_data = [pandas.DataFrame({"a": [1, 2], "b": [3, 4]}),
+                        pandas.DataFrame({"a": [5]}),
+                        pandas.DataFrame({"b": [6], "c": [7]})]
+        predicted = predict_proba_batch(RowModel(), feature_data, n_jobs=2)
+        self.assertListEqual([2, 1, 1], [p.shape[0] for p in predicted])
+        self.assertListEqual([[3, 1], [3, 2]], predicted[0].tolist())
+        self.assertListEqual([[3, 5]], predicted[1].tolist())
+        self.assertListEqual([[3, -1]], predicted[2].tolist())
+
+    def test_empty(self):
+        self.assertListEqual([], predict_proba_batch(RowModel(), []))
+
+
+class TestDocumentHead(TestCase):
+    text = 'Title\nCompany\r\n2018\x0cContents\nA. Business\x0cB. Governance'
+
+    def test_get_document_head(self):
+        self.assertEqual('Title\nCompany', get_document_head(self.text, max_lines=2))
+        self.assertEqual('Title\nCompany\r\n2018', get_document_head(self.text, max_pages=1))
+        self.assertEqual('Title\nCompany\r\n2018', get_document_head(self.text, max_lines=4, max_pages=1))
+        self.assertEqual(self.text, get_document_head(self.text, max_lines=100, max_pages=5))
+        self.assertEqual(self.text, get_document_head(self.text))
+        self.assertListEqual(self.text.splitlines()[:4], get_document_head(self.text, max_lines=4).splitlines())
+
+    def test_iter_document_heads(self):
+        self.assertListEqual(['Title', 'Title\nCompany', 'Title\nCompany\r\n2018\x0cContents', self.text],
+                             list(iter_document_heads(self.text, max_lines=1)))
+        self.assertListEqual([self.text], list(iter_document_heads(self.text)))
+        self.assertListEqual(['Title\nCompany\r\n2018\x0cContents', self.text],
+                             list(iter_document_heads(self.text, max_lines=1, min_lines=3)))
+        self.assertListEqual([self.text], list(iter_document_heads(self.text, max_lines=1, min_lines=10)))
+
+    def test_zero_budget(self):
+        self.assertRaises(ValueError, get_document_head, self.text, max_lines=0)
+        self.assertRaises(ValueError, get_document_head, self.text, max_pages=0)
+        self.assertRaises(ValueError, list, iter_document_heads(self.text, max_lines=0))
+        self.assertRaises(ValueError, list, iter_document_heads(self.text, max_lines=2, max_pages=-1))
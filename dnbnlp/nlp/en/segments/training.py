@@ -0,0 +1,126 @@
+"""Training data for the Solvency II segment locators.
+
+This module builds the feature matrix and the target of the title and document year locator models from
+the labelled training files. The files are featurized in a pool of processes and the feature matrix of each file
+can be cached on disk. The cache key is the content of the file, the feature builder and FEATURE_VERSION, so
+retraining after a label change only reads the cached features and fits the model.
+"""
+
+# Imports
+import hashlib
+import multiprocessing
+import os
+import pickle
+from typing import Callable, List, Tuple
+
+# Packages
+import numpy
+import pandas
+
+# Project
+from dnbnlp.utils.files import atomic_write
+from dnbnlp.utils.parallel import get_n_jobs
+
+
+# Version of the line features - increase on every change of the features to invalidate the cached features
+FEATURE_VERSION = 1
+
+# Private use glyphs (bullets, check marks) of the PDF text, removed before building the features
+PRIVATE_USE_GLYPHS = '\uf0b7\uf0a7\uf0fc\uf00c\uf00d\uf020'
+PRIVATE_USE_GLYPHS_TABLE = str.maketrans('', '', PRIVATE_USE_GLYPHS)
+
+
+def get_training_feature_key(file_content: bytes, build_features: Callable) -> str:
+    """
+    Get the cache key of the features of a training file.
+    :param file_content: content of the training file
+    :param build_features: feature builder, e.g. build_document_title_features
+    :return:
+    """
+    key = hashlib.sha256(file_content)
+    key.update("\0{0}.{1}:{2}".format(build_features.__module__, build_features.__qualname__,
+                                      FEATURE_VERSION).encode('utf-8'))
+    return key.hexdigest()
+
+
+def build_training_file_features(file_path: str, build_features: Callable, cache_path: str = None) \
+        -> Tuple[pandas.DataFrame, numpy.ndarray]:
+    """
+    Build the features of a training file or read them from the cache.
+    :param file_path:
+    :param build_features: feature builder taking the text, e.g. build_document_title_features
+    :param cache_path: directory of the cached features, no caching if None
+    :return: (feature DataFrame, bool array - the line is not empty)
+    """
+    with open(file_path, "rb") as file:
+        file_content = file.read()
+
+    cache_fn = None
+    if cache_path:
+        cache_fn = os.path.join(cache_path, get_training_feature_key(file_content, build_features) + ".pickle")
+        if os.path.exists(cache_fn):
+            with open(cache_fn, "rb") as cache_file:
+                return pickle.load(cache_file)
+
+    file_text = file_content.decode('utf-8').translate(PRIVATE_USE_GLYPHS_TABLE)
+    res = (build_features(file_text),
+           numpy.array([len(line.strip()) > 0 for line in file_text.splitlines()], dtype=bool))
+
+    if cache_fn:
+        os.makedirs(cache_path, exist_ok=True)
+        # other processes may read the same key
+        with atomic_write(cache_fn) as tmp_fn:
+            with open(tmp_fn, "wb") as cache_file:
+                pickle.dump(res, cache_file, protocol=pickle.HIGHEST_PROTOCOL)
+    return res
+
+
+def _build_training_file_features(args):
+    return build_training_file_features(*args)
+
+
+def parse_line_numbers(line_number) -> List[int]:
+    """
+    Parse the "Line Number" of the training data: "12" or a range "12-14", 1-based.
+    :param line_number:
+    :return:
+    """
+    if "-" in str(line_number):
+        target_line_ranges = line_number.split("-")
+        return list(range(int(target_line_ranges[0]), int(target_line_ranges[1]) + 1))
+    return [int(line_number)]
+
+
+def build_training_data(training_data: pandas.DataFrame, data_path: str, build_features: Callable,
+                        n_jobs: int = 1, cache_path: str = None) -> Tuple[pandas.DataFrame, pandas.Series]:
+    """
+    Build the features and the target of the training data.
+    :param training_data: DataFrame with "File" and "Line Number" columns
+    :param data_path: directory of the training files
+    :param build_features: feature builder taking the text, e.g. build_document_title_features
+    :param n_jobs: Number of processes, see dnbnlp.utils.parallel.
+    :param cache_path: directory of the cached features, no caching if None
+    :return: (feature DataFrame, target Series) of all lines of all files
+    """
+    file_names = training_data["File"].tolist()
+    tasks = [(os.path.join(data_path, file_name), build_features, cache_path) for file_name in file_names]
+
+    n_jobs = get_n_jobs(n_jobs)
+
+    if n_jobs == 1:
+        file_features = [build_training_file_features(*task) for task in tasks]
+    else:
+        with multiprocessing.Pool(n_jobs) as pool:
+            file_features = pool.map(_build_training_file_features, tasks)
+
+    all_feature_list = []
+    all_target_list = []
+    for (feature_data, non_empty_lines), line_number in zip(file_features, training_data["Line Number"].tolist()):
+        target_data = numpy.zeros((feature_data.shape[0],))
+        target_line_ids = numpy.array(parse_line_numbers(line_number), dtype=int) - 1
+        target_data[target_line_ids[non_empty_lines[target_line_ids]]] = 1
+        all_feature_list.append(feature_data)
+        all_target_list.append(pandas.Series(target_data))
+
+    # Collate
+    return pandas.concat(all_feature_list, axis=0), pandas.concat(all_target_list, axis=0)
@@ -0,0 +1,182 @@
+"""Tree ensemble evaluation with NumPy.
+
+This module stores fitted sklearn tree ensembles (ExtraTreesClassifier / RandomForestClassifier) as flat NumPy node
+arrays in .npz files and evaluates them without sklearn. All trees are evaluated for all rows at once: each step
+moves the current node of every (tree, row) pair one level down, leaves point to themselves.
+"""
+
+# Imports
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+# Packages
+import numpy
+
+# Project
+from dnbnlp.utils.parallel import get_n_jobs
+
+
+class TreeEnsemble:
+    """
+    Tree ensemble classifier stored as flat node arrays.
+    The nodes of all trees are concatenated, roots holds the index of the root node of each tree.
+    Same predict_proba() results as the sklearn classifier it was exported from.
+    With n_jobs != 1 the rows are split into n_jobs chunks evaluated in threads (NumPy releases the GIL
+    in the node array operations), like the threaded prediction of sklearn forests.
+    """
+    __slots__ = ('feature', 'threshold', 'children_left', 'children_right', 'value', 'roots', 'depth',
+                 'classes_', 'n_features', 'n_jobs')
+
+    def __init__(self, feature: numpy.ndarray, threshold: numpy.ndarray, children_left: numpy.ndarray,
+                 children_right: numpy.ndarray, value: numpy.ndarray, roots: numpy.ndarray, depth: int,
+                 classes: numpy.ndarray, n_features: int, n_jobs: int = 1):
+        """
+        :param feature: feature index of each node, 0 for leaves
+        :param threshold: split threshold of each node, rows with feature <= threshold go left
+        :param children_left: left child of each node, the node itself for leaves
+        :param children_right: right child of each node, the node itself for leaves
+        :param value: class probabilities of each node, shape (number of nodes, number of classes)
+        :param roots: root node of each tree
+        :param depth: maximum depth of the trees
+        :param classes: class labels
+        :param n_features: number of features
+        :param n_jobs: number of threads of the prediction, see dnbnlp.utils.parallel
+        """
+        self.feature = feature
+        self.threshold = threshold
+        self.children_left = children_left
+        self.children_right = children_right
+        self.value = value
+        self.roots = roots
+        self.depth = int(depth)
+        self.classes_ = classes
+        self.n_features = int(n_features)
+        self.n_jobs = n_jobs
+
+    @classmethod
+    def from_sklearn(cls, model) -> 'TreeEnsemble':
+        """
+        Build the node arrays of a fitted sklearn forest classifier.
+        :param model: fitted ExtraTreesClassifier / RandomForestClassifier with a single output
+        :return:
+        """
+        features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+        depth = 0
+        offset = 0
+        for estimator in model.estimators_:
+            tree = estimator.tree_
+            node_ids = numpy.arange(tree.node_count, dtype=numpy.int64)
+            is_leaf = tree.children_left < 0
+            features.append(numpy.where(is_leaf, 0, tree.feature))
+            thresholds.append(numpy.where(is_leaf, 0.0, tree.threshold))
+            lefts.append(numpy.where(is_leaf, node_ids, tree.children_left) + offset)
+            rights.append(numpy.where(is_leaf, node_ids, tree.children_right) + offset)
+            # normalize counts (older sklearn) or fractions to the probabilities of each tree's predict_proba()
+            value = numpy.asarray(tree.value[:, 0, :], dtype=numpy.float64)
+            normalizer = value.sum(axis=1, keepdims=True)
+            normalizer[normalizer == 0.0] = 1.0
+            values.append(value / normalizer)
+            roots.append(offset)
+            depth = max(depth, tree.max_depth)
+            offset += tree.node_count
+
+        n_features = getattr(model, "n_features_in_", None) or getattr(model, "n_features_")
+        return cls(feature=numpy.concatenate(features).astype(numpy.int64),
+                   threshold=numpy.concatenate(thresholds).astype(numpy.float64),
+                   children_left=numpy.concatenate(lefts).astype(numpy.int64),
+                   children_right=numpy.concatenate(rights).astype(numpy.int64),
+                   value=numpy.concatenate(values, axis=0),
+                   roots=numpy.array(roots, dtype=numpy.int64),
+                   depth=depth,
+                   classes=numpy.asarray(model.classes_),
+                   n_features=n_features)
+
+    def save(self, fn: str):
+        """
+        Save the node arrays to a .npz file.
+        :param fn:
+        :return:
+        """
+        numpy.savez(fn, feature=self.feature, threshold=self.threshold, children_left=self.children_left,
+                    children_right=self.children_right, value=self.value, roots=self.roots,
+                    depth=numpy.array(self.depth), classes=self.classes_, n_features=numpy.array(self.n_features))
+
+    @classmethod
+    def load(cls, fn: str) -> 'TreeEnsemble':
+        """
+        Load the node arrays saved by save().
+        :param fn:
+        :return:
+        """
+        with numpy.load(fn, allow_pickle=False) as data:
+            return cls(feature=data["feature"], threshold=data["threshold"], children_left=data["children_left"],
+                       children_right=data["children_right"], value=data["value"], roots=data["roots"],
+                       depth=int(data["depth"]), classes=data["classes"], n_features=int(data["n_features"]))
+
+    def apply(self, X) -> numpy.ndarray:
+        """
+        Get the leaf of each row in each tree.
+        :param X: feature matrix or DataFrame, shape (number of rows, n_features)
+        :return: leaf node indices, shape (number of trees, number of rows)
+        """
+        # sklearn evaluates the trees on float32 features
+        X = numpy.asarray(X, dtype=numpy.float32)
+        if X.ndim != 2 or X.shape[1] != self.n_features:
+            raise ValueError("X has {0} features, the model expects {1}".format(
+                X.shape[-1] if X.ndim else 0, self.n_features))
+        rows = numpy.arange(X.shape[0])[numpy.newaxis, :]
+        nodes = numpy.repeat(self.roots[:, numpy.newaxis], X.shape[0], axis=1)
+        for _ in range(self.depth):
+            go_left = X[rows, self.feature[nodes]] <= self.threshold[nodes]
+            nodes = numpy.where(go_left, self.children_left[nodes], self.children_right[nodes])
+        return nodes
+
+    def predict_proba(self, X) -> numpy.ndarray:
+        """
+        Get the class probabilities: the mean of the leaf probabilities of all trees.
+        :param X: feature matrix or DataFrame, shape (number of rows, n_features)
+        :return: shape (number of rows, number of classes)
+        """
+        X = numpy.asarray(X, dtype=numpy.float32)
+        n_jobs = get_n_jobs(self.n_jobs)
+        if n_jobs == 1 or X.ndim != 2 or X.shape[0] < 2 * n_jobs:
+            return self._predict_proba(X)
+        with ThreadPoolExecutor(n_jobs) as executor:
+            return numpy.concatenate(list(executor.map(self._predict_proba, numpy.array_split(X, n_jobs))), axis=0)
+
+    def _predict_proba(self, X) -> numpy.ndarray:
+        return self.value[self.apply(X)].mean(axis=0)
+
+    def predict(self, X) -> numpy.ndarray:
+        """
+        Get the most probable class of each row.
+        :param X:
+        :return:
+        """
+        return self.classes_[numpy.argmax(self.predict_proba(X), axis=1)]
+
+
+def export_tree_ensemble(model, fn: str) -> TreeEnsemble:
+    """
+    Export a fitted sklearn forest classifier to a .npz file which can be loaded with load_tree_ensemble().
+    :param model:
+    :param fn:
+    :return:
+    """
+    tree_ensemble = TreeEnsemble.from_sklearn(model)
+    tree_ensemble.save(fn)
+    return tree_ensemble
+
+
+def load_tree_ensemble(pickle_fn: str):
+    """
+    Load a locator model. The exported .npz next to the pickle is used if it exists, otherwise the pickle
+    is loaded with joblib (which needs sklearn).
+    :param pickle_fn: joblib pickle of the sklearn model
+    :return: TreeEnsemble or the sklearn model
+    """
+    npz_fn = os.path.splitext(pickle_fn)[0] + ".npz"
+    if os.path.exists(npz_fn):
+        return TreeEnsemble.load(npz_fn)
+    from sklearn.externals import joblib
+    return joblib.load(pickle_fn)
@@ -0,0 +1,265 @@
+"""Line feature building for the Solvency II segment locators.
+
+This module builds the line feature matrix of the title and document year locator models for all lines
+of a document at once. The per-line statistics are computed with NumPy on the code points of the whole document,
+the result is the same DataFrame as pandas.DataFrame() of the build_title_features() /
+build_document_year_features() vectors of all lines (same columns in the same order, -1 for missing
+window features).
+"""
+
+# Imports
+import copy
+import re
+import string
+from typing import Dict, Generator, List, Tuple
+
+# Packages
+import numpy
+import pandas
+
+# Project
+from lexnlp.utils.unicode.unicode_lookup import UNICODE_CHAR_TOP_CATEGORY_MAPPING
+
+
+# Substrings searched in the line itself
+LINE_KEYWORDS = ["orsa", "Orsa", "ORSA",
+                 "Own Risk and Solvency Assessment", "OWN RISK AND SOLVENCY ASSESSMENT",
+                 "rsr", "Rsr", "RSR",
+                 "Regular Supervisory Report", "REGULAR SUPERVISORY REPORT",
+                 "sfcr", "Sfcr", "SFCR",
+                 "Solvency and Financial Condition Report", "Solvency Financial Condition Report",
+                 "Solvency", "Financial", "Condition", "Report",
+                 "SOLVENCY AND FINANCIAL CONDITION REPORT", "SOLVENCY FINANCIAL CONDITION REPORT",
+                 "SOLVENCY", "FINANCIAL", "CONDITION", "REPORT"]
+
+# Window features of each line in the window, suffixed with the offset of the line
+LINE_WINDOW_FEATURES = ["line_len_", "line_lenstrip_", "line_title_case_", "line_upper_case_",
+                        "line_n_alpha_", "line_n_number_", "line_n_punct_", "line_n_whitespace_"]
+
+# Line boundaries of str.splitlines()
+LINE_BOUNDARY_RE = re.compile(r'\r\n|[\n\r\x0b\x0c\x1c\x1d\x1e\x85\u2028\u2029]')
+
+# Page break of the extracted text
+PAGE_BREAK = '\x0c'
+
+# Unicode top categories counted by the line_n_* features, in the order of LINE_WINDOW_FEATURES
+_COUNTED_CATEGORIES = {'L': 0, 'N': 1, 'P': 2, 'Z': 3}
+
+
+def get_line_windows(n_lines: int, window_pre: int, window_post: int) -> Tuple[numpy.ndarray, numpy.ndarray]:
+    """
+    Get the first and the last line offset of the feature window of each line.
+    Same as in build_title_features(): the window is cut at the start of the document, and near the end
+    of the document it is cut to n_lines - window_post - 1 lines (so it can be empty).
+    :param n_lines:
+    :param window_pre:
+    :param window_post:
+    :return: (first offsets, last offsets) arrays. Lines with last < first have no window features.
+    """
+    line_ids = numpy.arange(n_lines)
+    first = -numpy.minimum(window_pre, line_ids)
+    post = numpy.where(line_ids + window_post >= n_lines, n_lines - window_post - 1, window_post)
+    last = numpy.minimum(post, n_lines - 1 - line_ids)
+    return first, last
+
+
+def get_line_stats(lines: List[str]) -> numpy.ndarray:
+    """
+    Get the statistics of the window features (LINE_WINDOW_FEATURES) for each line.
+    :param lines:
+    :return: int array of shape (number of lines, len(LINE_WINDOW_FEATURES))
+    """
+    n_lines = len(lines)
+    stats = numpy.zeros((n_lines, len(LINE_WINDOW_FEATURES)), dtype=numpy.int64)
+    lengths = numpy.fromiter(map(len, lines), dtype=numpy.int64, count=n_lines)
+    stats[:, 0] = lengths
+    stats[:, 1] = numpy.fromiter((len(line.strip()) for line in lines), dtype=numpy.int64, count=n_lines)
+    stats[:, 2] = numpy.fromiter((line == line.title() for line in lines), dtype=numpy.int64, count=n_lines)
+    stats[:, 3] = numpy.fromiter((line.isupper() for line in lines), dtype=numpy.int64, count=n_lines)
+
+    code_points, line_ids = _get_code_points(lines, lengths)
+    unique_code_points, inverse = numpy.unique(code_points, return_inverse=True)
+    unique_categories = numpy.array([_COUNTED_CATEGORIES.get(UNICODE_CHAR_TOP_CATEGORY_MAPPING[chr(c)], 4)
+                                     for c in unique_code_points.tolist()], dtype=numpy.int64)
+    categories = unique_categories[inverse]
+    category_counts = numpy.bincount(line_ids * 5 + categories, minlength=n_lines * 5).reshape(n_lines, 5)
+    stats[:, 4:8] = category_counts[:, :4]
+    return stats
+
+
+def get_char_counts(lines: List[str], characters) -> numpy.ndarray:
+    """
+    Count the characters in each line.
+    :param lines:
+    :param characters: characters to count
+    :return: int array of shape (number of lines, number of distinct characters)
+    """
+    n_lines = len(lines)
+    char_index = {c: i for i, c in enumerate(dict.fromkeys(characters))}
+    lengths = numpy.fromiter(map(len, lines), dtype=numpy.int64, count=n_lines)
+    code_points, line_ids = _get_code_points(lines, lengths)
+    unique_code_points, inverse = numpy.unique(code_points, return_inverse=True)
+    unique_index = numpy.array([char_index.get(chr(c), -1) for c in unique_code_points.tolist()],
+                               dtype=numpy.int64)
+    index = unique_index[inverse]
+    counted = index >= 0
+    return numpy.bincount(line_ids[counted] * len(char_index) + index[counted],
+                          minlength=n_lines * len(char_index)).reshape(n_lines, len(char_index))
+
+
+def _get_code_points(lines: List[str], lengths: numpy.ndarray) -> Tuple[numpy.ndarray, numpy.ndarray]:
+    code_points = numpy.frombuffer(''.join(lines).encode('utf-32-le', 'surrogatepass'), dtype=numpy.uint32)
+    line_ids = numpy.repeat(numpy.arange(len(lines), dtype=numpy.int64), lengths)
+    return code_points, line_ids
+
+
+def _get_columns(window_shapes: List[Tuple[int, int]], keywords: List[str], characters,
+                 include_doc: Dict = None) -> pandas.Index:
+    """
+    Get the columns of pandas.DataFrame() of the line feature dicts. Lines with the same window have the same keys,
+    so the dicts of one line per window shape give the same columns in the same order.
+    """
+    shape_dicts = []
+    for first, last in window_shapes:
+        keys = [name + str(offset) for offset in range(first, last + 1) for name in LINE_WINDOW_FEATURES]
+        keys.extend(keywords)
+        keys.extend("char_" + c for c in dict.fromkeys(characters))
+        if include_doc:
+            keys.extend(include_doc)
+        shape_dicts.append(dict.fromkeys(keys, 0))
+    return pandas.DataFrame(shape_dicts).columns
+
+
+def build_document_line_features(lines: List[str], window_pre: int = 3, window_post: int = 3,
+                                 characters=string.printable, keywords: List[str] = None,
+                                 include_doc: Dict = None) -> pandas.DataFrame:
+    """
+    Build the feature DataFrame of all lines of a document.
+    Same as pandas.DataFrame() of build_title_features() for each line followed by .fillna(-1).astype(int).
+    :param lines: lines of the document
+    :param window_pre:
+    :param window_post:
+    :param characters: characters to count in the line
+    :param keywords: substrings to search in the line, LINE_KEYWORDS by default
+    :param include_doc: document features added to each line
+    :return:
+    """
+    keywords = LINE_KEYWORDS if keywords is None else keywords
+    n_lines = len(lines)
+    if not n_lines:
+        return pandas.DataFrame([]).fillna(-1).astype(int)
+
+    first, last = get_line_windows(n_lines, window_pre, window_post)
+    window_shapes = list(dict.fromkeys(zip(first.tolist(), last.tolist())))
+    columns = _get_columns(window_shapes, keywords, characters, include_doc)
+    column_index = {column: i for i, column in enumerate(columns)}
+    features = numpy.full((n_lines, len(columns)), -1, dtype=numpy.int64)
+
+    # Window features - the line statistics shifted by each offset, -1 where the offset is out of the window
+    stats = get_line_stats(lines)
+    for offset in range(int(first.min()), int(last.max()) + 1):
+        in_window = numpy.flatnonzero((first <= offset) & (offset <= last))
+        if not in_window.size:
+            continue
+        offset_columns = [column_index[name + str(offset)] for name in LINE_WINDOW_FEATURES]
+        features[numpy.ix_(in_window, offset_columns)] = stats[in_window + offset]
+
+    # Simple checks
+    line_series = pandas.Series(lines, dtype=object)
+    for keyword in keywords:
+        features[:, column_index[keyword]] = line_series.str.contains(keyword, regex=False).to_numpy(dtype=bool)
+
+    # Character vector
+    char_columns = [column_index["char_" + c] for c in dict.fromkeys(characters)]
+    features[:, char_columns] = get_char_counts(lines, characters)
+
+    # Document features - the same for all lines
+    if include_doc:
+        doc_columns = [column_index[key] for key in include_doc]
+        features[:, doc_columns] = numpy.array(list(include_doc.values())).astype(int)
+
+    return pandas.DataFrame(features, columns=columns)
+
+
+def predict_proba_batch(model, feature_data: List[pandas.DataFrame], n_jobs: int = None) -> List[numpy.ndarray]:
+    """
+    Predict the line features of many documents with one predict_proba() call.
+    The rows of all documents are aligned to the columns of the document with the most columns (all documents
+    with at least window_pre + window_post + 1 lines have the same columns), missing features are -1.
+    Documents shorter than the window are predicted with the aligned columns and can differ from a per-document
+    predict_proba() call.
+    :param model: fitted classifier
+    :param feature_data: feature DataFrames of the documents
+    :param n_jobs: number of jobs of the prediction, the n_jobs of the model if None
+    :return: predict_proba() result for each document
+    """
+    if not feature_data:
+        return []
+    columns = max(feature_data, key=lambda df: df.shape[1]).columns
+    for df in feature_data:
+        if not df.columns.isin(columns).all():
+            columns = columns.append(df.columns[~df.columns.isin(columns)])
+    all_feature_data = pandas.concat([df.reindex(columns=columns, fill_value=-1) for df in feature_data],
+                                     axis=0, ignore_index=True)
+
+    if n_jobs is not None and getattr(model, "n_jobs", n_jobs) != n_jobs:
+        # shallow copy - shares the fitted estimators with the model
+        model = copy.copy(model)
+        model.n_jobs = n_jobs
+    if all_feature_data.shape[0]:
+        predicted = model.predict_proba(all_feature_data)
+    else:
+        predicted = numpy.zeros((0, len(getattr(model, "classes_", (0, 1)))))
+    split_points = numpy.cumsum([df.shape[0] for df in feature_data])[:-1]
+    return numpy.split(predicted, split_points)
+
+
+def get_document_head(text: str, max_lines: int = None, max_pages: int = None) -> str:
+    """
+    Get the head of the document: the first max_lines lines of the first max_pages pages (pages are separated by
+    form feeds). No limit if max_lines / max_pages is None.
+    :param text:
+    :param max_lines: at least 1
+    :param max_pages: at least 1
+    :return:
+    """
+    if (max_lines is not None and max_lines < 1) or (max_pages is not None and max_pages < 1):
+        raise ValueError("max_lines and max_pages must be at least 1: {0}, {1}".format(max_lines, max_pages))
+    end = len(text)
+    if max_pages is not None:
+        position = -1
+        for _ in range(max_pages):
+            position = text.find(PAGE_BREAK, position + 1)
+            if position < 0:
+                break
+        if position >= 0:
+            end = position
+    if max_lines is not None:
+        for line_id, match in enumerate(LINE_BOUNDARY_RE.finditer(text, 0, end)):
+            if line_id + 1 >= max_lines:
+                end = match.start()
+                break
+    return text[:end]
+
+
+def iter_document_heads(text: str, max_lines: int = None, max_pages: int = None,
+                        min_lines: int = 0) -> Generator[str, None, None]:
+    """
+    Generate growing heads of the document, starting with get_document_head(text, max_lines, max_pages) and
+    doubling the budget until the whole document is generated. Generates only the whole document if there is
+    no budget.
+    :param text:
+    :param max_lines:
+    :param max_pages:
+    :param min_lines: skip heads with fewer lines
+    :return:
+    """
+    while True:
+        head = get_document_head(text, max_lines, max_pages)
+        is_complete = len(head) == len(text) or (max_lines is None and max_pages is None)
+        if is_complete or min_lines <= 1 or get_document_head(head, max_lines=min_lines - 1) != head:
+            yield head
+        if is_complete:
+            return
+        max_lines = max_lines * 2 if max_lines is not None else None
+        max_pages = max_pages * 2 if max_pages is not None else None
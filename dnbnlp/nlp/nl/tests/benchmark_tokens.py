@@ -0,0 +1,47 @@
+"""Throughput of the regex tokenizer vs. nltk.word_tokenize() for Dutch.
+
+Usage: python benchmark_tokens.py [text file]
+Without a file a generated SFCR-like text is used.
+"""
+
+import sys
+import time
+
+from dnbnlp.nlp.nl.tokens import get_token_list
+from dnbnlp.extract.common.dict_terms import normalize_text
+
+SAMPLE = "De solvabiliteitsratio van de N.V. bedroeg per 31 december 2019 185,3% (2018: 176,1%), d.w.z. " \
+         "ruim boven de wettelijke eis. Het eigen vermogen steeg met EUR 1.234,5 mln tot EUR 12.345 mln. " \
+         "Verzekeraars rapporteren hun risico's aan De Nederlandsche Bank in 's-Gravenhage, zie o.a. art. 3. "
+
+
+def _bench(func, text: str, repeat: int = 3) -> float:
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(text)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main(argv):
+    if len(argv) > 1:
+        with open(argv[1], encoding='utf-8') as f:
+            texts = f.read().splitlines()
+    else:
+        texts = [SAMPLE] * 2000
+    n_chars = sum(len(text) for text in texts)
+
+    cases = (('get_token_list nltk', lambda ts: [get_token_list(t) for t in ts]),
+             ('get_token_list regex', lambda ts: [get_token_list(t, use_regex=True) for t in ts]),
+             ('normalize_text nltk', lambda ts: [normalize_text(t, 'nl', return_offsets=True) for t in ts]),
+             ('normalize_text regex', lambda ts: [normalize_text(t, 'nl', return_offsets=True, regex_tokenizer=True)
+                                                  for t in ts]))
+    for name, func in cases:
+        elapsed = _bench(func, texts)
+        print('{0:<24} {1:8.3f} s {2:10.0f} chars/s'.format(name, elapsed, n_chars / elapsed))
+
+
+if __name__ == '__main__':
+    main(sys.argv)
@@ -0,0 +1,88 @@
+import os
+import tempfile
+from unittest import TestCase
+
+from dnbnlp.nlp.nl.tokens import StemLexicon, DEFAULT_STEMMER, get_stem_list, get_token_spans, get_token_list, \
+    align_tokens
+
+
+class CountingStemmer:
+    def __init__(self):
+        self.calls = 0
+
+    def stem(self, word):
+        self.calls += 1
+        return DEFAULT_STEMMER.stem(word)
+
+
+class TestStemLexicon(TestCase):
+    text = 'De verzekeraars rapporteren de solvabiliteit en de verzekeraars rapporteren de risico\'s.'
+
+    def test_same_stems(self):
+        stemmer = CountingStemmer()
+        lexicon = StemLexicon(stemmer)
+        expected = get_stem_list(self.text, stemmer=DEFAULT_STEMMER)
+        self.assertListEqual(expected, get_stem_list(self.text, stemmer=lexicon))
+        self.assertListEqual(expected, get_stem_list(self.text, stemmer=lexicon))
+        self.assertEqual(len(lexicon), stemmer.calls)
+        self.assertLess(stemmer.calls, len(expected))
+
+    def test_max_size(self):
+        lexicon = StemLexicon(max_size=2)
+        for word in ('verzekeraars', 'risico', 'solvabiliteit'):
+            lexicon.stem(word)
+        self.assertEqual(2, len(lexicon))
+        self.assertNotIn('solvabiliteit', lexicon)
+
+    def test_save_load(self):
+        lexicon = StemLexicon()
+        get_stem_list(self.text, stemmer=lexicon)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            fn = os.path.join(tmp_dir, 'stems.pickle')
+            lexicon.save(fn)
+            loaded = StemLexicon().load(fn)
+            stemmer = loaded.stemmer = CountingStemmer()
+            self.assertDictEqual(lexicon.stems, loaded.stems)
+            get_stem_list(self.text, stemmer=loaded)
+            self.assertEqual(0, stemmer.calls)
+            # lexicons of another stemmer are refused
+            from nltk.stem.snowball import EnglishStemmer
+            with self.assertRaises(ValueError):
+                StemLexicon(EnglishStemmer()).load(fn)
+
+
+class TestRegexTokenizer(TestCase):
+    text = "Volgens de N.V. is de ratio 1.234,5 mln (d.w.z. 12,5%) en z'n risico's in 's-Gravenhage... enz."
+
+    def test_token_spans(self):
+        spans = list(get_token_spans(self.text))
+        for token, start, end in spans:
+            self.assertEqual(token, self.text[start:end])
+        tokens = [token for token, _, _ in spans]
+        self.assertListEqual(['Volgens', 'de', 'N.V.', 'is', 'de', 'ratio', '1.234,5', 'mln', '(', 'd.w.z.', '12,5',
+                              '%', ')', 'en', "z'n", "risico's", 'in', "'s-Gravenhage", '...', 'enz.'], tokens)
+
+    def test_dotted_tokens(self):
+        # abbreviations which are a prefix of a longer dotted token do not split it
+        self.assertListEqual(['a.s.r.', 'en', 'N.V.', 'en', 'a.s.', 'en', 'B.V.'],
+                             get_token_list('a.s.r. en N.V. en a.s. en B.V.', use_regex=True))
+
+    def test_token_list(self):
+        self.assertListEqual(['de', 'n.v.', "'t"], get_token_list("De N.V. 't", lowercase=True, use_regex=True))
+        self.assertListEqual(['N.V.'], get_token_list('De N.V.', stopword=True, use_regex=True))
+        self.assertListEqual(get_stem_list('verzekeraars rapporteren'),
+                             get_stem_list('verzekeraars rapporteren', use_regex=True))
+
+
+class TestAlignTokens(TestCase):
+    def test_align(self):
+        text = 'De "ratio" is 1.234,5'
+        self.assertListEqual([(0, 2), (3, 4), (4, 9), (9, 10), (11, 13), (14, 21)],
+                             align_tokens(text, ['De', '``', 'ratio', "''", 'is', '1.234,5']))
+
+    def test_changed_token(self):
+        # the changed quote is not searched far ahead in the text
+        text = 'een “twee” drie ' + 'vier ' * 20 + '"twee"'
+        spans = align_tokens(text, ['een', '"', 'twee', '"', 'drie'])
+        self.assertListEqual(['een', '', 'twee', '', 'drie'], [text[start:end] for start, end in spans])
+        self.assertEqual((4, 4), spans[1])
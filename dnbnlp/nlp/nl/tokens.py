@@ -10,7 +10,8 @@ No lemmatizer functions implemented
 # Imports
 import os
 import pickle
-from typing import List, Generator
+import re
+from typing import List, Generator, Tuple
 
 # NLTK imports
 import nltk
@@ -31,16 +32,173 @@ STOPWORDS = set(stopwords.words('dutch'))
 DEFAULT_STEMMER = nltk.stem.snowball.DutchStemmer()
 
 
-def get_tokens(text, lowercase=False, stopword=False, preserve_line=True) -> Generator:
+class StemLexicon:
+    """
+    Word -> stem dictionary in front of a stemmer.
+    Has the stem() method of nltk stemmers so it can be used instead of them. Each word is stemmed once,
+    the next occurrences are looked up in the dictionary. The dictionary can be saved to and loaded from a file
+    to keep the stems of the words seen in the previous runs.
+    """
+
+    def __init__(self, stemmer=DEFAULT_STEMMER, max_size: int = None):
+        """
+        :param stemmer: Stemmer to use for the words not yet in the lexicon.
+        :param max_size: Maximal number of words in the lexicon. When reached - new words are stemmed without
+        adding them. None - unlimited.
+        """
+        self.stemmer = stemmer
+        self.max_size = max_size
+        self.stems = dict()
+
+    def __len__(self):
+        return len(self.stems)
+
+    def __contains__(self, word):
+        return word in self.stems
+
+    def stem(self, word: str) -> str:
+        stem = self.stems.get(word)
+        if stem is None:
+            stem = self.stemmer.stem(word)
+            if self.max_size is None or len(self.stems) < self.max_size:
+                self.stems[word] = stem
+        return stem
+
+    def _stemmer_name(self) -> str:
+        return type(self.stemmer).__name__
+
+    def save(self, fn: str):
+        """
+        Save the lexicon to a pickle file.
+        :param fn:
+        :return:
+        """
+        with open(fn, 'wb') as f:
+            pickle.dump({'stemmer': self._stemmer_name(), 'stems': self.stems}, f)
+
+    def load(self, fn: str) -> 'StemLexicon':
+        """
+        Add the words of a lexicon saved with save() to this lexicon.
+        :param fn:
+        :return: The lexicon itself.
+        """
+        with open(fn, 'rb') as f:
+            data = pickle.load(f)
+        if data['stemmer'] != self._stemmer_name():
+            raise ValueError('Lexicon {0} was made with {1}, not with {2}'.format(fn, data['stemmer'],
+                                                                                  self._stemmer_name()))
+        self.stems.update(data['stems'])
+        return self
+
+
+# Setup default stem lexicon for Dutch. Load the words of the previous runs with DEFAULT_STEM_LEXICON.load(fn)
+DEFAULT_STEM_LEXICON = StemLexicon(DEFAULT_STEMMER)
+
+
+# Regex tokenizer - compiled on the first use, see _get_token_regex()
+_TOKEN_REGEX = None
+
+# Apostrophe forms: 's, 't, 'n, 'k, 'r ('s-Gravenhage as one token)
+_TOKEN_PTN_CLITIC = r"['’](?:s|t|n|k|r)(?!\w)(?:-\w+)*"
+# Numbers with thousand separators and decimal commas/dots: 1.234.567,89 / 3,5 / 0.25
+_TOKEN_PTN_NUMBER = r"\d+(?:[.,]\d+)+"
+# Dotted abbreviations not in the abbreviation list: N.V., B.V., a.s.r.
+_TOKEN_PTN_INITIALS = r"(?:[^\W\d_]{1,3}\.){2,}"
+# Words with inner apostrophes and hyphens: risico's, z'n, m'n, Solvency-II
+_TOKEN_PTN_WORD = r"\w+(?:['’-]\w+)*"
+# Ellipsis and any other non-space character
+_TOKEN_PTN_OTHER = r"\.{2,}|\S"
+
+
+def _get_token_regex():
+    global _TOKEN_REGEX
+    if _TOKEN_REGEX is None:
+        # imported here because dnbnlp.extract imports this module
+        from dnbnlp.extract.nl.nl_language_tokens import NlLanguageTokens
+        abbreviations = sorted(NlLanguageTokens.abbreviations, key=lambda a: (-len(a), a))
+        # bounded on both sides: an abbreviation must not win over a longer dotted token (a.s. in a.s.r.)
+        abbreviations_ptn = r'(?<!\w)(?:' + '|'.join(re.escape(a) for a in abbreviations) + r')(?!\w)'
+        _TOKEN_REGEX = re.compile('|'.join((abbreviations_ptn,
+                                            _TOKEN_PTN_CLITIC,
+                                            _TOKEN_PTN_NUMBER,
+                                            _TOKEN_PTN_INITIALS,
+                                            _TOKEN_PTN_WORD,
+                                            _TOKEN_PTN_OTHER)))
+    return _TOKEN_REGEX
+
+
+def get_token_spans(text: str, lowercase: bool = False, stopword: bool = False) \
+        -> Generator[Tuple[str, int, int], None, None]:
+    """
+    Get tokens with their positions in the text using the regex tokenizer for Dutch.
+    Unlike nltk.word_tokenize() the tokens are always substrings of the text. Abbreviations
+    (NlLanguageTokens.abbreviations and dotted initials like N.V.) keep their dots, numbers keep their
+    decimal commas and thousand separators, apostrophe forms ('s, z'n, risico's) are single tokens.
+    :param text:
+    :param lowercase:
+    :param stopword:
+    :return: Generates tuples (token, start, end).
+    """
+    for match in _get_token_regex().finditer(text):
+        token = match.group()
+        if stopword and token.lower() in STOPWORDS:
+            continue
+        yield (token.lower() if lowercase else token), match.start(), match.end()
+
+
+# Number of characters align_tokens() may skip to find a token which is not at the current position
+ALIGN_MAX_SKIP = 8
+
+
+def align_tokens(text: str, tokens: List[str]) -> List[Tuple[int, int]]:
+    """
+    Find the [start, end) spans of the tokens in the text they have been extracted from
+    (by nltk.word_tokenize() or any other tokenizer).
+    Tokens are searched sequentially. A token which is not at the current position is searched in the next
+    ALIGN_MAX_SKIP characters only. A token which can not be found there (tokenizer changed it) gets
+    an empty span at the current position.
+    :param text:
+    :param tokens:
+    :return: List of (start, end) tuples - one per token.
+    """
+    spans = []
+    cursor = 0
+    text_len = len(text)
+    for token in tokens:
+        while cursor < text_len and text[cursor].isspace():
+            cursor += 1
+        if text.startswith(token, cursor):
+            start = cursor
+            end = cursor + len(token)
+        elif token in ('``', "''") and cursor < text_len and text[cursor] == '"':
+            # nltk tokenizers replace double quotes with `` and ''
+            start = cursor
+            end = cursor + 1
+        else:
+            start = text.find(token, cursor, cursor + ALIGN_MAX_SKIP + len(token))
+            if start < 0:
+                spans.append((cursor, cursor))
+                continue
+            end = start + len(token)
+        spans.append((start, end))
+        cursor = end
+    return spans
+
+
+def get_tokens(text, lowercase=False, stopword=False, preserve_line=True, use_regex=False) -> Generator:
     """
     Get token generator from text.
     :param text:
     :param lowercase:
     :param stopword:
     :param preserve_line: keep the preserve the sentence and not sentence tokenize it.
+    :param use_regex: Use the regex tokenizer (see get_token_spans()) instead of nltk.word_tokenize().
     :return:
     """
-    if stopword:
+    if use_regex:
+        for token, _start, _end in get_token_spans(text, lowercase=lowercase, stopword=stopword):
+            yield token
+    elif stopword:
         for token in nltk.word_tokenize(text, preserve_line=preserve_line):
             if token.lower() in STOPWORDS:
                 continue
@@ -57,20 +215,21 @@ def get_tokens(text, lowercase=False, stopword=False, preserve_line=True) -> Gen
 
 
 def get_token_list(text: str, lowercase: bool = False, stopword: bool = False,
-                   preserve_line: bool = True) -> List:
+                   preserve_line: bool = True, use_regex: bool = False) -> List:
     """
     Get token list from text.
     :param text:
     :param lowercase:
     :param stopword:
     :param preserve_line: keep the preserve the sentence and not sentence tokenize it.
+    :param use_regex: Use the regex tokenizer (see get_token_spans()) instead of nltk.word_tokenize().
     :return:
     """
     return list(get_tokens(text, lowercase=lowercase, stopword=stopword,
-                           preserve_line=preserve_line))
+                           preserve_line=preserve_line, use_regex=use_regex))
 
 
-def get_stems(text, lowercase=False, stopword=False, stemmer=DEFAULT_STEMMER) -> Generator:
+def get_stems(text, lowercase=False, stopword=False, stemmer=DEFAULT_STEM_LEXICON, use_regex=False) -> Generator:
     """
     Get stems from text.
     N.B.: when stemmer is SnowballStemmer, lowercase is always returned no matter the parameter.
@@ -78,13 +237,14 @@ def get_stems(text, lowercase=False, stopword=False, stemmer=DEFAULT_STEMMER) ->
     :param lowercase:
     :param stopword:
     :param stemmer:
+    :param use_regex: Use the regex tokenizer (see get_token_spans()) instead of nltk.word_tokenize().
     :return:
     """
-    for token in get_tokens(text, lowercase=lowercase, stopword=stopword):
+    for token in get_tokens(text, lowercase=lowercase, stopword=stopword, use_regex=use_regex):
         yield stemmer.stem(token)
 
 
-def get_stem_list(text, lowercase=False, stopword=False, stemmer=DEFAULT_STEMMER) -> List:
+def get_stem_list(text, lowercase=False, stopword=False, stemmer=DEFAULT_STEM_LEXICON, use_regex=False) -> List:
     """
     Get stems materialized from text.
     N.B.: when stemmer is SnowballStemmer, lowercase is always returned no matter the parameter.
@@ -93,6 +253,7 @@ def get_stem_list(text, lowercase=False, stopword=False, stemmer=DEFAULT_STEMMER
     :param lowercase:
     :param stopword:
     :param stemmer:
+    :param use_regex: Use the regex tokenizer (see get_token_spans()) instead of nltk.word_tokenize().
     :return:
     """
-    return list(get_stems(text, lowercase=lowercase, stopword=stopword, stemmer=stemmer))
+    return list(get_stems(text, lowercase=lowercase, stopword=stopword, stemmer=stemmer, use_regex=use_regex))
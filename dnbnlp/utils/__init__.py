@@ -3,3 +3,4 @@ from .make_law_data import *
 from .make_sfcr_data import *
 from .legislation import *
 from .text_extraction import *
+from .corpus import *
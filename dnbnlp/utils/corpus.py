@@ -0,0 +1,209 @@
+# -*- coding: utf-8 -*-
+"""Memory-mapped corpus of the interim text files.
+
+The text files of a directory (data/interim/sfcr/*.txt) are indexed once: their UTF-8 bytes are concatenated in
+a single blob file with a table of the document offsets. Opening a Corpus only reads the offsets table and
+memory-maps the blob, a document is decoded when it is accessed. The index is rebuilt when a text file is added,
+removed or changed, or when the blob is missing or truncated.
+
+    with Corpus(join('data', 'interim', 'sfcr')) as corpus:
+        for text in corpus.filter(Language='EN', Year=2018):
+            ...
+"""
+
+import mmap
+import os
+import re
+from copy import copy
+from os.path import getsize, isdir, isfile, join
+
+import numpy as np
+import pandas as pd
+
+from dnbnlp.utils.files import atomic_write
+from dnbnlp.utils.text_extraction import get_document_language, sentences_en, sentences_nl
+
+INTERIM_PATH = join('data', 'interim', 'sfcr')
+METADATA_FN = join('data', 'external', 'metadata_sfcr.csv')
+
+INDEX_DIRNAME = '.corpus'
+BLOB_FILENAME = 'corpus.blob'
+OFFSETS_FILENAME = 'corpus.offsets.npz'
+
+def get_metadata_filename(row):
+    '''
+    Get the filename (without extension) of the documents of a row of metadata_sfcr.csv, see make_sfcr_data
+    '''
+    return str(row['Year']) + "_" + str(row['Language']) + "_" + row['Insurance Undertaking'] + "_" + row['Document Type']
+
+class Corpus(object):
+    '''
+    Corpus of text files with metadata.
+    len(corpus), corpus[i] (the text of document i), iteration over the texts, corpus[i:j] and filter() for
+    subsets of the corpus (sharing the memory-mapped blob).
+    close() (or a with block) closes the memory map, closing a subset only detaches the subset from it.
+    '''
+
+    def __init__(self, path=INTERIM_PATH, metadata_fn=METADATA_FN, index_path=None):
+        '''
+        :param path: directory of the text files
+        :param metadata_fn: csv file with the metadata of the documents (metadata_sfcr.csv), None for no metadata
+        :param index_path: directory of the blob and the offsets table, by default a hidden directory in path
+        '''
+        self.path = path
+        self.index_path = index_path if index_path is not None else join(path, INDEX_DIRNAME)
+        self._blob = None
+        self._owns_blob = True
+        self._open_index()
+        self.metadata = self._get_metadata(metadata_fn)
+
+    def _list_files(self):
+        filenames = sorted(f for f in os.listdir(self.path) if f[-4:] == '.txt' and isfile(join(self.path, f)))
+        stats = [os.stat(join(self.path, f)) for f in filenames]
+        return (np.array(filenames, dtype=str),
+                np.array([stat.st_size for stat in stats], dtype=np.int64),
+                np.array([stat.st_mtime_ns for stat in stats], dtype=np.int64))
+
+    def _open_index(self):
+        filenames, sizes, mtimes = self._list_files()
+        offsets_fn = join(self.index_path, OFFSETS_FILENAME)
+        blob_fn = join(self.index_path, BLOB_FILENAME)
+        index = None
+        if isfile(offsets_fn):
+            with np.load(offsets_fn, allow_pickle=False) as data:
+                index = {key: data[key] for key in data.files}
+        if index is None or not (np.array_equal(index['filenames'], filenames)
+                                 and np.array_equal(index['sizes'], sizes)
+                                 and np.array_equal(index['mtimes'], mtimes)
+                                 and isfile(blob_fn) and getsize(blob_fn) == index['offsets'][-1]):
+            index = self._build_index(filenames, sizes, mtimes)
+
+        self.filenames = index['filenames']
+        self._starts = index['offsets'][:-1]
+        self._ends = index['offsets'][1:]
+        if index['offsets'][-1] > 0:
+            with open(blob_fn, 'rb') as blob_file:
+                self._blob = mmap.mmap(blob_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def _build_index(self, filenames, sizes, mtimes):
+        '''
+        Concatenate the text files in the blob, one file at a time
+        '''
+        if not isdir(self.index_path):
+            os.makedirs(self.index_path)
+        blob_fn = join(self.index_path, BLOB_FILENAME)
+        offsets = np.zeros(len(filenames) + 1, dtype=np.int64)
+        with atomic_write(blob_fn) as tmp_fn:
+            with open(tmp_fn, 'wb') as blob_file:
+                for idx, filename in enumerate(filenames):
+                    with open(join(self.path, filename), 'rb') as text_file:
+                        offsets[idx + 1] = offsets[idx] + _copy_file(text_file, blob_file)
+
+        index = {'filenames': filenames, 'sizes': sizes, 'mtimes': mtimes, 'offsets': offsets}
+        # numpy.savez() adds .npz to other filenames
+        with atomic_write(join(self.index_path, OFFSETS_FILENAME), suffix='.npz') as tmp_fn:
+            np.savez(tmp_fn, **index)
+        return index
+
+    def _get_metadata(self, metadata_fn):
+        '''
+        Get the metadata row of each document: the row of <filename>.txt, or of <filename>_<n>.txt for the
+        documents linked from a html page
+        '''
+        metadata = pd.DataFrame({'Filename': self.filenames})
+        if metadata_fn is not None and isfile(metadata_fn):
+            df_metadata = pd.read_csv(metadata_fn, encoding='Latin-1')
+            df_metadata.index = [get_metadata_filename(row) for _, row in df_metadata.iterrows()]
+            df_metadata = df_metadata[~df_metadata.index.duplicated()]
+            keys = [filename[:-4] if filename[:-4] in df_metadata.index else re.sub(r'_\d+$', '', filename[:-4])
+                    for filename in self.filenames]
+            metadata = pd.concat([metadata, df_metadata.reindex(keys).reset_index(drop=True)], axis=1)
+        return metadata
+
+    def close(self):
+        '''
+        Close the memory map of the blob - the subsets of the corpus can not be read after that. A subset is only
+        detached from the memory map.
+        '''
+        if self._blob is not None and self._owns_blob:
+            self._blob.close()
+        self._blob = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __len__(self):
+        return len(self.filenames)
+
+    def get_text(self, idx):
+        '''
+        Decode the text of document idx from the blob
+        '''
+        if self._starts[idx] == self._ends[idx]:
+            return ''
+        if self._blob is None:
+            raise ValueError('I/O operation on a closed corpus')
+        return self._blob[self._starts[idx]:self._ends[idx]].decode('utf-8')
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return self._select(np.arange(len(self))[key])
+        return self.get_text(key)
+
+    def __iter__(self):
+        for idx in range(len(self)):
+            yield self.get_text(idx)
+
+    def iter_documents(self):
+        '''
+        Iterate over the documents: (filename, text)
+        '''
+        for idx in range(len(self)):
+            yield str(self.filenames[idx]), self.get_text(idx)
+
+    def iter_sentences(self):
+        '''
+        Iterate over the sentences of the documents: (filename, sentence index, sentence), the sentences are split
+        like the sentences of doc2dataframe() - the language follows from the filename and the metadata
+        '''
+        languages = self.metadata['Language'] if 'Language' in self.metadata else [None] * len(self)
+        for idx, language in enumerate(languages):
+            filename = str(self.filenames[idx])
+            language = get_document_language(filename, language.lower() if isinstance(language, str) else '')
+            sentences = sentences_nl if language == "nl" else sentences_en
+            text = sentences.pre_process_document(self.get_text(idx))
+            for sentence_idx, sentence in enumerate(sentences.get_sentence_list(text)):
+                yield filename, sentence_idx, sentence
+
+    def filter(self, mask=None, **conditions):
+        '''
+        Get the documents matching the metadata
+        :param mask: boolean array (or Series) over the documents, e.g. corpus.metadata['Year'] >= 2018
+        :param conditions: metadata column -> value or list of values, e.g. Language='EN', Year=[2017, 2018]
+        :return: Corpus of the matching documents
+        '''
+        selected = np.ones(len(self), dtype=bool) if mask is None else np.array(mask, dtype=bool)
+        for column, values in conditions.items():
+            if not isinstance(values, (list, tuple, set)):
+                values = [values]
+            selected &= self.metadata[column].isin(values).values
+        return self._select(np.flatnonzero(selected))
+
+    def _select(self, ids):
+        corpus = copy(self)
+        corpus._owns_blob = False
+        corpus.filenames = self.filenames[ids]
+        corpus._starts = self._starts[ids]
+        corpus._ends = self._ends[ids]
+        corpus.metadata = self.metadata.iloc[ids].reset_index(drop=True)
+        return corpus
+
+def _copy_file(in_file, out_file, chunk_size=1 << 20):
+    size = 0
+    for chunk in iter(lambda: in_file.read(chunk_size), b''):
+        out_file.write(chunk)
+        size += len(chunk)
+    return size
@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+"""Parquet store of the sentence data of the corpus.
+
+The sentences of all documents (the rows of text_extraction.doc2dataframe()) are stored in one Parquet dataset,
+partitioned by language, document type and document year in hive style directories:
+
+    <store_path>/language=en/document_type=sfcr/document_year=2018/<document>.parquet
+
+Each document (one insurer's report) is one file with a single row group, so adding or replacing a document
+never rewrites other documents and workers can write documents concurrently. read_corpus() reads the whole corpus
+at once, only the requested columns and the partitions matching the filters.
+"""
+
+import os
+from urllib.parse import quote
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from dnbnlp.utils.files import atomic_write
+from dnbnlp.utils.text_extraction import DOC_COLUMNS
+
+# Columns of the store for the columns of doc2dataframe()
+STORE_COLUMNS = {'source': 'source', 'language': 'language', 'document type': 'document_type',
+                 'document year': 'document_year', 'page': 'page', 'sentence': 'sentence', 'text': 'text'}
+
+PARTITION_SCHEMA = pa.schema([('language', pa.string()),
+                              ('document_type', pa.string()),
+                              ('document_year', pa.int32())])
+
+DOCUMENT_SCHEMA = pa.schema([('source', pa.string()),
+                             ('page', pa.int32()),
+                             ('sentence', pa.int32()),
+                             ('text', pa.string())])
+
+def get_partition_path(store_path, language, document_type, document_year):
+    '''
+    Get the directory of a partition of the store
+    '''
+    values = [language, document_type, int(document_year)]
+    return os.path.join(store_path, *['%s=%s' % (field.name, quote(str(value), safe=''))
+                                      for field, value in zip(PARTITION_SCHEMA, values)])
+
+def get_document_path(store_path, name, language, document_type, document_year):
+    '''
+    Get the file of a document in the store, name is the (relative) filename of the document
+    '''
+    return os.path.join(get_partition_path(store_path, language, document_type, document_year),
+                        quote(name, safe='') + '.parquet')
+
+def write_document(df, fn):
+    '''
+    Write the sentences of a document (a doc2dataframe() DataFrame) to a document file as a single row group.
+    The file is written to a temporary file first, readers never see a partly written document.
+    '''
+    _write_table(pa.Table.from_pandas(df[['source', 'page', 'sentence', 'text']], schema=DOCUMENT_SCHEMA,
+                                      preserve_index=False), fn)
+
+def copy_document(document_fn, fn, source):
+    '''
+    Copy a document file with another source, e.g. from the extraction cache
+    '''
+    table = pq.read_table(document_fn, schema=DOCUMENT_SCHEMA)
+    _write_table(table.set_column(0, 'source', pa.array([source] * table.num_rows, pa.string())), fn)
+
+def _write_table(table, fn):
+    os.makedirs(os.path.dirname(fn), exist_ok=True)
+    # hidden temporary file - ignored by read_corpus() while it is written
+    with atomic_write(fn, hidden=True) as tmp_fn:
+        pq.write_table(table, tmp_fn, row_group_size=max(1, table.num_rows))
+
+def read_corpus(store_path, columns=None, filters=None):
+    '''
+    Read the sentences of the corpus
+    :param store_path:
+    :param columns: columns to read (names of doc2dataframe() or of the store), all columns if None
+    :param filters: dict column -> value or list of values, e.g. {'language': 'en', 'document year': [2017, 2018]},
+    only the matching partitions are read
+    :return: DataFrame with the columns of doc2dataframe()
+    '''
+    store_names = dict(STORE_COLUMNS)
+    store_names.update({store_name: store_name for store_name in STORE_COLUMNS.values()})
+    doc_names = {store_name: name for name, store_name in STORE_COLUMNS.items()}
+    if columns is None:
+        columns = DOC_COLUMNS
+    store_columns = [store_names[column] for column in columns]
+
+    if not os.path.isdir(store_path):
+        return pd.DataFrame(columns=[doc_names[column] for column in store_columns])
+
+    dataset = ds.dataset(store_path, schema=pa.unify_schemas([DOCUMENT_SCHEMA, PARTITION_SCHEMA]), format='parquet',
+                         partitioning=ds.partitioning(PARTITION_SCHEMA, flavor='hive'),
+                         exclude_invalid_files=False, ignore_prefixes=['.', '_'])
+    expression = None
+    for column, values in (filters or {}).items():
+        if not isinstance(values, (list, tuple, set)):
+            values = [values]
+        column_expression = pc.field(store_names[column]).isin(list(values))
+        expression = column_expression if expression is None else expression & column_expression
+
+    table = dataset.to_table(columns=store_columns, filter=expression)
+    return table.to_pandas().rename(columns=doc_names)
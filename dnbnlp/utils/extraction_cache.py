@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+"""Content-addressed cache of extracted documents.
+
+The outputs of the extraction of a document (text file, sentence DataFrame) are stored in the cache under the
+SHA-256 of the document bytes, the kind of output and EXTRACTOR_VERSION. A manifest in the interim directory maps
+each document filename to the hash of its content and the outputs written for it, with the status, timings and
+errors of the conversion. A document is only extracted again if its content changed, a renamed or re-downloaded
+identical document gets its outputs from the cache. Only the main process writes the manifest, worker processes
+only write outputs.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+from os.path import isfile, join
+
+from dnbnlp.utils.files import atomic_write
+
+# Version of the extraction - increase on every change of the extracted outputs to invalidate the cache
+EXTRACTOR_VERSION = 1
+
+MANIFEST_FILENAME = 'manifest.json'
+
+def get_file_hash(path, chunk_size=1 << 20):
+    '''
+    Get the SHA-256 of the content of a file
+    '''
+    file_hash = hashlib.sha256()
+    with open(path, 'rb') as in_file:
+        for chunk in iter(lambda: in_file.read(chunk_size), b''):
+            file_hash.update(chunk)
+    return file_hash.hexdigest()
+
+def get_output_kind(extension, *options):
+    '''
+    Get the kind of an output: the file extension and a digest of the extraction options,
+    e.g. get_output_kind('pickle', language, document_type, document_year)
+    '''
+    if not options:
+        return extension
+    return extension + '-' + hashlib.sha256(repr(options).encode('utf-8')).hexdigest()[:16]
+
+def get_output_extension(kind):
+    '''
+    Get the file extension of an output kind, see get_output_kind()
+    '''
+    return kind.split('-', 1)[0]
+
+class ExtractionCache(object):
+    '''
+    Cache of extraction outputs with the manifest of an interim directory
+    '''
+
+    def __init__(self, cache_path, manifest_path=None):
+        '''
+        :param cache_path: directory of the cached outputs
+        :param manifest_path: directory of the manifest, usually the interim directory - None for no manifest,
+        e.g. in worker processes writing the outputs of documents recorded by the main process
+        '''
+        self.cache_path = cache_path
+        self.manifest_fn = join(manifest_path, MANIFEST_FILENAME) if manifest_path is not None else None
+        self.manifest = {}
+        if self.manifest_fn and isfile(self.manifest_fn):
+            with open(self.manifest_fn, 'r', encoding='utf-8') as manifest_file:
+                self.manifest = json.load(manifest_file)
+
+    def get_object_path(self, file_hash, kind):
+        '''
+        Get the path of the cached output of a document with content hash file_hash
+        '''
+        return join(self.cache_path, file_hash[:2], '%s.v%d.%s' % (file_hash, EXTRACTOR_VERSION, kind))
+
+    def get_entry(self, name, file_hash):
+        '''
+        Get the manifest entry of a document if it is for the current content and extractor version
+        '''
+        entry = self.manifest.get(name, {})
+        if entry.get('sha256') == file_hash and entry.get('extractor_version') == EXTRACTOR_VERSION:
+            return entry
+        return None
+
+    def is_current(self, name, file_hash, kind, target_fn):
+        '''
+        Check if target_fn holds the output for the current content of the document
+        '''
+        entry = self.get_entry(name, file_hash)
+        return entry is not None and entry.get('outputs', {}).get(kind) == target_fn and isfile(target_fn)
+
+    def write_output(self, file_hash, source_fn, target_fn, kind, extract, materialize=shutil.copyfile):
+        '''
+        Write the output of the document source_fn to target_fn, extracting it only if it is not cached.
+        Safe to call from several processes, the manifest is not changed (see record()).
+        :param file_hash: content hash of the document, see get_file_hash()
+        :param source_fn: path of the document
+        :param target_fn: path of the output
+        :param kind: kind of the output, see get_output_kind()
+        :param extract: extract(source_fn, object_fn) writes the output of the document to object_fn
+        :param materialize: materialize(object_fn, target_fn) writes target_fn from the cached output
+        :return: 'cached' - written from the cache, 'extracted'
+        '''
+        object_fn = self.get_object_path(file_hash, kind)
+        if isfile(object_fn):
+            status = 'cached'
+        else:
+            os.makedirs(os.path.dirname(object_fn), exist_ok=True)
+            # an interrupted extraction leaves no cached output
+            with atomic_write(object_fn) as tmp_fn:
+                extract(source_fn, tmp_fn)
+            status = 'extracted'
+        materialize(object_fn, target_fn)
+        return status
+
+    def record(self, name, file_hash, outputs=None, **info):
+        '''
+        Record the outputs (dict kind -> target_fn) and other information of a document in the manifest,
+        e.g. status, timings and errors, and write the manifest.
+        An output replaces the output with the same extension recorded before for the document in another file,
+        e.g. the corpus file in the partition of another document type, and the file of that output is removed,
+        so the document is not read twice from the corpus.
+        '''
+        outputs = outputs or {}
+        extensions = {get_output_extension(kind) for kind in outputs}
+        previous_outputs = self.manifest.get(name, {}).get('outputs', {})
+        replaced = [kind for kind, target_fn in previous_outputs.items()
+                    if get_output_extension(kind) in extensions and target_fn not in outputs.values()]
+        for kind in replaced:
+            if isfile(previous_outputs[kind]):
+                os.remove(previous_outputs[kind])
+        entry = self.get_entry(name, file_hash)
+        if entry is None:
+            entry = {'sha256': file_hash, 'extractor_version': EXTRACTOR_VERSION, 'outputs': {}}
+        for kind in replaced:
+            entry['outputs'].pop(kind, None)
+        entry['outputs'].update(outputs)
+        entry.update(info)
+        self.manifest[name] = entry
+        self.save()
+
+    def convert(self, name, source_fn, target_fn, kind, extract, materialize=shutil.copyfile):
+        '''
+        Write the output of the document source_fn to target_fn if it is not current and record it in the manifest.
+        :param name: filename of the document in the manifest
+        :return: 'current' - target_fn is up to date, 'cached' - written from the cache, 'extracted'
+        '''
+        file_hash = get_file_hash(source_fn)
+        if self.is_current(name, file_hash, kind, target_fn):
+            return 'current'
+        status = self.write_output(file_hash, source_fn, target_fn, kind, extract, materialize)
+        self.record(name, file_hash, {kind: target_fn})
+        return status
+
+    def save(self):
+        '''
+        Write the manifest - without a manifest path the manifest is only kept in memory
+        '''
+        if self.manifest_fn is None:
+            return
+        os.makedirs(os.path.dirname(self.manifest_fn) or '.', exist_ok=True)
+        with atomic_write(self.manifest_fn) as tmp_fn:
+            with open(tmp_fn, 'w', encoding='utf-8') as manifest_file:
+                json.dump(self.manifest, manifest_file, indent=1, sort_keys=True)
@@ -0,0 +1,35 @@
+# -*- coding: utf-8 -*-
+"""Atomic file writing.
+
+Files shared by processes (caches, indexes, manifests) are written to a temporary file next to the target first
+and then moved over the target, so readers never see a partly written file.
+"""
+
+import os
+from contextlib import contextmanager
+
+
+@contextmanager
+def atomic_write(fn, suffix='', hidden=False):
+    '''
+    Write a file atomically: the block writes the yielded temporary filename, which replaces fn when the block exits
+    without error. The temporary filename holds the process id, processes writing the same file do not clash.
+    On an error the temporary file is removed and fn is left as it was.
+
+        with atomic_write(fn) as tmp_fn:
+            with open(tmp_fn, 'wb') as tmp_file:
+                ...
+
+    :param fn: target file
+    :param suffix: extension after the temporary filename, e.g. '.npz' for numpy.savez()
+    :param hidden: dot-prefixed temporary filename, ignored by readers of the directory
+    '''
+    directory, name = os.path.split(fn)
+    tmp_fn = os.path.join(directory, '%s%s.%d.tmp%s' % ('.' if hidden else '', name, os.getpid(), suffix))
+    try:
+        yield tmp_fn
+    except BaseException:
+        if os.path.exists(tmp_fn):
+            os.remove(tmp_fn)
+        raise
+    os.replace(tmp_fn, fn)
@@ -2,15 +2,24 @@
 
 import click
 import logging
+import time
+from datetime import datetime
+from multiprocessing import Pool
 from pathlib import Path
 from dotenv import find_dotenv, load_dotenv
  
-from os.path import isfile, join, exists
+from os.path import basename, dirname, isfile, join, exists, normpath, relpath
 from os import listdir, walk, makedirs
-from dnbnlp.utils.text_extraction import doc2text, doc2dataframe
+from dnbnlp.utils.text_extraction import doc2text, doc2dataframe, get_document_language
+from dnbnlp.utils.corpus_store import copy_document, get_document_path, write_document
+from dnbnlp.utils.extraction_cache import ExtractionCache, get_file_hash, get_output_kind
+from dnbnlp.utils.pdfpages import silence_pdfminer
+from dnbnlp.utils.parallel import get_n_jobs
  
 EXTERNAL_PATH = join('data', 'external', 'sfcr')
 INTERIM_PATH = join('data', 'interim', 'sfcr')
+CACHE_PATH = join('data', 'interim', 'cache')
+CORPUS_PATH = join('data', 'interim', 'corpus')
 FILE_EXTENSION = "pdf"
 FILE_TERMS = ""
 LANGUAGE = "en"
@@ -25,57 +34,131 @@ DOCUMENT_YEAR = 0
 @click.option('--language', default=LANGUAGE, help='The language of the files.')
 @click.option('--document_type', default=DOCUMENT_TYPE, help='The document type of the files.')
 @click.option('--document_year', default=DOCUMENT_YEAR, help='The document year of the files.')
+@click.option('--cache_path', default=CACHE_PATH, help='The path of the cached extraction outputs.')
+@click.option('--corpus_path', default=CORPUS_PATH, help='The path of the sentence corpus (parquet).')
+@click.option('--workers', default=1, help='The number of processes converting files, -1 for all CPUs.')
+@click.option('--retry_errors', is_flag=True, help='Convert files again which failed in a previous run.')
 
-def main(output_path, interim_path, file_extension, file_terms, language, document_type, document_year):
-    """Reads all pdfs in external_filepath and converts to txt and dataframes in interim_path
+def main(output_path, interim_path, file_extension, file_terms, language, document_type, document_year, cache_path,
+         corpus_path, workers, retry_errors):
+    """Reads all pdfs in external_filepath and converts to txt in interim_path and to sentences in the
+       corpus store in corpus_path (see corpus_store)
+       Only new and changed pdfs are converted, see extraction_cache. The status, timings and errors
+       of each file are written to the manifest as soon as it is converted, so an interrupted run
+       continues with the files which were not converted yet.
     """
     logger = logging.getLogger(__name__)
     logger.info('Converting pdf to txt and dataframes')
     logger.info('Reading in %s' % output_path)
     logger.info('Writing in %s' % interim_path)
+    silence_pdfminer()
     external_files = []
     for dirpath, dirnames, filenames in walk(output_path):
         for filename in [f for f in filenames if f.endswith("." + file_extension)]:
             if file_terms.lower() in filename.lower():
                 external_files.append((dirpath, filename))
  
+    cache = ExtractionCache(cache_path, interim_path)
+    txt_kind = get_output_kind('txt')
+    doc_kind = get_output_kind('parquet', language, document_type, document_year)
+    tasks = []
     for file in external_files:
-        logger.info('Processing %s' % file[1])
         pdf_filename = file[1]
         txt_filename = file[1][:-len(file_extension)] + 'txt'
-        pck_filename = file[1][:-len(file_extension)] + 'pickle'
-        new_dir = join(interim_path, file[0][len(output_path):])
+        new_dir = normpath(join(interim_path, relpath(file[0], output_path)))
         if not exists(new_dir):
-            logger.info('Making new directory %s' % interim_path)
+            logger.info('Making new directory %s' % new_dir)
             makedirs(new_dir)
-        if not isfile(join(new_dir, txt_filename)):
-            convert_to_text(pdf_filename, txt_filename, file[0], new_dir, language)
-        if not isfile(join(new_dir, pck_filename)):
-            convert_to_dataframe(pdf_filename, pck_filename, file[0], new_dir, language, document_type, document_year)
+        source_fn = join(file[0], pdf_filename)
+        name = relpath(source_fn, output_path)
+        file_hash = get_file_hash(source_fn)
+        outputs = {txt_kind: join(new_dir, txt_filename),
+                   doc_kind: get_document_path(corpus_path, name, get_document_language(source_fn, language),
+                                               document_type, document_year)}
+        if all(cache.is_current(name, file_hash, kind, target_fn) for kind, target_fn in outputs.items()):
+            logger.info('Skipping %s, up to date' % name)
+            continue
+        entry = cache.get_entry(name, file_hash)
+        if entry is not None and entry.get('status') == 'error' and not retry_errors:
+            logger.info('Skipping %s, failed before: %s' % (name, entry.get('error')))
+            continue
+        tasks.append((name, source_fn, file_hash, outputs[txt_kind], outputs[doc_kind], cache_path,
+                      language, document_type, document_year))
+
+    logger.info('Converting %d of %d files' % (len(tasks), len(external_files)))
+    workers = get_n_jobs(workers)
+    if workers == 1 or len(tasks) <= 1:
+        record_results(cache, map(convert_document, tasks))
+    else:
+        with Pool(min(workers, len(tasks)), initializer=silence_pdfminer) as pool:
+            record_results(cache, pool.imap_unordered(convert_document, tasks))
+
+def record_results(cache, results):
+    """Write the result of each converted file to the manifest as soon as it is ready
+    """
+    logger = logging.getLogger(__name__)
+    for name, file_hash, outputs, info in results:
+        cache.record(name, file_hash, outputs, **info)
+        if info['status'] == 'done':
+            logger.info('Converted %s in %.1fs (%s)' % (name, info['seconds'], ', '.join(
+                '%s %s' % (kind, status) for kind, status in sorted(info['outputs_status'].items()))))
+        else:
+            logger.error('Converting %s failed: %s' % (name, info['error']))
+
+def convert_document(task):
+    """Convert a pdf to txt and corpus sentences, using the cached outputs if the content was converted before.
+       Runs in the worker processes, the result is recorded in the manifest by the main process.
+    """
+    name, source_fn, file_hash, txt_fn, doc_fn, cache_path, language, document_type, document_year = task
+    logger = logging.getLogger(__name__)
+    logger.info('Processing %s' % name)
+    cache = ExtractionCache(cache_path)
+    outputs = {}
+    outputs_status = {}
+    timings = {}
+    start = time.time()
+    try:
+        kind = get_output_kind('txt')
+        outputs_status[kind] = cache.write_output(file_hash, source_fn, txt_fn, kind,
+            lambda source_fn, object_fn: convert_to_text(basename(source_fn), basename(object_fn),
+                                                         dirname(source_fn), dirname(object_fn), language))
+        outputs[kind] = txt_fn
+        timings[kind] = round(time.time() - start, 3)
+
+        kind = get_output_kind('parquet', language, document_type, document_year)
+        outputs_status[kind] = cache.write_output(file_hash, source_fn, doc_fn, kind,
+            lambda source_fn, object_fn: convert_to_parquet(basename(source_fn), basename(object_fn),
+                                                            dirname(source_fn), dirname(object_fn),
+                                                            language, document_type, document_year),
+            lambda object_fn, target_fn: copy_document(object_fn, target_fn, source_fn))
+        outputs[kind] = doc_fn
+        timings[kind] = round(time.time() - start - sum(timings.values()), 3)
+        info = {'status': 'done', 'error': None}
+    except Exception as e:
+        logger.exception('Error converting %s' % name)
+        info = {'status': 'error', 'error': '%s: %s' % (type(e).__name__, e)}
+    info.update({'seconds': round(time.time() - start, 3), 'timings': timings, 'outputs_status': outputs_status,
+                 'converted_at': datetime.now().isoformat(timespec='seconds')})
+    return name, file_hash, outputs, info
  
 def convert_to_text(pdf_filename, txt_filename, output_path, interim_path, language):
     logger = logging.getLogger(__name__)
     logger.info('Converting %s to txt' % pdf_filename)
     logger.info('--Doc2text')
-    logging.getLogger().setLevel(logging.ERROR)
     text = doc2text(join(output_path, pdf_filename), language)
-    logging.getLogger().setLevel(logging.INFO)
     logger.info('--Saving to txt file')
     txt = open(join(interim_path, txt_filename), "wb")
     logger.info('--Writing file %s' % str(join(interim_path, txt_filename)))
     txt.write(text.encode('utf-8'))
     txt.close()
  
-def convert_to_dataframe(pdf_filename, pck_filename, output_path, interim_path, language, document_type, document_year):
+def convert_to_parquet(pdf_filename, parquet_filename, output_path, interim_path, language, document_type, document_year):
     logger = logging.getLogger(__name__)
-    logger.info('Converting %s to dataframe' % pdf_filename)
+    logger.info('Converting %s to sentences' % pdf_filename)
     logger.info('--Doc2DataFrame')
-    logging.getLogger().setLevel(logging.ERROR)
     df = doc2dataframe(join(output_path, pdf_filename), language, document_type, document_year)
-    logging.getLogger().setLevel(logging.INFO)
-    logger.info('--Saving to dataframe file')
-    logger.info('--Writing file %s' % str(join(interim_path, pck_filename)))
-    df.to_pickle(join(interim_path, pck_filename))
+    logger.info('--Writing file %s' % str(join(interim_path, parquet_filename)))
+    write_document(df, join(interim_path, parquet_filename))
    
 if __name__ == '__main__':
     log_fmt = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
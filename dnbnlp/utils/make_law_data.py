@@ -9,6 +9,7 @@ from os import listdir
 import re
 import requests
 from dnbnlp.utils.text_extraction import doc2text
+from dnbnlp.utils.pdfpages import silence_pdfminer
 
 EXTERNAL_PATH = join('data', 'external', 'law')
 INTERIM_PATH = join('data', 'interim', 'law')
@@ -88,9 +89,8 @@ def main(language_id, output_path, interim_path):
             
             # reading pages from pdf file
             logger.info('--Doc2text')
-            logging.getLogger().setLevel(logging.ERROR)
+            silence_pdfminer()
             da_text = doc2text(join(output_path, 'Solvency II Delegated Acts - ' + language + '.pdf'))
-            logging.getLogger().setLevel(logging.INFO)
 
             # deleting page headers
             logger.info('--Deleting page headers')
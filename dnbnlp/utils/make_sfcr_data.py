@@ -5,11 +5,15 @@ from pathlib import Path
 from dotenv import find_dotenv, load_dotenv
 import pandas as pd
 
-from os.path import isfile, join
+from os.path import basename, dirname, isfile, join
 from os import listdir
 import re
 import requests
-from dnbnlp.utils.text_extraction import doc2text, doc2dataframe
+from dnbnlp.utils.text_extraction import doc2text, get_document_language
+from dnbnlp.utils.extraction_cache import ExtractionCache, get_output_kind
+from dnbnlp.utils.corpus_store import copy_document, get_document_path
+from dnbnlp.utils.make_dataset import convert_to_parquet
+from dnbnlp.utils.pdfpages import silence_pdfminer
 
 from bs4 import BeautifulSoup as soup
 import urllib
@@ -17,15 +21,21 @@ import urllib
 METADATA_PATH = join('data', 'external')
 EXTERNAL_PATH = join('data', 'external', 'sfcr')
 INTERIM_PATH = join('data', 'interim', 'sfcr')
+CACHE_PATH = join('data', 'interim', 'cache')
+CORPUS_PATH = join('data', 'interim', 'corpus')
 
 @click.command()
 @click.option('--output_path', default=EXTERNAL_PATH, help='The path of the downloaded files.')
 @click.option('--interim_path', default=INTERIM_PATH, help='The path of the interim files.')
+@click.option('--cache_path', default=CACHE_PATH, help='The path of the cached extraction outputs.')
+@click.option('--corpus_path', default=CORPUS_PATH, help='The path of the sentence corpus (parquet).')
 
-def main(output_path, interim_path):
+def main(output_path, interim_path, cache_path, corpus_path):
     """Downloads pdfs from internet in external_path 
        based on contents in metadata_sfcr.csv and 
-       converts to txt and dataframes in interim_path
+       converts to txt in interim_path and to sentences in the corpus store in corpus_path
+       (partitioned by the language, document type and year of the metadata)
+       Only new and changed pdfs are converted, see extraction_cache
     """
     logger = logging.getLogger(__name__)
     logger.info('Downloading SFCRs')
@@ -49,25 +59,40 @@ def main(output_path, interim_path):
             n_pdfs = download_html(filename, url, output_path)
         df_sfcr.loc[row, "Number of pdfs"] = n_pdfs
 
-    files = [f for f in listdir(interim_path) if isfile(join(interim_path, f))]    
+    silence_pdfminer()
+    cache = ExtractionCache(cache_path, interim_path)
     for row in df_sfcr.index:
         if df_sfcr.loc[row, "Url Type"]=="PDF":
-            pdf_filename = df_sfcr.loc[row, "Filename"]
-            txt_filename = df_sfcr.loc[row, "Filename"][:-3] + 'txt'
-            pck_filename = df_sfcr.loc[row, "Filename"][:-3] + 'pickle'
-            if txt_filename not in files:
-                convert_to_text(pdf_filename, txt_filename, output_path, interim_path)
-            if pck_filename not in files:
-                convert_to_dataframe(pdf_filename, pck_filename, output_path, interim_path)
+            pdf_filenames = [df_sfcr.loc[row, "Filename"]]
         else:
-            for n in range(df_sfcr.loc[row, "Number of pdfs"]):
-                pdf_filename = df_sfcr.loc[row, "Filename"][:-4] + "_"+str(n+1) + ".pdf"
-                txt_filename = pdf_filename[:-3]+'txt'
-                pck_filename = df_sfcr.loc[row, "Filename"][:-4] + "_"+str(n+1) + ".pickle"
-                if txt_filename not in files:
-                    convert_to_text(pdf_filename, txt_filename, output_path, interim_path)
-                if pck_filename not in files:
-                    convert_to_dataframe(pdf_filename, pck_filename, output_path, interim_path)
+            pdf_filenames = [df_sfcr.loc[row, "Filename"][:-4] + "_"+str(n+1) + ".pdf"
+                             for n in range(df_sfcr.loc[row, "Number of pdfs"])]
+        language = str(df_sfcr.loc[row, "Language"]).lower()
+        document_type = df_sfcr.loc[row, "Document Type"]
+        document_year = int(df_sfcr.loc[row, "Year"])
+        for pdf_filename in pdf_filenames:
+            convert_cached(cache, pdf_filename, output_path, interim_path, corpus_path,
+                           language, document_type, document_year)
+
+def convert_cached(cache, pdf_filename, output_path, interim_path, corpus_path, language, document_type, document_year):
+    """Converts a pdf to txt in interim_path and to sentences in corpus_path if the content of the pdf is new
+    """
+    logger = logging.getLogger(__name__)
+    source_fn = join(output_path, pdf_filename)
+    txt_filename = pdf_filename[:-3] + 'txt'
+    doc_fn = get_document_path(corpus_path, pdf_filename, get_document_language(source_fn, language),
+                               document_type, document_year)
+    status = cache.convert(pdf_filename, source_fn, join(interim_path, txt_filename), get_output_kind('txt'),
+        lambda source_fn, object_fn: convert_to_text(basename(source_fn), basename(object_fn),
+                                                     dirname(source_fn), dirname(object_fn)))
+    logger.info('--Text of %s %s' % (pdf_filename, status))
+    status = cache.convert(pdf_filename, source_fn, doc_fn,
+        get_output_kind('parquet', language, document_type, document_year),
+        lambda source_fn, object_fn: convert_to_parquet(basename(source_fn), basename(object_fn),
+                                                        dirname(source_fn), dirname(object_fn),
+                                                        language, document_type, document_year),
+        lambda object_fn, target_fn: copy_document(object_fn, target_fn, source_fn))
+    logger.info('--Sentences of %s %s' % (pdf_filename, status))
 
 def download_pdf(filename, url, output_path):
     logger = logging.getLogger(__name__)
@@ -109,24 +134,13 @@ def convert_to_text(pdf_filename, txt_filename, output_path, interim_path):
     logger = logging.getLogger(__name__)
     logger.info('Converting %s to txt' % pdf_filename)
     logger.info('--Doc2text')
-    logging.getLogger().setLevel(logging.ERROR)
     text = doc2text(join(output_path, pdf_filename))
-    logging.getLogger().setLevel(logging.INFO)
     logger.info('--Saving to txt file')
     txt = open(join(interim_path, txt_filename), "wb")
     txt.write(text.encode('utf-8'))
     txt.close()
 
-def convert_to_dataframe(pdf_filename, pck_filename, output_path, interim_path):
-    logger = logging.getLogger(__name__)
-    logger.info('Converting %s to dataframe' % pdf_filename)
-    logger.info('--Doc2text')
-    logging.getLogger().setLevel(logging.ERROR)
-    df = doc2dataframe(join(output_path, pdf_filename))
-    logging.getLogger().setLevel(logging.INFO)
-    logger.info('--Saving to dataframe file')
-    df.to_pickle(join(interim_path, pck_filename))
-    
+
 if __name__ == '__main__':
     log_fmt = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
     logging.basicConfig(level=logging.INFO, format=log_fmt)
@@ -0,0 +1,17 @@
+# -*- coding: utf-8 -*-
+"""Number of parallel workers.
+
+Functions with an n_jobs argument use the same convention: 1 - work in the current process (or thread),
+None or a negative number - use all CPUs, n - use n workers.
+"""
+
+import os
+
+
+def get_n_jobs(n_jobs):
+    '''
+    Get the number of workers of an n_jobs argument, see the module docstring
+    '''
+    if n_jobs is None or n_jobs < 0:
+        return os.cpu_count() or 1
+    return n_jobs
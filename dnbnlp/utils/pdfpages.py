@@ -0,0 +1,207 @@
+"""Page level PDF extraction.
+
+This module runs the pdfminer layout analysis page by page and converts each layout page with a page function,
+e.g. layout2text() for the plain text of the page. The pages can be processed in a pool of processes: the page
+indices are split in ranges of consecutive pages, each worker opens the file itself, analyses its pages and the
+results are put back in page order. iter_pages() parses only the selected pages, lazily: pages are analysed when
+the consumer asks for them and parsing stops when the consumer stops iterating or after the last selected page.
+"""
+
+import logging
+import multiprocessing
+from itertools import islice
+
+from pdfminer.converter import PDFPageAggregator
+from pdfminer.layout import LAParams, LTChar, LTContainer, LTFigure, LTText, LTTextBox, LTTextLine
+from pdfminer.pdfdocument import PDFDocument
+from pdfminer.pdfinterp import PDFResourceManager, PDFPageInterpreter
+from pdfminer.pdfpage import PDFPage
+from pdfminer.pdfparser import PDFParser
+
+from dnbnlp.utils.parallel import get_n_jobs
+
+
+def silence_pdfminer(level=logging.ERROR):
+    '''
+    Only log pdfminer messages from level on (pdfminer logs a lot of warnings and debug messages on broken pdfs).
+    Changes the pdfminer loggers only, not the root logger, so it is safe with other threads and processes logging.
+    '''
+    logging.getLogger('pdfminer').setLevel(level)
+
+
+def layout2text(ltpage):
+    '''
+    Convert a layout page to text, the same text as TextConverter writes for the page
+    '''
+    text = []
+
+    def render(item):
+        if isinstance(item, LTContainer):
+            for child in item:
+                render(child)
+        elif isinstance(item, LTText):
+            text.append(item.get_text())
+        if isinstance(item, LTTextBox):
+            text.append("\n")
+
+    render(ltpage)
+    text.append("\f")
+    return ''.join(text)
+
+
+def _line_attributes(ltpage, chars, in_figure):
+    '''
+    Get the attributes of a text line of layout2lines() from its characters
+    '''
+    html_attr = set()
+    chars = [char for char in chars if isinstance(char, LTChar)]
+    for char in chars:
+        # remove subset tag from fontname, see PDF Reference 5.5.3
+        html_attr.add(('style', 'font-family: %s; font-size:%dpx' % (char.fontname.split('+')[-1], char.size)))
+    if chars:
+        x0, y0 = min(char.x0 for char in chars), min(char.y0 for char in chars)
+        x1, y1 = max(char.x1 for char in chars), max(char.y1 for char in chars)
+        html_attr.add(('position', 'left:%dpx; top:%dpx; width:%dpx; height:%dpx' %
+                       (x0, ltpage.y1 - y1, x1 - x0, y1 - y0)))
+    if in_figure:
+        html_attr.add(('style', 'position:absolute'))
+    return html_attr
+
+
+def _figure_line(ltpage, figure):
+    '''
+    Get the layout2lines() line of the characters of a figure, None if it has none - characters in figures are not
+    grouped in text lines
+    '''
+    chars = [child for child in figure if isinstance(child, LTChar)]
+    if not chars:
+        return None
+    return None, ''.join(char.get_text() for char in chars) + "\n", _line_attributes(ltpage, chars, True)
+
+
+def layout2lines(ltpage):
+    '''
+    Convert a layout page to lines with attributes: (None, text, attributes) for each text line.
+    The attributes are a set of style tuples like the attributes of html2lines():
+    ('style', 'font-family: <font>; font-size:<size>px') for each font in the line,
+    ('position', 'left:<x>px; top:<y>px; width:<w>px; height:<h>px') with the position of the line on the page,
+    lines in figures (tables, charts) are marked with ('style', 'position:absolute').
+    '''
+    html_lines = []
+
+    def render(item, in_figure):
+        if isinstance(item, LTTextLine):
+            text = item.get_text()
+            # the initial category is None
+            html_lines.append((None, text if text.endswith("\n") else text + "\n",
+                               _line_attributes(ltpage, item, in_figure)))
+        elif isinstance(item, LTFigure):
+            figure_line = _figure_line(ltpage, item)
+            if figure_line is not None:
+                html_lines.append(figure_line)
+            for child in item:
+                if not isinstance(child, LTChar):
+                    render(child, True)
+        elif isinstance(item, LTContainer):
+            for child in item:
+                render(child, in_figure)
+
+    render(ltpage, False)
+    return html_lines
+
+
+def layout2page(ltpage):
+    '''
+    Convert a layout page to (text, lines) - see layout2text() and layout2lines()
+    '''
+    return layout2text(ltpage), layout2lines(ltpage)
+
+
+def count_pdf_pages(path):
+    '''
+    Get the number of pages of a pdf file (without layout analysis)
+    '''
+    with open(path, 'rb') as in_file:
+        doc = PDFDocument(PDFParser(in_file))
+        return sum(1 for _ in PDFPage.create_pages(doc))
+
+
+def get_page_selector(pages):
+    '''
+    Get (predicate, stop) for a page selection: the predicate tells if a page index is selected,
+    no page from stop on is selected (stop is None if unknown).
+    :param pages: None - all pages, a range / iterable of page indices (0-based) or a predicate on the page index
+    '''
+    if pages is None:
+        return (lambda page_idx: True), None
+    if callable(pages):
+        return pages, None
+    if isinstance(pages, range) and pages.step > 0:
+        return pages.__contains__, max(pages.stop, 0)
+    page_ids = frozenset(pages)
+    return page_ids.__contains__, max(page_ids, default=-1) + 1
+
+
+def _iter_pages(path, pages, page_func):
+    selected, stop = get_page_selector(pages)
+    with open(path, 'rb') as in_file:
+        doc = PDFDocument(PDFParser(in_file))
+        rsrcmgr = PDFResourceManager()
+        device = PDFPageAggregator(rsrcmgr, laparams=LAParams())
+        interpreter = PDFPageInterpreter(rsrcmgr, device)
+        for page_idx, page in enumerate(islice(PDFPage.create_pages(doc), stop)):
+            if selected(page_idx):
+                interpreter.process_page(page)
+                yield page_idx, page_func(device.get_result())
+
+
+def _extract_selected_pages(args):
+    return list(_iter_pages(*args))
+
+
+def iter_pages(path, pages=None, page_func=layout2text, n_jobs=1, pages_per_task=None):
+    '''
+    Run the layout analysis of the selected pages of a pdf file, lazily.
+    In the current process a page is only parsed when it is consumed, e.g. next(iter_pages(path, range(1)))
+    parses the cover page only. With n_jobs != 1 the workers parse ahead of the consumer, closing the generator
+    stops them.
+    :param path:
+    :param pages: None - all pages, a range / iterable of page indices (0-based) or a predicate on the page index
+    :param page_func: function converting a layout page, should be a module-level function when n_jobs != 1
+    :param n_jobs: Number of processes, see dnbnlp.utils.parallel.
+    :param pages_per_task: number of selected pages processed by a worker at once,
+    by default the pages are split in 4 tasks per process
+    :return: generator of (page index, page_func(layout page)) in page order
+    '''
+    n_jobs = get_n_jobs(n_jobs)
+
+    if n_jobs == 1:
+        yield from _iter_pages(path, pages, page_func)
+        return
+
+    # the selection is evaluated here, the workers get the page indices
+    selected, stop = get_page_selector(pages)
+    page_ids = [page_idx for page_idx in range(count_pdf_pages(path))[:stop] if selected(page_idx)]
+    if not pages_per_task:
+        pages_per_task = max(1, -(-len(page_ids) // (n_jobs * 4)))
+    tasks = [(path, tuple(page_ids[start:start + pages_per_task]), page_func)
+             for start in range(0, len(page_ids), pages_per_task)]
+    with multiprocessing.Pool(min(n_jobs, max(1, len(tasks)))) as pool:
+        for task_res in pool.imap(_extract_selected_pages, tasks):
+            yield from task_res
+
+
+def extract_page_range(path, start, stop, page_func=layout2text):
+    '''
+    Run the layout analysis of the pages start..stop-1 of a pdf file
+    :return: list of page_func(layout page) of the pages
+    '''
+    return [page_res for _, page_res in _iter_pages(path, range(start, stop), page_func)]
+
+
+def extract_pages(path, page_func=layout2text, n_jobs=1, pages_per_task=None, pages=None):
+    '''
+    Run the layout analysis of all (or the selected) pages of a pdf file, see iter_pages()
+    :return: list of page_func(layout page) of the selected pages in page order
+    '''
+    return [page_res for _, page_res in iter_pages(path, pages, page_func, n_jobs, pages_per_task)]
@@ -7,61 +7,48 @@ import sklearn.ensemble
 import numpy
 import ast
 import regex as re
+from collections import Counter
+
+from dnbnlp.utils.pdfpages import iter_pages, layout2page
  
-def doc2dataframe(file, data, df=None):
+# Columns of doc2dataframe()
+DOC_COLUMNS = ['dc:source', 'dc:format', 'dc:language', 'dc:type', 'dc:coverage', 'dc:publisher', 'page', 'text', 'html_text', 'html_tags', 'annotations']
+
+def doc2dataframe(file, data, df=None, n_jobs=1, pages=None):
+    """
+    Convert pdf document to dataframe (each page separately)
+    The text and the lines with their style attributes are taken from a single layout analysis of each page,
+    the pages are analysed in n_jobs processes (see pdfpages.iter_pages()).
+    pages selects the pages: None - all pages, a range / iterable of page indices (0-based) or a predicate on the
+    page index.
+    The rows are added to df if given.
+    """
+    doc_df = pd.DataFrame.from_records(list(doc2records(file, data, n_jobs, pages)), columns=DOC_COLUMNS)
+    if df is None:
+        return doc_df
+    return pd.concat([df, doc_df], ignore_index=True)
+
+def doc2records(file, data, n_jobs=1, pages=None):
     """
-    Convert pdf document to dataframe (each sentence separately)
+    Generate the rows of doc2dataframe() as dicts, one page at a time - for writing large documents straight to disk.
+    The headers and footers are found over all selected pages, so the selected pages are parsed before the first row.
     """
-    codec = 'utf-8'
     print(file)
     if file[-3:].lower()=='pdf':
         try:
-            with open(file, 'rb') as in_file:
-                parser = PDFParser(in_file)
-                doc = PDFDocument(parser)
- 
-                pages_txt = []
-                for page_idx, page in enumerate(PDFPage.create_pages(doc)):
-                    output_string = StringIO()
-                    rsrcmgr = PDFResourceManager()
-                    device = TextConverter(rsrcmgr, output_string, codec = codec, laparams = LAParams())
-                    interpreter = PDFPageInterpreter(rsrcmgr, device)
-                    interpreter.process_page(page)
-                    text = output_string.getvalue()
-                    device.close()
-                    output_string.close()
-                    pages_txt.append(text)
- 
-                html_pages = []
-                pagenos = set()
-                for page in PDFPage.get_pages(in_file, pagenos, maxpages=0, caching=True, check_extractable=True):
-                    rsrcmgr = PDFResourceManager()
-                    output_string = BytesIO()
-                    device = HTMLConverter(rsrcmgr, output_string, codec = codec, laparams = LAParams(), showpageno=False)
-                    interpreter = PDFPageInterpreter(rsrcmgr, device)
-                    interpreter.process_page(page)
-                    html = output_string.getvalue()
-                    html_pages.append(html)
- 
-                html_pages = [pdfparser.html2lines(page) for page in html_pages]
-                html_pages = pdfparser.tag_page_headers(html_pages)
-                html_pages = pdfparser.tag_page_footers(html_pages)
-
-                annotations = [[line[0] for line in page] for page in html_pages]
-                html_text = [[line[1] for line in page] for page in html_pages]
-                html_tags = [[line[2] for line in page] for page in html_pages]
- 
-                if len(pages_txt)==len(html_pages):
-                    for idx, page in enumerate(pages_txt):
-                        df = df.append(pd.DataFrame(columns = ['dc:source', 'dc:format', 'dc:language', 'dc:type', 'dc:coverage', 'dc:publisher', 'page', 'text', 'html_text', 'html_tags', 'annotations'],
-                                                    data = [data + [idx, pages_txt[idx], html_text[idx], html_tags[idx], annotations[idx]]]), ignore_index=True)
-                else:
-                    print("unequal number of pages in txt and html")
+            parsed_pages = list(iter_pages(file, pages, layout2page, n_jobs))
+            pages_txt = [page[1][0] for page in parsed_pages]
+            html_pages = tag_page_blocks([page[1][1] for page in parsed_pages])
         except:
             print("Error parsing: " + str(file))
-            df = df.append(pd.DataFrame(columns = ['dc:source', 'dc:format', 'dc:language', 'dc:type', 'dc:coverage', 'dc:publisher', 'page', 'text', 'html_text', 'html_tags', 'annotations'],
-                                        data = [data + [0, 'no text', 'no text', '', '']]), ignore_index=True)
-    return df
+            yield dict(zip(DOC_COLUMNS, data + [0, 'no text', 'no text', '', '']))
+            return
+
+        for (idx, _), page_txt, page in zip(parsed_pages, pages_txt, html_pages):
+            annotations = [line[0] for line in page]
+            html_text = [line[1] for line in page]
+            html_tags = [line[2] for line in page]
+            yield dict(zip(DOC_COLUMNS, data + [idx, page_txt, html_text, html_tags, annotations]))
 
 class PDF2HTMLParser(HTMLParser):
     '''
@@ -114,58 +101,79 @@ def html2lines(html_page):
    
     return html_lines
  
+# Digits removed from lines before comparing them (same characters as str.isdigit())
+DIGITS_RE = re.compile(r'[\p{Numeric_Type=Decimal}\p{Numeric_Type=Digit}]')
+
 def remove_digits(s):
-    return ''.join([i for i in s if not i.isdigit()])
+    return DIGITS_RE.sub('', s)
  
-def remove_block(previous_page, page, reverse):
-    cleaned = []
-    block = True
+def tag_page_blocks(pages, max_block_lines=5, min_pages=2, headers=True, footers=True, max_page_distance=2):
+    '''
+    Tag the header and footer lines of all pages in one pass.
+    The lines are compared without digits (page numbers, dates). A text line at the top (bottom) of a page is
+    header (footer) text if the same line is at the same position among the first (last) max_block_lines text
+    lines of at least min_pages pages at most max_page_distance pages apart - with the default of 2, running
+    headers which alternate between odd and even pages are found too, while the section headings listed at the
+    top of a table of contents are not.
+    The header of a page is the block of such lines and the empty lines between them at the top of the page,
+    the footer is the same block at the bottom, lines in figures (position:absolute) are never headers or footers.
+    Tags: 0 - header spaces, 1 - footer spaces, 2 - header text, 3 - footer text, other lines keep their tag.
+    '''
+    page_keys = [[remove_digits(line[1]).strip() if line[1].strip() else None for line in page] for page in pages]
+
+    # the (position, line) pairs at the top and bottom of each page
+    top_blocks = []
+    bottom_blocks = []
+    for keys in page_keys:
+        text_keys = [key for key in keys if key is not None]
+        top_blocks.append(set(enumerate(text_keys[:max_block_lines])))
+        bottom_blocks.append(set(enumerate(reversed(text_keys[-max_block_lines:]))))
+
+    tagged_pages = []
+    for page_id, (page, keys) in enumerate(zip(pages, page_keys)):
+        tags = [line[0] for line in page]
+        nearby_ids = range(max(page_id - max_page_distance, 0), min(page_id + max_page_distance + 1, len(pages)))
+        header_end = 0
+        if headers:
+            top_counts = Counter(pair for idx in nearby_ids for pair in top_blocks[idx])
+            header_tags = _get_block_tags(page, keys, range(len(page)), top_counts, max_block_lines, min_pages, 0, 2)
+            for idx, tag in header_tags.items():
+                tags[idx] = tag
+            header_end = max(header_tags, default=-1) + 1
+        if footers:
+            bottom_counts = Counter(pair for idx in nearby_ids for pair in bottom_blocks[idx])
+            footer_tags = _get_block_tags(page, keys, range(len(page) - 1, header_end - 1, -1), bottom_counts,
+                                          max_block_lines, min_pages, 1, 3)
+            for idx, tag in footer_tags.items():
+                tags[idx] = tag
+        tagged_pages.append([(tag, line[1], line[2]) for tag, line in zip(tags, page)])
+    return tagged_pages
+
+def _get_block_tags(page, keys, line_ids, counts, max_block_lines, min_pages, space_type, text_type):
+    block_tags = {}
     block_text_lines = 0
-   
-    previous_text = [remove_digits(line[1]) for line in previous_page]
- 
-    if reverse:
-        lines = page[::-1]
-    else:
-        lines = page
-       
-    for idx, line in enumerate(lines):
-        if len(lines[idx][1].strip())!=0: # line contains text
-            p1 = remove_digits(lines[idx][1])
-            # we have a header/footer text if text in previous page and not a table content
-            if (p1 in previous_text) and ("position:absolute" not in str(lines[idx][2])):
-                block_text_lines += 1
-                if not reverse:
-                    block_type = 2 # header text
-                else:
-                    block_type = 3 # footer text
-            else:
-                block = False
-        else:
-            if not reverse:
-                block_type = 0 # header spaces
-            else:
-                block_type = 1 # footer spaces
-        if block==True:
-            cleaned.append([block_type, line[1], line[2]])
+    for idx in line_ids:
+        if keys[idx] is None:
+            block_tags[idx] = space_type
+        elif block_text_lines < max_block_lines and counts[(block_text_lines, keys[idx])] >= min_pages \
+                and "position:absolute" not in str(page[idx][2]):
+            block_tags[idx] = text_type
+            block_text_lines += 1
         else:
-            cleaned.append(line)
- 
-    if reverse:
-        cleaned = cleaned[::-1]
-   
-    return cleaned
- 
+            break
+    return block_tags
+
 def tag_page_headers(pages):
- 
-    pages = [remove_block(pages[idx-1] if idx > 0 else [],
-                     page, True) for idx, page in enumerate(pages)]
-    pages = [remove_block(pages[idx-1] if idx > 0 else [],
-                     page, False) for idx, page in enumerate(pages)]
-    return pages
- 
+    '''
+    Tag the header and footer lines of all pages, see tag_page_blocks()
+    '''
+    return tag_page_blocks(pages)
+
 def tag_page_footers(pages):
-    return tag_page_headers(pages[::-1])[::-1]
+    '''
+    Tag the header and footer lines of all pages, the same as tag_page_headers()
+    '''
+    return tag_page_blocks(pages)
  
 def get_feature_vector(line_to_process, prefix):
     '''
@@ -234,14 +242,17 @@ def generate_line_features(page, df_features):
     """
     Build a feature vector for a given page.
  
+    """
+    page_features = pd.DataFrame.from_records(list(iter_line_features(page)))
+    return pd.concat([df_features, page_features], ignore_index=True)
+
+def iter_line_features(page):
+    """
+    Generate the feature vector of each line of a given page.
+
     """
     for idx, line in enumerate(page):
         previous_line = page[idx-1] if idx==0 else ('', '') 
         next_line = page[idx] if idx==len(page) else ('', '')
         current_line = page[idx]
-        features = build_line_features(previous_line, current_line, next_line)
-        df_features = df_features.append([features], ignore_index = True)
-   
-    return df_features
- 
-
+        yield build_line_features(previous_line, current_line, next_line)
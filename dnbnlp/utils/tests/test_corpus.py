@@ -0,0 +1,73 @@
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+
+from dnbnlp.utils.corpus import Corpus
+
+METADATA = """Insurance Undertaking,Year,Document Type,Language,Url Type,Url
+Insurer A,2018,SFCR,EN,PDF,https://example.com/a.pdf
+Insurer B,2017,SFCR,NL,HTML,https://example.com/b.html
+"""
+
+
+class TestCorpus(TestCase):
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        self.write('2018_EN_Insurer A_SFCR.txt', 'Solvency and financial condition report 2018.')
+        self.write('2017_NL_Insurer B_SFCR_1.txt', 'Verslag over de solvabiliteit en financiële positie 2017.')
+        self.write('2017_NL_Insurer B_SFCR_2.txt', '')
+        self.metadata_fn = os.path.join(self.path, 'metadata_sfcr.csv')
+        with open(self.metadata_fn, 'w', encoding='Latin-1') as metadata_file:
+            metadata_file.write(METADATA)
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+    def write(self, filename, text):
+        with open(os.path.join(self.path, filename), 'wb') as file:
+            file.write(text.encode('utf-8'))
+
+    def test_documents(self):
+        corpus = Corpus(self.path, self.metadata_fn)
+        self.assertEqual(3, len(corpus))
+        self.assertEqual('Verslag over de solvabiliteit en financiële positie 2017.', corpus[0])
+        self.assertEqual('', corpus[1])
+        self.assertListEqual(['2018_EN_Insurer A_SFCR.txt'], list(corpus[2:].filenames))
+        self.assertListEqual([2017, 2017, 2018], corpus.metadata['Year'].tolist())
+
+    def test_filter(self):
+        corpus = Corpus(self.path, self.metadata_fn)
+        self.assertListEqual(['Solvency and financial condition report 2018.'], list(corpus.filter(Language='EN')))
+        self.assertEqual(2, len(corpus.filter(corpus.metadata['Year'] < 2018, **{'Url Type': ['HTML']})))
+
+    def test_reindex(self):
+        Corpus(self.path, None)
+        self.write('2018_EN_Insurer C_SFCR.txt', 'New report.')
+        corpus = Corpus(self.path, None)
+        self.assertEqual(4, len(corpus))
+        self.assertEqual('New report.', corpus[3])
+        self.assertListEqual(['Filename'], list(corpus.metadata.columns))
+
+    def test_missing_or_truncated_blob(self):
+        Corpus(self.path, None).close()
+        blob_fn = os.path.join(self.path, '.corpus', 'corpus.blob')
+        with open(blob_fn, 'r+b') as blob_file:
+            blob_file.truncate(10)
+        with Corpus(self.path, None) as corpus:
+            self.assertEqual('Solvency and financial condition report 2018.', corpus[2])
+        os.remove(blob_fn)
+        with Corpus(self.path, None) as corpus:
+            self.assertEqual('Verslag over de solvabiliteit en financiële positie 2017.', corpus[0])
+
+    def test_close(self):
+        with Corpus(self.path, None) as corpus:
+            subset = corpus[1:]
+            subset.close()
+            self.assertEqual('Verslag over de solvabiliteit en financiële positie 2017.', corpus[0])
+            subset = corpus[1:]
+        self.assertEqual(3, len(corpus))
+        self.assertEqual('', corpus[1])
+        self.assertRaises(ValueError, corpus.get_text, 0)
+        self.assertRaises(ValueError, subset.get_text, 1)
+        corpus.close()
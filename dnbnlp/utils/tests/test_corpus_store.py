@@ -0,0 +1,49 @@
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+
+import pandas as pd
+import pyarrow.parquet as pq
+
+from dnbnlp.utils.corpus_store import copy_document, get_document_path, read_corpus, write_document
+from dnbnlp.utils.text_extraction import DOC_COLUMNS
+
+
+def make_document(source, language, document_type, document_year, sentences):
+    return pd.DataFrame([[source, language, document_type, document_year, 0, idx, sentence]
+                         for idx, sentence in enumerate(sentences)], columns=DOC_COLUMNS)
+
+
+class TestCorpusStore(TestCase):
+    def setUp(self):
+        self.store_path = tempfile.mkdtemp()
+        self.en_fn = get_document_path(self.store_path, 'sub/2018_en_Insurer A.pdf', 'en', 'SFCR', 2018)
+        write_document(make_document('a.pdf', 'en', 'SFCR', 2018, ['First sentence.', 'Second sentence.']),
+                       self.en_fn)
+        self.nl_fn = get_document_path(self.store_path, '2017_nl_Insurer B.pdf', 'nl', 'SFCR', 2017)
+        write_document(make_document('b.pdf', 'nl', 'SFCR', 2017, ['Eerste zin.']), self.nl_fn)
+
+    def tearDown(self):
+        shutil.rmtree(self.store_path)
+
+    def test_read_corpus(self):
+        df = read_corpus(self.store_path)
+        self.assertListEqual(DOC_COLUMNS, list(df.columns))
+        self.assertEqual(3, len(df))
+        self.assertEqual(1, pq.ParquetFile(self.en_fn).num_row_groups)
+
+    def test_projection_and_filters(self):
+        df = read_corpus(self.store_path, columns=['text', 'document year'], filters={'language': 'nl'})
+        self.assertListEqual(['text', 'document year'], list(df.columns))
+        self.assertListEqual([['Eerste zin.', 2017]], df.values.tolist())
+        df = read_corpus(self.store_path, columns=['source'], filters={'document year': [2017, 2018],
+                                                                       'document type': 'SFCR'})
+        self.assertListEqual(['a.pdf', 'a.pdf', 'b.pdf'], sorted(df['source']))
+        self.assertEqual(0, len(read_corpus(os.path.join(self.store_path, 'missing'), columns=['text'])))
+
+    def test_copy_document(self):
+        fn = get_document_path(self.store_path, 'copy.pdf', 'en', 'SFCR', 2018)
+        copy_document(self.en_fn, fn, 'copy.pdf')
+        df = read_corpus(self.store_path, columns=['source', 'text'], filters={'language': 'en'})
+        self.assertListEqual(['First sentence.', 'Second sentence.'], df[df['source'] == 'copy.pdf']['text'].tolist())
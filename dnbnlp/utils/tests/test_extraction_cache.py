@@ -0,0 +1,86 @@
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+
+from dnbnlp.utils.extraction_cache import ExtractionCache, get_output_kind
+
+
+class TestExtractionCache(TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.extracted = []
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def write(self, filename, content):
+        with open(os.path.join(self.tmp_dir, filename), 'wb') as file:
+            file.write(content)
+        return os.path.join(self.tmp_dir, filename)
+
+    def extract(self, source_fn, object_fn):
+        self.extracted.append(os.path.basename(source_fn))
+        with open(source_fn, 'rb') as source, open(object_fn, 'wb') as target:
+            target.write(source.read().upper())
+
+    def convert(self, filename):
+        cache = ExtractionCache(os.path.join(self.tmp_dir, 'cache'), self.tmp_dir)
+        target_fn = os.path.join(self.tmp_dir, filename + '.txt')
+        status = cache.convert(filename, os.path.join(self.tmp_dir, filename), target_fn, get_output_kind('txt'),
+                               self.extract)
+        with open(target_fn, 'rb') as target:
+            return status, target.read()
+
+    def test_convert(self):
+        self.write('a.pdf', b'report')
+        self.assertEqual(('extracted', b'REPORT'), self.convert('a.pdf'))
+        self.assertEqual(('current', b'REPORT'), self.convert('a.pdf'))
+        # renamed identical file
+        self.write('b.pdf', b'report')
+        self.assertEqual(('cached', b'REPORT'), self.convert('b.pdf'))
+        # changed file with the same name
+        self.write('a.pdf', b'new report')
+        self.assertEqual(('extracted', b'NEW REPORT'), self.convert('a.pdf'))
+        self.assertListEqual(['a.pdf', 'a.pdf'], self.extracted)
+
+    def test_output_kind(self):
+        self.assertEqual('txt', get_output_kind('txt'))
+        self.assertNotEqual(get_output_kind('pickle', 'en', 'unknown', 0), get_output_kind('pickle', 'nl', 'unknown', 0))
+
+    def test_record(self):
+        cache = ExtractionCache(os.path.join(self.tmp_dir, 'cache'), self.tmp_dir)
+        cache.record('a.pdf', 'hash1', {'txt': 'a.txt'}, status='error', error='PDFSyntaxError')
+        cache = ExtractionCache(os.path.join(self.tmp_dir, 'cache'), self.tmp_dir)
+        self.assertEqual('error', cache.get_entry('a.pdf', 'hash1')['status'])
+        self.assertIsNone(cache.get_entry('a.pdf', 'hash2'))
+        # a new content hash replaces the entry
+        cache.record('a.pdf', 'hash2', {'pickle': 'a.pickle'}, status='done')
+        self.assertDictEqual({'pickle': 'a.pickle'}, cache.get_entry('a.pdf', 'hash2')['outputs'])
+
+    def test_replaced_output(self):
+        # the same document converted with another document type is written to another corpus partition
+        source_fn = self.write('a.pdf', b'report')
+        txt_fn = os.path.join(self.tmp_dir, 'a.txt')
+        unknown_fn = os.path.join(self.tmp_dir, 'unknown.parquet')
+        sfcr_fn = os.path.join(self.tmp_dir, 'sfcr.parquet')
+        sfcr_kind = get_output_kind('parquet', 'en', 'SFCR', 2018)
+        cache = ExtractionCache(os.path.join(self.tmp_dir, 'cache'), self.tmp_dir)
+        cache.convert('a.pdf', source_fn, txt_fn, 'txt', self.extract)
+        cache.convert('a.pdf', source_fn, unknown_fn, get_output_kind('parquet', 'en', 'unknown', 0), self.extract)
+        cache.convert('a.pdf', source_fn, sfcr_fn, sfcr_kind, self.extract)
+        self.assertFalse(os.path.exists(unknown_fn))
+        self.assertTrue(os.path.exists(sfcr_fn))
+        # outputs with other extensions are kept
+        self.assertTrue(os.path.exists(txt_fn))
+        cache = ExtractionCache(os.path.join(self.tmp_dir, 'cache'), self.tmp_dir)
+        self.assertDictEqual({'txt': txt_fn, sfcr_kind: sfcr_fn}, cache.manifest['a.pdf']['outputs'])
+
+    def test_no_manifest(self):
+        self.write('a.pdf', b'report')
+        cache = ExtractionCache(os.path.join(self.tmp_dir, 'cache'))
+        self.assertEqual('extracted', cache.convert('a.pdf', os.path.join(self.tmp_dir, 'a.pdf'),
+                                                    os.path.join(self.tmp_dir, 'a.txt'), 'txt', self.extract))
+        self.assertEqual('current', cache.convert('a.pdf', os.path.join(self.tmp_dir, 'a.pdf'),
+                                                  os.path.join(self.tmp_dir, 'a.txt'), 'txt', self.extract))
+        self.assertFalse(os.path.exists(os.path.join(self.tmp_dir, 'manifest.json')))
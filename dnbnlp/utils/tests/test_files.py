@@ -0,0 +1,38 @@
+import os
+import tempfile
+from unittest import TestCase
+
+from dnbnlp.utils.files import atomic_write
+
+
+class TestAtomicWrite(TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.fn = os.path.join(self.tmp_dir.name, 'data.txt')
+        with open(self.fn, 'w') as file:
+            file.write('old')
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_replace(self):
+        with atomic_write(self.fn, hidden=True) as tmp_fn:
+            self.assertTrue(os.path.basename(tmp_fn).startswith('.data.txt.'))
+            with open(tmp_fn, 'w') as file:
+                file.write('new')
+            with open(self.fn) as file:
+                self.assertEqual('old', file.read())
+        with open(self.fn) as file:
+            self.assertEqual('new', file.read())
+        self.assertListEqual(['data.txt'], os.listdir(self.tmp_dir.name))
+
+    def test_error(self):
+        with self.assertRaises(ValueError):
+            with atomic_write(self.fn, suffix='.npz') as tmp_fn:
+                self.assertTrue(tmp_fn.endswith('.tmp.npz'))
+                with open(tmp_fn, 'w') as file:
+                    file.write('partial')
+                raise ValueError()
+        with open(self.fn) as file:
+            self.assertEqual('old', file.read())
+        self.assertListEqual(['data.txt'], os.listdir(self.tmp_dir.name))
@@ -0,0 +1,12 @@
+import os
+from unittest import TestCase
+
+from dnbnlp.utils.parallel import get_n_jobs
+
+
+class TestGetNJobs(TestCase):
+    def test_n_jobs(self):
+        self.assertEqual(1, get_n_jobs(1))
+        self.assertEqual(3, get_n_jobs(3))
+        self.assertEqual(os.cpu_count() or 1, get_n_jobs(None))
+        self.assertEqual(os.cpu_count() or 1, get_n_jobs(-1))
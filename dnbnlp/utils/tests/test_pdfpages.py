@@ -0,0 +1,138 @@
+import os
+import tempfile
+from unittest import TestCase
+
+from dnbnlp.utils import pdfpages
+from dnbnlp.utils.pdfpages import extract_pages, get_page_selector, iter_pages
+
+
+def write_pdf(fn, page_texts):
+    '''
+    Write a minimal pdf with one line of Helvetica text on each page
+    '''
+    n_pages = len(page_texts)
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>",
+               "<< /Type /Pages /Kids [{0}] /Count {1} >>".format(
+                   " ".join("{0} 0 R".format(4 + 2 * idx) for idx in range(n_pages)), n_pages).encode("ascii"),
+               b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    for idx, text in enumerate(page_texts):
+        objects.append("<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Resources << /Font << /F1 3 0 R >> >> "
+                       "/Contents {0} 0 R >>".format(5 + 2 * idx).encode("ascii"))
+        stream = "BT /F1 12 Tf 72 720 Td ({0}) Tj ET".format(text).encode("ascii")
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+
+    write_pdf_objects(fn, objects)
+
+
+def write_pdf_objects(fn, objects):
+    '''
+    Write a pdf of the objects (bytes), object 1 is the catalog
+    '''
+    content = b"%PDF-1.4\n"
+    offsets = []
+    for idx, obj in enumerate(objects):
+        offsets.append(len(content))
+        content += b"%d 0 obj\n%s\nendobj\n" % (idx + 1, obj)
+    xref = len(content)
+    content += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    content += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    content += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    with open(fn, "wb") as file:
+        file.write(content)
+
+
+def write_layout_pdf(fn):
+    '''
+    Write a one page pdf with a bold title, a line of body text and a figure (form xobject) with text
+    '''
+    figure = b"BT /F1 10 Tf 100 300 Td (Figure text) Tj ET"
+    page = b"BT /F2 20 Tf 72 720 Td (Annual Report) Tj ET BT /F1 12 Tf 72 650 Td (Body text) Tj ET /X1 Do"
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>",
+               b"<< /Type /Pages /Kids [4 0 R] /Count 1 >>",
+               b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+               b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Resources << /Font << /F1 3 0 R /F2 6 0 R >> "
+               b"/XObject << /X1 7 0 R >> >> /Contents 5 0 R >>",
+               b"<< /Length %d >>\nstream\n%s\nendstream" % (len(page), page),
+               b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica-Bold >>",
+               b"<< /Type /XObject /Subtype /Form /BBox [0 0 612 792] /Resources << /Font << /F1 3 0 R >> >> "
+               b"/Length %d >>\nstream\n%s\nendstream" % (len(figure), figure)]
+    write_pdf_objects(fn, objects)
+
+
+class TestPdfPages(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp_dir = tempfile.TemporaryDirectory()
+        cls.pdf_fn = os.path.join(cls.tmp_dir.name, "pages.pdf")
+        write_pdf(cls.pdf_fn, ["Page {0}".format(idx) for idx in range(6)])
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp_dir.cleanup()
+
+    def test_page_selector(self):
+        selected, stop = get_page_selector(range(2, 4))
+        self.assertEqual(([False, False, True, True, False], 4), ([selected(idx) for idx in range(5)], stop))
+        selected, stop = get_page_selector([3, 1])
+        self.assertEqual(([False, True, False, True], 4), ([selected(idx) for idx in range(4)], stop))
+        self.assertIsNone(get_page_selector(lambda idx: idx % 2 == 0)[1])
+        self.assertIsNone(get_page_selector(None)[1])
+
+    def test_extract_pages(self):
+        self.assertListEqual(["Page {0}\n\n\x0c".format(idx) for idx in range(6)], extract_pages(self.pdf_fn))
+        self.assertListEqual(["Page 1\n\n\x0c", "Page 4\n\n\x0c"], extract_pages(self.pdf_fn, pages=[4, 1]))
+        self.assertListEqual([0, 2, 4], [idx for idx, _ in iter_pages(self.pdf_fn, lambda idx: idx % 2 == 0)])
+
+    def test_lazy_iteration(self):
+        parsed = []
+
+        def page_func(ltpage):
+            parsed.append(ltpage.pageid)
+            return pdfpages.layout2text(ltpage)
+
+        page_iter = iter_pages(self.pdf_fn, page_func=page_func)
+        self.assertEqual((0, "Page 0\n\n\x0c"), next(page_iter))
+        page_iter.close()
+        self.assertListEqual([1], parsed)
+
+    def test_parallel(self):
+        self.assertListEqual(extract_pages(self.pdf_fn, pages=range(1, 5)),
+                             extract_pages(self.pdf_fn, n_jobs=2, pages_per_task=1, pages=range(1, 5)))
+
+
+class TestLayout(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp_dir = tempfile.TemporaryDirectory()
+        cls.pdf_fn = os.path.join(cls.tmp_dir.name, "layout.pdf")
+        write_layout_pdf(cls.pdf_fn)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp_dir.cleanup()
+
+    def test_layout2text(self):
+        text = extract_pages(self.pdf_fn)[0]
+        self.assertIn("Annual Report\n", text)
+        self.assertIn("Body text\n", text)
+        self.assertIn("Figure text", text)
+        self.assertTrue(text.endswith("\x0c"))
+
+    def test_layout2lines(self):
+        page_lines = extract_pages(self.pdf_fn, page_func=pdfpages.layout2lines)[0]
+        lines = {text: attributes for _, text, attributes in page_lines}
+        self.assertListEqual(["Annual Report\n", "Body text\n", "Figure text\n"], sorted(lines))
+
+        title = lines["Annual Report\n"]
+        self.assertIn(('style', 'font-family: Helvetica-Bold; font-size:20px'), title)
+        self.assertNotIn(('style', 'position:absolute'), title)
+        self.assertIn(('style', 'font-family: Helvetica; font-size:12px'), lines["Body text\n"])
+
+        positions = {text: [value for key, value in attributes if key == 'position']
+                     for text, attributes in lines.items()}
+        self.assertTrue(positions["Annual Report\n"][0].startswith('left:72px; top:'))
+        self.assertEqual(1, len(positions["Body text\n"]))
+
+        figure = lines["Figure text\n"]
+        self.assertIn(('style', 'position:absolute'), figure)
+        self.assertIn(('style', 'font-family: Helvetica; font-size:10px'), figure)
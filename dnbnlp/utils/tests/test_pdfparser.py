@@ -0,0 +1,47 @@
+from unittest import TestCase
+
+from dnbnlp.utils.pdfparser import tag_page_blocks, tag_page_footers, tag_page_headers
+
+
+def make_page(*texts):
+    return [(None, text + "\n", {('style', 'font-family: Arial; font-size:10px')}) for text in texts]
+
+
+class TestTagPageBlocks(TestCase):
+    pages = [make_page("Solvency and Financial Condition Report 2018", "", "Summary", "Body of the first page", "1"),
+             make_page("Insurance Company N.V.", "Introduction", "Body of the second page", "", "2"),
+             make_page("Solvency and Financial Condition Report 2018", "", "Business", "Body of the third page", "3"),
+             make_page("Insurance Company N.V.", "Body of the fourth page", "", "4")]
+
+    def test_alternating_headers(self):
+        tagged = tag_page_blocks(self.pages)
+        self.assertListEqual([2, 0, None, None, 3], [line[0] for line in tagged[0]])
+        self.assertListEqual([2, None, None, 1, 3], [line[0] for line in tagged[1]])
+        self.assertListEqual([2, 0, None, None, 3], [line[0] for line in tagged[2]])
+        self.assertListEqual([2, None, 1, 3], [line[0] for line in tagged[3]])
+
+    def test_figures_and_min_pages(self):
+        pages = [page[:] for page in self.pages]
+        pages[0][0] = (None, pages[0][0][1], {('style', 'position:absolute')})
+        tagged = tag_page_blocks(pages, min_pages=3)
+        self.assertListEqual([None, None, None, None, 3], [line[0] for line in tagged[0]])
+        self.assertListEqual([None, None, None, None, 3], [line[0] for line in tagged[2]])
+
+    def test_table_of_contents(self):
+        # without digits the headings match their entries at the top of the table of contents
+        pages = [make_page("Solvency and Financial Condition Report 2018", "", "Insurance Company N.V.", "1"),
+                 make_page("Solvency and Financial Condition Report 2018", "Contents", "Summary 3",
+                           "A. Business and performance 5", "2"),
+                 make_page("Solvency and Financial Condition Report 2018", "Summary", "Body of the summary", "3"),
+                 make_page("Solvency and Financial Condition Report 2018", "Rest of the summary", "4"),
+                 make_page("Solvency and Financial Condition Report 2018", "A. Business and performance",
+                           "Body of the section", "5")]
+        tagged = tag_page_blocks(pages)
+        self.assertListEqual([2, None, None, None, 3], [line[0] for line in tagged[1]])
+        self.assertListEqual([2, None, None, 3], [line[0] for line in tagged[2]])
+        self.assertListEqual([2, None, None, 3], [line[0] for line in tagged[4]])
+
+    def test_wrappers(self):
+        # like the previous detection, both wrappers tag the header and the footer blocks
+        self.assertListEqual(tag_page_blocks(self.pages), tag_page_headers(self.pages))
+        self.assertListEqual(tag_page_blocks(self.pages), tag_page_footers(self.pages))
@@ -1,15 +1,9 @@
 # -*- coding: utf-8 -*-
 
-from io import StringIO
 import pandas as pd
 import logging
 
-from pdfminer.converter import TextConverter
-from pdfminer.layout import LAParams
-from pdfminer.pdfdocument import PDFDocument
-from pdfminer.pdfinterp import PDFResourceManager, PDFPageInterpreter
-from pdfminer.pdfpage import PDFPage
-from pdfminer.pdfparser import PDFParser
+from dnbnlp.utils.pdfpages import extract_pages, iter_pages, layout2text
 
 from lexnlp.nlp.en.segments import sentences as sentences_en
 from dnbnlp.nlp.nl.segments import sentences as sentences_nl
@@ -17,70 +11,61 @@ from dnbnlp.nlp.nl.segments import sentences as sentences_nl
 import nltk
 from bs4 import BeautifulSoup
 
-def doc2text(path, language='en'):
+def doc2text(path, language='en', n_jobs=1, pages=None):
     """
     Simple doc2text method.
     :param path:
     :param language:
+    :param n_jobs: number of processes analysing the pdf pages, see pdfpages.iter_pages()
+    :param pages: pdf pages to extract: None - all pages, a range / iterable of page indices (0-based) or a predicate
+    on the page index, e.g. range(1) for the cover page only
     :return:
     """
-    codec = 'utf-8'
-    output_string = StringIO()
     if path[-3:].lower()=='pdf':
-        with open(path, 'rb') as in_file:
-            parser = PDFParser(in_file)
-            doc = PDFDocument(parser)
-            rsrcmgr = PDFResourceManager()
-            device = TextConverter(rsrcmgr, output_string, codec = codec, laparams=LAParams())
-            interpreter = PDFPageInterpreter(rsrcmgr, device)
-            for page in PDFPage.create_pages(doc):
-                interpreter.process_page(page)
-        text = output_string.getvalue()
+        text = ''.join(extract_pages(path, layout2text, n_jobs, pages=pages))
     elif path[-4:].lower()=='html':
         with open(path, 'rb') as in_file:
             soup = BeautifulSoup(in_file)
             text = soup.get_text()
     return text
 
-def doc2dataframe(path, language=None, document_type=None, document_year=None):
+# Columns of doc2dataframe()
+DOC_COLUMNS = ['source', 'language', 'document type', 'document year', 'page', 'sentence', 'text']
+
+def get_document_language(path, language=None):
     """
-    Convert pdf document to dataframe (each sentence separately)
+    Get the language of the sentences of doc2dataframe(): "nl" for dutch documents, otherwise "en"
     """
     if language is not None:
         if ("_nl_" in path.lower()) or (language == "nl") or ("//nl//" in path.lower()):
-            sentences = sentences_nl
-            language = "nl"
-        else:
-            sentences = sentences_en
-            language = "en"
-    else:
-        sentences = sentences_en
-        language = "en"
+            return "nl"
+    return "en"
+
+def doc2dataframe(path, language=None, document_type=None, document_year=None, n_jobs=1, pages=None):
+    """
+    Convert pdf document to dataframe (each sentence separately), see doc2text() for pages
+    """
+    return pd.DataFrame.from_records(list(doc2records(path, language, document_type, document_year, n_jobs, pages)),
+                                     columns=DOC_COLUMNS)
+
+def doc2records(path, language=None, document_type=None, document_year=None, n_jobs=1, pages=None):
+    """
+    Generate the rows of doc2dataframe() as dicts, one sentence at a time - for writing large documents
+    straight to disk. The pdf pages are parsed as the rows are consumed, no more pages are parsed when the
+    consumer stops.
+    """
+    language = get_document_language(path, language)
+    sentences = sentences_nl if language == "nl" else sentences_en
 
-    df = pd.DataFrame(columns = ['source', 'language', 'document type', 'document year', 'page', 'sentence', 'text'])
-    codec = 'utf-8'
     if path[-3:].lower()=='pdf':
-        with open(path, 'rb') as in_file:
-            parser = PDFParser(in_file)
-            doc = PDFDocument(parser)
-            for page_idx, page in enumerate(PDFPage.create_pages(doc)):
-                output_string = StringIO()
-                rsrcmgr = PDFResourceManager()
-                device = TextConverter(rsrcmgr, output_string, codec = codec, laparams=LAParams())
-                interpreter = PDFPageInterpreter(rsrcmgr, device)
-                interpreter.process_page(page)
-                text = output_string.getvalue()
-                text = sentences.pre_process_document(text)
-                for sentence_idx, sentence in enumerate(sentences.get_sentence_list(text)):
-                    df = df.append(pd.DataFrame(columns = ['source','language', 'document type', 'document year', 'page', 'sentence', 'text'], 
-                                                data = [[path, language, document_type, document_year, page_idx, sentence_idx, sentence]]), ignore_index=True)
+        for page_idx, text in iter_pages(path, pages, layout2text, n_jobs):
+            text = sentences.pre_process_document(text)
+            for sentence_idx, sentence in enumerate(sentences.get_sentence_list(text)):
+                yield dict(zip(DOC_COLUMNS, [path, language, document_type, document_year, page_idx, sentence_idx, sentence]))
     elif path[-4:].lower()=='html':
         with open(path, 'rb') as in_file:
             soup = BeautifulSoup(in_file)
             text = soup.get_text()
             text = sentences.pre_process_document(text)
             for sentence_idx, sentence in enumerate(sentences.get_sentence_list(text)):
-                    df = df.append(pd.DataFrame(columns = ['source','language', 'document type', 'document year', 'page', 'sentence', 'text'], 
-                                                data = [[path, language, document_type, document_year, 0, sentence_idx, sentence]]), ignore_index=True)
-
-    return df
+                    yield dict(zip(DOC_COLUMNS, [path, language, document_type, document_year, 0, sentence_idx, sentence]))